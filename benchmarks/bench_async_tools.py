@@ -0,0 +1,125 @@
+"""
+Benchmark: concurrent agents with blocking vs. executor-backed tool I/O
+
+Simulates several analyzer agents running under ``asyncio.gather``. Each agent alternates between a
+model round trip (an ``asyncio.sleep``) and a tool call: a Read-File of a source file, or a
+List-Files-Tool listing of a package. A slow disk is emulated by delaying every ``os.scandir``
+and ``os.fstat`` call by --disk-ms.
+
+The tools run in two ways:
+    blocking  the synchronous tool function called directly on the event loop, so every disk
+              delay stalls the model round trips of all the other agents
+    executor  the tool as registered with the agents, running on the bounded I/O executor
+              (TOOL_IO_WORKERS threads)
+
+Reported are the wall time of the whole run and the worst event loop lag, measured by a
+heartbeat task that should wake up every 5 ms.
+
+Usage:
+    PYTHONPATH=src uv run python benchmarks/bench_async_tools.py
+    PYTHONPATH=src uv run python benchmarks/bench_async_tools.py --agents 5 --steps 20 --disk-ms 50 --model-ms 100
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from agents.tools import FileReadTool, ListFilesTool, run_in_io_executor
+
+HEARTBEAT_SECONDS = 0.005
+
+
+def build_repository(root: Path, packages: int) -> None:
+    for package in range(packages):
+        directory = root / f"pkg_{package}"
+        directory.mkdir(parents=True)
+        for module in range(10):
+            lines = "".join(f"def function_{number}():\n    return {number}\n\n" for number in range(100))
+            (directory / f"module_{module}.py").write_text(lines)
+
+
+def add_disk_latency(latency_ms: float) -> None:
+    scandir, fstat = os.scandir, os.fstat
+
+    def slow_scandir(path="."):
+        time.sleep(latency_ms / 1000)
+        return scandir(path)
+
+    def slow_fstat(fd):
+        time.sleep(latency_ms / 1000)
+        return fstat(fd)
+
+    os.scandir, os.fstat = slow_scandir, slow_fstat
+
+
+async def heartbeat(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        worst = max(worst, time.perf_counter() - start - HEARTBEAT_SECONDS)
+    return worst
+
+
+async def agent(number: int, root: Path, steps: int, model_ms: float, mode: str) -> None:
+    # The content cache is disabled so every read goes to the (slow) disk
+    read_tool = FileReadTool(cache=None)
+    list_tool = ListFilesTool(ignored_dirs=[], ignored_extensions=[])
+    read = read_tool._run if mode == "blocking" else run_in_io_executor(read_tool._run)
+    list_files = list_tool._run if mode == "blocking" else run_in_io_executor(list_tool._run)
+    packages = sorted(root.iterdir())
+
+    for step in range(steps):
+        await asyncio.sleep(model_ms / 1000)
+        package = packages[(number + step) % len(packages)]
+        if step % 4 == 0:
+            result = list_files(str(package))
+        else:
+            result = read(str(package / f"module_{step % 10}.py"), 0, 50)
+        if asyncio.iscoroutine(result):
+            await result
+
+
+async def run(root: Path, agents: int, steps: int, model_ms: float, mode: str):
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(agent(number, root, steps, model_ms, mode) for number in range(agents)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+
+    return elapsed, await monitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=5, help="Concurrent agents")
+    parser.add_argument("--steps", type=int, default=20, help="Model round trips and tool calls per agent")
+    parser.add_argument("--model-ms", type=float, default=100, help="Duration of a model round trip")
+    parser.add_argument("--disk-ms", type=float, default=20, help="Delay added to every directory listing and stat")
+    parser.add_argument("--packages", type=int, default=20, help="Packages of 10 modules in the synthetic repository")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-async-tools-"))
+    try:
+        build_repository(root, args.packages)
+        add_disk_latency(args.disk_ms)
+
+        ideal = args.steps * args.model_ms / 1000
+        print(
+            f"{args.agents} agents x {args.steps} steps, {args.model_ms:.0f} ms model calls, {args.disk_ms:.0f} ms disk"
+        )
+        print(f"lower bound (model calls only): {ideal:.2f}s")
+        for mode in ["blocking", "executor"]:
+            elapsed, lag = asyncio.run(run(root, args.agents, args.steps, args.model_ms, mode))
+            print(f"{mode:<9} wall {elapsed:6.2f}s   worst event loop lag {lag * 1000:7.1f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
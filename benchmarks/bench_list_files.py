@@ -0,0 +1,159 @@
+"""
+Benchmark: pruned directory walk vs. walk-then-filter
+
+Builds a synthetic repository with a large number of files, most of them inside directories that
+the listing ignores (``node_modules``, ``.git``, ``vendor``, ``build``), and compares the previous
+``os.walk`` + filter implementation of ``ListFilesTool`` with the pruning walker in
+``agents.tools.repo_index``. Both implementations must produce the same grouped output.
+
+With --workers, the parallel walker is measured as well. --latency-ms adds a delay to every
+directory listing to emulate a network-backed volume, where the walk is bound by round trips
+rather than CPU.
+
+Usage:
+    PYTHONPATH=src uv run python benchmarks/bench_list_files.py --files 500000
+    PYTHONPATH=src uv run python benchmarks/bench_list_files.py --root /tmp/bench-tree --keep
+    PYTHONPATH=src uv run python benchmarks/bench_list_files.py --files 50000 --workers 16 --latency-ms 2
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from agents.tools.repo_index import DEFAULT_IGNORED_DIRS, DEFAULT_IGNORED_EXTENSIONS, IgnoreRules, walk_files
+
+# Share of the synthetic files placed under ignored directories
+IGNORED_SHARE = {
+    "node_modules": 0.55,
+    ".git/objects": 0.15,
+    "vendor": 0.05,
+    "build": 0.05,
+}
+FILES_PER_DIR = 50
+SOURCE_EXTENSIONS = [".py", ".go", ".ts", ".md", ".json", ".png", ".pyc"]
+
+
+def build_tree(root: Path, total_files: int) -> None:
+    def populate(base: Path, count: int, extensions):
+        created = 0
+        dir_index = 0
+        while created < count:
+            # Spread files over a two-level hierarchy to mimic real package layouts
+            directory = base / f"pkg_{dir_index // 20}" / f"mod_{dir_index % 20}"
+            directory.mkdir(parents=True, exist_ok=True)
+            for i in range(min(FILES_PER_DIR, count - created)):
+                (directory / f"file_{i}{extensions[i % len(extensions)]}").touch()
+            created += min(FILES_PER_DIR, count - created)
+            dir_index += 1
+
+    remaining = total_files
+    for ignored_dir, share in IGNORED_SHARE.items():
+        count = int(total_files * share)
+        populate(root / ignored_dir, count, [".js"])
+        remaining -= count
+
+    populate(root / "src", remaining, SOURCE_EXTENSIONS)
+
+
+def legacy_walk(directory: str) -> dict:
+    """The original ``ListFilesTool._run`` grouping loop."""
+    dir_files = defaultdict(list)
+
+    for root, _, files in os.walk(directory):
+        path_parts = Path(root).parts
+        if any(ignored_dir in path_parts for ignored_dir in DEFAULT_IGNORED_DIRS):
+            continue
+
+        rel_dir = os.path.relpath(root, directory)
+        rel_dir = "/" if rel_dir == "." else "/" + rel_dir
+
+        for filename in files:
+            if any(filename.endswith(ext) for ext in DEFAULT_IGNORED_EXTENSIONS):
+                continue
+            dir_files[rel_dir].append(filename)
+
+    return {dir_path: sorted(dir_files[dir_path]) for dir_path in sorted(dir_files)}
+
+
+def pruned_walk(directory: str, workers: int = 1) -> dict:
+    rules = IgnoreRules(DEFAULT_IGNORED_DIRS, DEFAULT_IGNORED_EXTENSIONS)
+    grouped = walk_files(directory, rules, workers)
+    dir_files = {"/" + rel_dir if rel_dir else "/": files for rel_dir, files in grouped.items()}
+
+    return {dir_path: sorted(dir_files[dir_path]) for dir_path in sorted(dir_files)}
+
+
+def add_scandir_latency(latency_ms: float) -> None:
+    """Delay every ``os.scandir`` call, which both ``os.walk`` and the walkers use."""
+    scandir = os.scandir
+
+    def slow_scandir(path="."):
+        time.sleep(latency_ms / 1000)
+        return scandir(path)
+
+    os.scandir = slow_scandir
+
+
+def measure(func, directory: str, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(directory)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500_000, help="Number of synthetic files to create")
+    parser.add_argument("--root", type=Path, default=None, help="Where to build the tree (reused if it exists)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation, best one is reported")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic tree after the benchmark")
+    parser.add_argument("--workers", type=int, default=1, help="Also measure the parallel walker with N workers")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every directory listing")
+    args = parser.parse_args()
+
+    root = args.root or Path(tempfile.mkdtemp(prefix="bench-list-files-"))
+    if not root.exists() or not any(root.iterdir()):
+        print(f"Building synthetic tree with {args.files:,} files in {root} ...")
+        start = time.perf_counter()
+        build_tree(root, args.files)
+        print(f"Built in {time.perf_counter() - start:.1f}s")
+
+    if args.latency_ms:
+        add_scandir_latency(args.latency_ms)
+
+    try:
+        legacy_time, legacy_result = measure(legacy_walk, str(root), args.repeat)
+        pruned_time, pruned_result = measure(pruned_walk, str(root), args.repeat)
+
+        if legacy_result != pruned_result:
+            raise SystemExit("Outputs differ between the legacy and pruned walkers")
+
+        listed = sum(len(files) for files in pruned_result.values())
+        print(f"Listed files:     {listed:,} in {len(pruned_result):,} directories (identical output)")
+        print(f"os.walk + filter: {legacy_time:.3f}s")
+        print(f"pruned scandir:   {pruned_time:.3f}s")
+        print(f"speedup:          {legacy_time / pruned_time:.1f}x")
+
+        if args.workers > 1:
+            parallel_time, parallel_result = measure(
+                lambda directory: pruned_walk(directory, args.workers), str(root), args.repeat
+            )
+            if parallel_result != pruned_result:
+                raise SystemExit("Outputs differ between the sequential and parallel walkers")
+            print(f"parallel scandir: {parallel_time:.3f}s with {args.workers} workers (identical output)")
+            print(f"speedup:          {pruned_time / parallel_time:.1f}x over sequential")
+    finally:
+        if not args.keep and args.root is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
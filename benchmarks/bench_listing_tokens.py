@@ -0,0 +1,117 @@
+"""
+Benchmark: token cost of the List-Files-Tool output formats
+
+Renders the full listing (no collapsing, no page limit) of several repository shapes in the
+"grouped" and "tree" formats and compares their size. The shapes are real repositories given
+with --root (this repository by default) plus synthetic layouts modelled on common project
+types: a Go service with generated protobuf code, a Maven project, and a TypeScript monorepo.
+
+Tokens are counted with tiktoken's cl100k_base encoding when it is installed, and estimated at
+four characters per token otherwise. Gemini's tokenizer differs, but the ratio between the
+formats is what matters here.
+
+Usage:
+    PYTHONPATH=src uv run python benchmarks/bench_listing_tokens.py
+    PYTHONPATH=src uv run python benchmarks/bench_listing_tokens.py --root ~/src/project-a --root ~/src/project-b
+"""
+
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from agents.tools.dir_tool.listing import build_rows, estimate_tokens
+from agents.tools.dir_tool.render import FORMAT_GROUPED, FORMAT_TREE, get_formatter, get_header
+from agents.tools.repo_index import IgnoreMatcher, walk_files
+
+FORMATS = [FORMAT_GROUPED, FORMAT_TREE]
+
+
+def go_service() -> Dict[str, List[str]]:
+    grouped = {
+        "": ["go.mod", "go.sum", "Makefile", "README.md", "Dockerfile"],
+        "cmd/server": ["main.go"],
+        "cmd/worker": ["main.go"],
+    }
+    for package in ["auth", "billing", "orders", "users", "inventory", "notifications"]:
+        names = ["handler", "service", "repository", "model"]
+        grouped[f"internal/{package}"] = [f"{name}{suffix}" for name in names for suffix in [".go", "_test.go"]]
+        grouped[f"api/proto/{package}/v1"] = [f"{package}.pb.go", f"{package}_grpc.pb.go", f"{package}.pb.gw.go"]
+    grouped["migrations"] = [f"{number:04d}_migration_{number}.sql" for number in range(1, 60)]
+    return grouped
+
+
+def maven_project() -> Dict[str, List[str]]:
+    grouped = {"": ["pom.xml", "README.md", "mvnw", "mvnw.cmd"]}
+    base = "src/main/java/com/example/shop"
+    test_base = "src/test/java/com/example/shop"
+    for package in ["controller", "service", "repository", "dto", "entity", "config", "exception"]:
+        classes = [f"{entity}{package.capitalize()}.java" for entity in ["Order", "Product", "Customer", "Invoice"]]
+        grouped[f"{base}/{package}"] = classes
+        grouped[f"{test_base}/{package}"] = [name.replace(".java", "Test.java") for name in classes]
+    grouped["src/main/resources"] = ["application.yml", "application-dev.yml", "application-prod.yml", "logback.xml"]
+    grouped["src/main/resources/db/changelog"] = [f"changelog-{number}.xml" for number in range(1, 41)]
+    return grouped
+
+
+def typescript_monorepo() -> Dict[str, List[str]]:
+    grouped = {"": ["package.json", "pnpm-workspace.yaml", "tsconfig.base.json", "README.md", ".eslintrc.js"]}
+    for package in ["web", "admin", "api-client", "ui-kit", "utils"]:
+        grouped[f"packages/{package}"] = ["package.json", "tsconfig.json", "README.md"]
+        for folder in ["components", "hooks", "pages"]:
+            names = [f"{name}{folder.capitalize()[:-1]}" for name in ["User", "Order", "Cart", "Search", "Settings"]]
+            grouped[f"packages/{package}/src/{folder}"] = [
+                f"{name}{suffix}" for name in names for suffix in [".tsx", ".test.tsx"]
+            ]
+        grouped[f"packages/{package}/src/icons"] = [f"icon-{number}.svg" for number in range(120)]
+    return grouped
+
+
+def real_repository(root: Path) -> Dict[str, List[str]]:
+    return walk_files(root, IgnoreMatcher.for_repository(root))
+
+
+def count_tokens_factory() -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        print("tiktoken is not installed, estimating 4 characters per token\n")
+        return estimate_tokens
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def render(output_format: str, grouped: Dict[str, List[str]]) -> str:
+    format_row = get_formatter(output_format, grouped.keys())
+    rows = build_rows(grouped, max_depth=0, collapse_threshold=0)
+    return get_header(output_format, "/repo") + "".join(format_row(row) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", type=Path, action="append", default=[], help="A repository to list (repeatable)")
+    parser.add_argument("--show", choices=FORMATS, default=None, help="Print the rendering of each shape in a format")
+    args = parser.parse_args()
+
+    count_tokens = count_tokens_factory()
+    shapes = {
+        "go service": go_service(),
+        "maven project": maven_project(),
+        "typescript monorepo": typescript_monorepo(),
+    }
+    for root in args.root or [Path(__file__).resolve().parent.parent]:
+        shapes[f"{root.name} (real)"] = real_repository(root)
+
+    print(f"{'shape':<28} {'files':>7} {'grouped tok':>12} {'tree tok':>9} {'saved':>6}")
+    for name, grouped in shapes.items():
+        files = sum(len(names) for names in grouped.values())
+        tokens = {output_format: count_tokens(render(output_format, grouped)) for output_format in FORMATS}
+        saved = 1 - tokens[FORMAT_TREE] / tokens[FORMAT_GROUPED]
+        print(f"{name:<28} {files:>7,} {tokens[FORMAT_GROUPED]:>12,} {tokens[FORMAT_TREE]:>9,} {saved:>6.0%}")
+
+        if args.show:
+            print(render(args.show, grouped))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: paging through a large file with Read-File
+
+Writes a synthetic SQL dump and reads it from start to end in windows of --window lines, the way
+an agent pages through a file with ``line_number=0``, ``200``, ``400``, ... It compares the
+original ``readlines()`` implementation, which reads the whole file again for every window, with
+the memory-mapped reads over the cached line-offset index in ``agents.tools.file_tool``. Both
+must return the same windows.
+
+Usage:
+    PYTHONPATH=src uv run python benchmarks/bench_read_paging.py --lines 200000
+    PYTHONPATH=src uv run python benchmarks/bench_read_paging.py --lines 1000000 --window 500 --skip-legacy
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+import tracemalloc
+
+from agents.tools.file_tool.line_index import read_lines
+
+
+def write_dump(path: str, lines: int) -> None:
+    with open(path, "w") as file:
+        for number in range(lines):
+            file.write(f"INSERT INTO orders VALUES ({number}, 'customer-{number % 977}', {number * 31 % 10007});\n")
+
+
+def legacy_window(path: str, start: int, count: int) -> str:
+    """The original ``FileReadTool._run`` read."""
+    with open(path, "r") as file:
+        lines = file.readlines()
+        if start > 0:
+            lines = lines[start:]
+        if count > 0:
+            lines = lines[:count]
+
+    return "".join(lines)
+
+
+def indexed_window(path: str, start: int, count: int) -> str:
+    return read_lines(path, start, count).text
+
+
+def page_through(read, path: str, lines: int, window: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    # Windows are hashed rather than kept, so the peak only measures the reads
+    digest = hashlib.blake2b()
+    for line in range(0, lines, window):
+        digest.update(read(path, line, window).encode())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak, digest.digest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000, help="Lines in the synthetic file")
+    parser.add_argument("--window", type=int, default=200, help="Lines per read")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only measure the indexed reads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-read-paging-") as directory:
+        path = os.path.join(directory, "dump.sql")
+        write_dump(path, args.lines)
+        size = os.path.getsize(path)
+        pages = -(-args.lines // args.window)
+        print(f"File: {args.lines:,} lines, {size / 1024 / 1024:.1f} MB, read in {pages:,} windows of {args.window}")
+
+        indexed_time, indexed_peak, indexed_digest = page_through(indexed_window, path, args.lines, args.window)
+        print(f"mmap + line index: {indexed_time:.3f}s, peak {indexed_peak / 1024 / 1024:.1f} MB")
+
+        if not args.skip_legacy:
+            legacy_time, legacy_peak, legacy_digest = page_through(legacy_window, path, args.lines, args.window)
+            if legacy_digest != indexed_digest:
+                raise SystemExit("Windows differ between the readlines() and indexed reads")
+            print(f"readlines():       {legacy_time:.3f}s, peak {legacy_peak / 1024 / 1024:.1f} MB (identical output)")
+            print(f"speedup:           {legacy_time / indexed_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import asyncio
+import hashlib
+import json
 import time
+from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from opentelemetry import trace
 from pydantic import BaseModel, Field
@@ -13,9 +16,21 @@ from pydantic_ai.providers.gemini import GeminiProvider
 from pydantic_ai.settings import ModelSettings
 
 import config
-from utils import Logger, PromptManager, create_retrying_client
-
-from .tools import FileReadTool, ListFilesTool
+from utils import Logger, PromptManager, get_http_client_manager
+
+from .tools import (
+    FileBatchReadTool,
+    FileReadTool,
+    ListFilesTool,
+    RelevanceIndex,
+    RelevantCodeTool,
+    RepositoryIndex,
+    SearchCodeTool,
+    SymbolIndex,
+    SymbolReadTool,
+    TrigramIndex,
+    run_io,
+)
 
 
 class AnalyzerAgentConfig(BaseModel):
@@ -25,6 +40,7 @@ class AnalyzerAgentConfig(BaseModel):
     exclude_dependencies: bool = Field(default=False, description="Exclude dependencies analysis")
     exclude_request_flow: bool = Field(default=False, description="Exclude request flow analysis")
     exclude_api_analysis: bool = Field(default=False, description="Exclude api analysis")
+    force: bool = Field(default=False, description="Re-run analyses whose inputs are unchanged since their last run")
 
 
 class AnalyzerResult(BaseModel):
@@ -34,6 +50,12 @@ class AnalyzerResult(BaseModel):
 class AnalyzerAgent:
     def __init__(self, cfg: AnalyzerAgentConfig) -> None:
         self._config = cfg
+        self._repo_index: Optional[RepositoryIndex] = None
+        self._symbol_index: Optional[SymbolIndex] = None
+        self._trigram_index: Optional[TrigramIndex] = None
+        self._relevance_index: Optional[RelevanceIndex] = None
+        self._tree_hash: Optional[str] = None
+        self._state: Dict[str, dict] = {}
 
         self._prompt_manager = PromptManager(file_path=Path(__file__).parent / "prompts" / "analyzer.yaml")
 
@@ -48,70 +70,111 @@ class AnalyzerAgent:
         ):
             raise ValueError("All analysis options are excluded")
 
-    async def run(self):
+    async def run(
+        self,
+        repo_index: Optional[RepositoryIndex] = None,
+        trigram_index: Optional[TrigramIndex] = None,
+    ):
         Logger.info("Starting analyzer agent")
+        # Shared by the tools of every agent so the repository is walked only once per run
+        self._repo_index = repo_index
+        self._symbol_index = SymbolIndex(repo_index)
+        self._trigram_index = trigram_index
+        self._relevance_index = RelevanceIndex(
+            self._symbol_index,
+            cache_path=(
+                RelevanceIndex.cache_path_for(self._config.repo_path)
+                if config.REPO_INDEX_RELEVANCE_CACHE_ENABLED
+                else None
+            ),
+        )
+        if repo_index is not None and config.ANALYZER_SKIP_UNCHANGED:
+            self._tree_hash = await run_io(repo_index.tree_hash)
+            self._state = self._load_state()
+
         tasks = []
+        task_files = []  # The analysis file of each task, as the tasks are coroutines
         analysis_files = []
 
         if not self._config.exclude_code_structure:
             analysis_files.append(
                 self._config.repo_path / ".ai" / "docs" / "structure_analysis.md",
             )
-            tasks.append(
-                self._run_agent(
-                    agent=self._structure_analyzer_agent,
-                    user_prompt=self._render_prompt("agents.structure_analyzer.user_prompt"),
-                    file_path=self._config.repo_path / ".ai" / "docs" / "structure_analysis.md",
+            inputs_hash = self._inputs_hash("agents.structure_analyzer")
+            if not self._is_unchanged(analysis_files[-1], inputs_hash):
+                tasks.append(
+                    self._run_agent(
+                        agent=self._structure_analyzer_agent,
+                        user_prompt=self._render_prompt("agents.structure_analyzer.user_prompt"),
+                        file_path=self._config.repo_path / ".ai" / "docs" / "structure_analysis.md",
+                        inputs_hash=inputs_hash,
+                    )
                 )
-            )
+                task_files.append(analysis_files[-1])
 
         if not self._config.exclude_dependencies:
             analysis_files.append(
                 self._config.repo_path / ".ai" / "docs" / "dependency_analysis.md",
             )
-            tasks.append(
-                self._run_agent(
-                    agent=self._dependency_analyzer_agent,
-                    user_prompt=self._render_prompt("agents.dependency_analyzer.user_prompt"),
-                    file_path=self._config.repo_path / ".ai" / "docs" / "dependency_analysis.md",
+            inputs_hash = self._inputs_hash("agents.dependency_analyzer")
+            if not self._is_unchanged(analysis_files[-1], inputs_hash):
+                tasks.append(
+                    self._run_agent(
+                        agent=self._dependency_analyzer_agent,
+                        user_prompt=self._render_prompt("agents.dependency_analyzer.user_prompt"),
+                        file_path=self._config.repo_path / ".ai" / "docs" / "dependency_analysis.md",
+                        inputs_hash=inputs_hash,
+                    )
                 )
-            )
+                task_files.append(analysis_files[-1])
 
         if not self._config.exclude_data_flow:
             analysis_files.append(
                 self._config.repo_path / ".ai" / "docs" / "data_flow_analysis.md",
             )
-            tasks.append(
-                self._run_agent(
-                    agent=self._data_flow_analyzer_agent,
-                    user_prompt=self._render_prompt("agents.data_flow_analyzer.user_prompt"),
-                    file_path=self._config.repo_path / ".ai" / "docs" / "data_flow_analysis.md",
+            inputs_hash = self._inputs_hash("agents.data_flow_analyzer")
+            if not self._is_unchanged(analysis_files[-1], inputs_hash):
+                tasks.append(
+                    self._run_agent(
+                        agent=self._data_flow_analyzer_agent,
+                        user_prompt=self._render_prompt("agents.data_flow_analyzer.user_prompt"),
+                        file_path=self._config.repo_path / ".ai" / "docs" / "data_flow_analysis.md",
+                        inputs_hash=inputs_hash,
+                    )
                 )
-            )
+                task_files.append(analysis_files[-1])
 
         if not self._config.exclude_request_flow:
             analysis_files.append(
                 self._config.repo_path / ".ai" / "docs" / "request_flow_analysis.md",
             )
-            tasks.append(
-                self._run_agent(
-                    agent=self._request_flow_analyzer_agent,
-                    user_prompt=self._render_prompt("agents.request_flow_analyzer.user_prompt"),
-                    file_path=self._config.repo_path / ".ai" / "docs" / "request_flow_analysis.md",
+            inputs_hash = self._inputs_hash("agents.request_flow_analyzer")
+            if not self._is_unchanged(analysis_files[-1], inputs_hash):
+                tasks.append(
+                    self._run_agent(
+                        agent=self._request_flow_analyzer_agent,
+                        user_prompt=self._render_prompt("agents.request_flow_analyzer.user_prompt"),
+                        file_path=self._config.repo_path / ".ai" / "docs" / "request_flow_analysis.md",
+                        inputs_hash=inputs_hash,
+                    )
                 )
-            )
+                task_files.append(analysis_files[-1])
 
         if not self._config.exclude_api_analysis:
             analysis_files.append(
                 self._config.repo_path / ".ai" / "docs" / "api_analysis.md",
             )
-            tasks.append(
-                self._run_agent(
-                    agent=self._api_analyzer_agent,
-                    user_prompt=self._render_prompt("agents.api_analyzer.user_prompt"),
-                    file_path=self._config.repo_path / ".ai" / "docs" / "api_analysis.md",
+            inputs_hash = self._inputs_hash("agents.api_analyzer")
+            if not self._is_unchanged(analysis_files[-1], inputs_hash):
+                tasks.append(
+                    self._run_agent(
+                        agent=self._api_analyzer_agent,
+                        user_prompt=self._render_prompt("agents.api_analyzer.user_prompt"),
+                        file_path=self._config.repo_path / ".ai" / "docs" / "api_analysis.md",
+                        inputs_hash=inputs_hash,
+                    )
                 )
-            )
+                task_files.append(analysis_files[-1])
 
         Logger.debug("Running all agents")
 
@@ -124,12 +187,12 @@ class AnalyzerAgent:
         for i, result in enumerate(results):
             if isinstance(result, Exception):
                 Logger.error(
-                    f"Agent {tasks[i].agent.name} failed: {result}",
+                    f"Analysis {task_files[i].name} failed: {result}",
                     exc_info=True,
                 )
             else:
                 Logger.info(
-                    f"Agent {tasks[i].agent.name} completed successfully",
+                    f"Analysis {task_files[i].name} completed successfully",
                 )
 
         self.validate_succession(analysis_files)
@@ -158,7 +221,7 @@ class AnalyzerAgent:
         )
         # Continue without raising error - partial results are better than no results
 
-    async def _run_agent(self, agent: Agent, user_prompt: str, file_path: Path):
+    async def _run_agent(self, agent: Agent, user_prompt: str, file_path: Path, inputs_hash: Optional[str] = None):
         trace.get_current_span().add_event(name=f"Running {agent.name}", attributes={"agent_name": agent.name})
 
         try:
@@ -191,6 +254,9 @@ class AnalyzerAgent:
                 Logger.info(f"{agent.name} result saved to {file_path}")
                 trace.get_current_span().set_attribute(f"{agent.name} result", result.output.markdown_content)
 
+            if inputs_hash is not None:
+                self._save_state(file_path, inputs_hash)
+
         except UnexpectedModelBehavior as e:
             Logger.info(f"Unexpected model behavior: {e}")
             raise e
@@ -200,7 +266,8 @@ class AnalyzerAgent:
 
     @property
     def _llm_model(self) -> Tuple[Model, ModelSettings]:
-        retrying_http_client = create_retrying_client()
+        # Shared with the other analyzers and the documenter, so connections are reused
+        retrying_http_client = get_http_client_manager().get_client()
 
         model = GeminiModel(
             model_name=config.ANALYZER_LLM_MODEL,
@@ -232,8 +299,11 @@ class AnalyzerAgent:
             retries=config.ANALYZER_AGENT_RETRIES,
             system_prompt=self._render_prompt("agents.structure_analyzer.system_prompt"),
             tools=[
-                FileReadTool().get_tool(),
-                ListFilesTool().get_tool(),
+                FileReadTool(repo_index=self._repo_index).get_tool(),
+                FileBatchReadTool(repo_index=self._repo_index).get_tool(),
+                SymbolReadTool(symbol_index=self._symbol_index).get_tool(),
+                SearchCodeTool(repo_index=self._repo_index, trigram_index=self._trigram_index).get_tool(),
+                ListFilesTool(repo_index=self._repo_index).get_tool(),
             ],
             instrument=True,
         )
@@ -250,8 +320,12 @@ class AnalyzerAgent:
             retries=config.ANALYZER_AGENT_RETRIES,
             system_prompt=self._render_prompt("agents.data_flow_analyzer.system_prompt"),
             tools=[
-                FileReadTool().get_tool(),
-                ListFilesTool().get_tool(),
+                FileReadTool(repo_index=self._repo_index).get_tool(),
+                FileBatchReadTool(repo_index=self._repo_index).get_tool(),
+                SymbolReadTool(symbol_index=self._symbol_index).get_tool(),
+                SearchCodeTool(repo_index=self._repo_index, trigram_index=self._trigram_index).get_tool(),
+                RelevantCodeTool(relevance_index=self._relevance_index).get_tool(),
+                ListFilesTool(repo_index=self._repo_index).get_tool(),
             ],
             instrument=True,
         )
@@ -268,8 +342,11 @@ class AnalyzerAgent:
             retries=config.ANALYZER_AGENT_RETRIES,
             system_prompt=self._render_prompt("agents.dependency_analyzer.system_prompt"),
             tools=[
-                FileReadTool().get_tool(),
-                ListFilesTool().get_tool(),
+                FileReadTool(repo_index=self._repo_index).get_tool(),
+                FileBatchReadTool(repo_index=self._repo_index).get_tool(),
+                SymbolReadTool(symbol_index=self._symbol_index).get_tool(),
+                SearchCodeTool(repo_index=self._repo_index, trigram_index=self._trigram_index).get_tool(),
+                ListFilesTool(repo_index=self._repo_index).get_tool(),
             ],
             instrument=True,
         )
@@ -286,8 +363,12 @@ class AnalyzerAgent:
             retries=config.ANALYZER_AGENT_RETRIES,
             system_prompt=self._render_prompt("agents.request_flow_analyzer.system_prompt"),
             tools=[
-                FileReadTool().get_tool(),
-                ListFilesTool().get_tool(),
+                FileReadTool(repo_index=self._repo_index).get_tool(),
+                FileBatchReadTool(repo_index=self._repo_index).get_tool(),
+                SymbolReadTool(symbol_index=self._symbol_index).get_tool(),
+                SearchCodeTool(repo_index=self._repo_index, trigram_index=self._trigram_index).get_tool(),
+                RelevantCodeTool(relevance_index=self._relevance_index).get_tool(),
+                ListFilesTool(repo_index=self._repo_index).get_tool(),
             ],
             instrument=True,
         )
@@ -304,13 +385,71 @@ class AnalyzerAgent:
             retries=config.ANALYZER_AGENT_RETRIES,
             system_prompt=self._render_prompt("agents.api_analyzer.system_prompt"),
             tools=[
-                FileReadTool().get_tool(),
-                ListFilesTool().get_tool(),
+                FileReadTool(repo_index=self._repo_index).get_tool(),
+                FileBatchReadTool(repo_index=self._repo_index).get_tool(),
+                SymbolReadTool(symbol_index=self._symbol_index).get_tool(),
+                SearchCodeTool(repo_index=self._repo_index, trigram_index=self._trigram_index).get_tool(),
+                ListFilesTool(repo_index=self._repo_index).get_tool(),
             ],
             mcp_servers=[],
             instrument=True,
         )
 
+    @property
+    def _state_path(self) -> Path:
+        return self._config.repo_path / ".ai" / "docs" / ".analysis_state.json"
+
+    def _inputs_hash(self, prompt_prefix: str) -> Optional[str]:
+        """Hash everything an analysis depends on: the repository, its prompts and the model settings."""
+        if self._tree_hash is None:
+            return None
+
+        inputs = {
+            "tree_hash": self._tree_hash,
+            "version": config.VERSION,
+            "model": config.ANALYZER_LLM_MODEL,
+            "temperature": config.ANALYZER_LLM_TEMPERATURE,
+            "max_tokens": config.ANALYZER_LLM_MAX_TOKENS,
+            "system_prompt": self._render_prompt(f"{prompt_prefix}.system_prompt"),
+            "user_prompt": self._render_prompt(f"{prompt_prefix}.user_prompt"),
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def _is_unchanged(self, file_path: Path, inputs_hash: Optional[str]) -> bool:
+        if inputs_hash is None or self._config.force or not file_path.exists():
+            return False
+
+        if self._state.get(file_path.name, {}).get("inputs_hash") != inputs_hash:
+            return False
+
+        Logger.info(f"Skipping {file_path.name}: repository and prompts unchanged since its last analysis")
+        return True
+
+    def _load_state(self) -> Dict[str, dict]:
+        try:
+            with open(self._state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            Logger.warning(f"Ignoring the unreadable analysis state {self._state_path}: {e}")
+            return {}
+
+        return state if isinstance(state, dict) else {}
+
+    def _save_state(self, file_path: Path, inputs_hash: str) -> None:
+        self._state[file_path.name] = {
+            "inputs_hash": inputs_hash,
+            "tree_hash": self._tree_hash,
+            "analyzed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            with open(self._state_path, "w") as f:
+                json.dump(self._state, f, indent=2, sort_keys=True)
+        except OSError as e:
+            # The analysis is still saved; the next run just repeats it
+            Logger.warning(f"Failed to save the analysis state {self._state_path}: {e}")
+
     def _render_prompt(self, prompt_name: str) -> str:
         template_vars = {
             "repo_path": str(self._config.repo_path),
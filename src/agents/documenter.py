@@ -11,10 +11,10 @@ from pydantic_ai.models.gemini import GeminiModel
 from pydantic_ai.settings import ModelSettings
 
 import config
-from utils import Logger, PromptManager, create_retrying_client
+from utils import Logger, PromptManager, get_http_client_manager
 from utils.custom_models.gemini_provider import CustomGeminiGLA
 
-from .tools import FileReadTool
+from .tools import FileBatchReadTool, FileReadTool
 
 
 class DocumenterResult(BaseModel):
@@ -123,7 +123,7 @@ class DocumenterAgent:
 
     @property
     def _llm_model(self) -> Tuple[Model, ModelSettings]:
-        retrying_http_client = create_retrying_client()
+        retrying_http_client = get_http_client_manager().get_client()
 
         model_name = config.DOCUMENTER_LLM_MODEL
         base_url = config.DOCUMENTER_LLM_BASE_URL
@@ -160,6 +160,7 @@ class DocumenterAgent:
             system_prompt=self._render_prompt("agents.documenter.system_prompt"),
             tools=[
                 FileReadTool().get_tool(),
+                FileBatchReadTool().get_tool(),
             ],
             instrument=True,
         )
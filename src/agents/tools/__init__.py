@@ -1,4 +1,27 @@
 from .dir_tool import ListFilesTool
-from .file_tool import FileReadTool
+from .file_tool import FileBatchReadTool, FileReadTool, content_cache
+from .io_executor import get_io_executor, run_in_io_executor, run_io
+from .repo_index import GitObjectStore, IgnoreMatcher, IgnoreRules, Manifest, RepositoryIndex
+from .search_tool import RelevanceIndex, RelevantCodeTool, SearchCodeTool, TrigramIndex
+from .symbol_tool import SymbolIndex, SymbolReadTool
 
-__all__ = ["ListFilesTool", "FileReadTool"]
+__all__ = [
+    "ListFilesTool",
+    "FileReadTool",
+    "FileBatchReadTool",
+    "GitObjectStore",
+    "IgnoreMatcher",
+    "IgnoreRules",
+    "Manifest",
+    "RelevanceIndex",
+    "RelevantCodeTool",
+    "RepositoryIndex",
+    "SearchCodeTool",
+    "TrigramIndex",
+    "SymbolIndex",
+    "SymbolReadTool",
+    "content_cache",
+    "get_io_executor",
+    "run_in_io_executor",
+    "run_io",
+]
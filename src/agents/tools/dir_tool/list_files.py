@@ -1,223 +1,27 @@
 import os
-from collections import defaultdict
-from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from opentelemetry import trace
-from pydantic_ai import Tool
+from pydantic_ai import ModelRetry, Tool
 
 import config
 from utils import Logger
 
-
-DEFAULT_IGNORED_DIRS = [
-    # Version Control
-    ".git",  # Git repository metadata
-    ".svn",  # Subversion metadata
-    ".hg",  # Mercurial metadata
-    # Development Environment
-    ".venv",  # Python virtual environment
-    ".old-venv",  # Old Python virtual environment backup
-    "venv",  # Python virtual environment (common name)
-    "env",  # Python virtual environment (common name)
-    ".idea",  # JetBrains IDE configuration files
-    ".vscode",  # Visual Studio Code settings
-    ".eclipse",  # Eclipse IDE files
-    # Runtime/Build Artifacts
-    "__pycache__",  # Python bytecode cache files
-    "node_modules",  # Node.js dependencies
-    "target",  # Maven/Gradle build output (Java)
-    "build",  # Generic build output
-    "dist",  # Distribution files
-    "out",  # Output directory
-    ".next",  # Next.js build output
-    ".nuxt",  # Nuxt.js build output
-    ".output",  # Nitro output
-    # Language/Framework Specific
-    # Python
-    ".tox",  # Tox environments
-    ".nox",  # Nox environments
-    ".pytest_cache",  # Pytest cache
-    ".mypy_cache",  # MyPy cache
-    ".pyre",  # Pyre type checker
-    ".pytype",  # Pytype static analyzer
-    "site-packages",  # Python packages
-    ".eggs",  # Python eggs
-    "wheels",  # Python wheels directory
-    # Go
-    "vendor",  # Go vendor dependencies
-    ".mod",  # Go module cache
-    "go.work.sum",  # Go workspace sum
-    # Java/JVM
-    ".gradle",  # Gradle cache
-    ".m2",  # Maven local repository
-    ".metadata",  # Eclipse metadata
-    ".recommenders",  # Eclipse recommenders
-    "bin",  # Java compiled classes
-    "gen",  # Generated sources
-    # Node.js/JavaScript
-    ".npm",  # NPM cache
-    ".yarn",  # Yarn cache
-    "yarn-error.log",  # Yarn error logs
-    ".pnpm-store",  # PNPM store
-    ".turbo",  # Turborepo cache
-    ".rush",  # Rush.js cache
-    "lerna-debug.log*",  # Lerna debug logs
-    ".eslintcache",  # ESLint cache
-    ".parcel-cache",  # Parcel cache
-    ".cache",  # General cache
-    "coverage",  # Coverage reports
-    # PHP
-    ".phpunit.result.cache",  # PHPUnit cache
-    "composer.phar",  # Composer executable
-    ".phplint-cache",  # PHP Lint cache
-    # Framework Specific
-    "bower_components",  # Bower components
-    ".bundle",  # Ruby bundle
-    "Pods",  # iOS CocoaPods
-    "DerivedData",  # Xcode derived data
-    ".cargo",  # Rust cargo
-    ".stack-work",  # Haskell Stack
-    "elm-stuff",  # Elm packages
-    "_site",  # Jekyll/Static site generators
-    # Infrastructure/Deployment
-    "k8s",  # Kubernetes configuration files
-    ".terraform",  # Terraform state
-    ".docker",  # Docker build context
-    # Documentation/Generated
-    "docs/_build",  # Sphinx documentation build
-    "site",  # MkDocs site
-    # Logging/Output
-    "logs",  # Application log files
-    ".logs",  # Hidden log directory
-    "log",  # Log directory
-    # Static Assets
-    "assets",  # Static files (images, fonts, etc.)
-    "public",  # Public web assets (when not source)
-    "static",  # Static files
-    # Testing
-    ".coverage",  # Coverage data
-    "htmlcov",  # Coverage HTML reports
-    ".nyc_output",  # NYC coverage output
-    "jest-coverage",  # Jest coverage
-    # OS/System
-    ".DS_Store",  # macOS metadata
-    "Thumbs.db",  # Windows thumbnails
-]
-
-DEFAULT_IGNORED_EXTENSIONS = [
-    # Compiled/Binary Files
-    ".pyc",  # Python bytecode
-    ".pyo",  # Python optimized bytecode
-    ".pyd",  # Python extension module (Windows)
-    ".class",  # Java bytecode
-    ".o",  # Object files
-    ".so",  # Shared libraries (Linux)
-    ".dll",  # Dynamic libraries (Windows)
-    ".dylib",  # Dynamic libraries (macOS)
-    ".exe",  # Executable files
-    ".bin",  # Binary files
-    ".a",  # Static libraries
-    ".lib",  # Library files (Windows)
-    # Other Languages
-    ".beam",  # Erlang/Elixir compiled
-    ".hi",  # Haskell interface files
-    ".cmi",  # OCaml compiled interface
-    ".cmo",  # OCaml compiled object
-    ".cmx",  # OCaml optimized compiled
-    ".rlib",  # Rust library
-    ".pdb",  # Program database (debugging)
-    # Java/JVM Archives
-    ".jar",  # Java archive
-    ".war",  # Web application archive
-    ".ear",  # Enterprise application archive
-    ".aar",  # Android archive
-    # .NET
-    ".mdb",  # Mono debug database
-    # Compressed Archives
-    ".zip",  # ZIP archive
-    ".tar",  # Tar archive
-    ".tar.gz",  # Compressed tar archive
-    ".tgz",  # Compressed tar archive (short)
-    ".tar.bz2",  # Bzip2 compressed tar
-    ".tbz2",  # Bzip2 compressed tar (short)
-    ".tar.xz",  # XZ compressed tar
-    ".rar",  # RAR archive
-    ".7z",  # 7-Zip archive
-    ".gz",  # Gzip compressed
-    ".bz2",  # Bzip2 compressed
-    ".xz",  # XZ compressed
-    # Package Manager Files
-    ".whl",  # Python wheel
-    ".egg",  # Python egg (deprecated)
-    ".phar",  # PHP Archive
-    ".deb",  # Debian package
-    ".rpm",  # RPM package
-    ".msi",  # Windows installer
-    ".dmg",  # macOS disk image
-    ".pkg",  # Package files
-    ".gem",  # Ruby gem
-    ".nupkg",  # NuGet package
-    # Runtime/Cache Files
-    ".log",  # Log files
-    ".tmp",  # Temporary files
-    ".temp",  # Temporary files
-    ".swp",  # Vim swap files
-    ".swo",  # Vim swap files
-    "~",  # Backup files
-    ".bak",  # Backup files
-    ".orig",  # Original files
-    ".cache",  # Cache files
-    ".pid",  # Process ID files
-    # Database Files
-    ".dat",  # Data files
-    ".db",  # Database files
-    ".sqlite",  # SQLite database
-    ".sqlite3",  # SQLite 3 database
-    ".accdb",  # Microsoft Access database (newer)
-    # Configuration/Environment
-    ".env",  # Environment variable files
-    ".env.local",  # Local environment variables
-    ".env.production",  # Production environment variables
-    ".env.development",  # Development environment variables
-    # IDE/Editor Files
-    ".iml",  # IntelliJ module files
-    ".ipr",  # IntelliJ project files
-    ".iws",  # IntelliJ workspace files
-    ".sublime-project",  # Sublime Text project
-    ".sublime-workspace",  # Sublime Text workspace
-    ".vscode",  # VS Code settings (file)
-    # OS/System Files
-    ".DS_Store",  # macOS metadata
-    "Thumbs.db",  # Windows thumbnails
-    "desktop.ini",  # Windows desktop settings
-    ".localized",  # macOS localization
-    # Media Files (often not needed for code analysis)
-    ".jpg",  # JPEG image
-    ".jpeg",  # JPEG image
-    ".png",  # PNG image
-    ".gif",  # GIF image
-    ".bmp",  # Bitmap image
-    ".svg",  # SVG image (keeping minimal, might be needed)
-    ".ico",  # Icon files
-    ".mp3",  # Audio files
-    ".mp4",  # Video files
-    ".avi",  # Video files
-    ".mov",  # Video files
-    ".pdf",  # PDF files
-    ".doc",  # Word documents
-    ".docx",  # Word documents
-    ".xls",  # Excel files
-    ".xlsx",  # Excel files
-    ".ppt",  # PowerPoint files
-    ".pptx",  # PowerPoint files
-    # Font Files
-    ".ttf",  # TrueType fonts
-    ".otf",  # OpenType fonts
-    ".woff",  # Web fonts
-    ".woff2",  # Web fonts
-    ".eot",  # Embedded fonts
-]
+from ..io_executor import run_in_io_executor
+from ..repo_index import (
+    DEFAULT_IGNORED_DIRS,
+    DEFAULT_IGNORED_EXTENSIONS,
+    KIND_TEXT,
+    SOURCE_GIT,
+    IgnoreMatcher,
+    IgnoreRules,
+    RepositoryIndex,
+    detect_language,
+    walk_files,
+    walk_git_files,
+)
+from .listing import auto_depth, build_rows, paginate
+from .render import format_size, get_formatter, get_header
 
 
 class ListFilesTool:
@@ -225,72 +29,193 @@ class ListFilesTool:
         self,
         ignored_dirs: Optional[List[str]] = DEFAULT_IGNORED_DIRS,
         ignored_extensions: Optional[List[str]] = DEFAULT_IGNORED_EXTENSIONS,
+        repo_index: Optional[RepositoryIndex] = None,
+        source: str = config.TOOL_LIST_FILES_SOURCE,
+        output_format: str = config.TOOL_LIST_FILES_FORMAT,
     ):
         self.ignored_dirs = ignored_dirs or []
         self.ignored_extensions = ignored_extensions or []
+        self._repo_index = repo_index
+        self._source = source
+        self._output_format = output_format
 
     def get_tool(self):
-        return Tool(self._run, name="List-Files-Tool", takes_ctx=False, max_retries=config.TOOL_LIST_FILES_MAX_RETRIES)
-
-    def _run(self, directory: str) -> Any:
+        return Tool(
+            run_in_io_executor(self._run),
+            name="List-Files-Tool",
+            takes_ctx=False,
+            max_retries=config.TOOL_LIST_FILES_MAX_RETRIES,
+        )
+
+    def _run(
+        self,
+        directory: str,
+        max_depth: Optional[int] = None,
+        cursor: Optional[str] = None,
+        token_budget: Optional[int] = None,
+        details: bool = False,
+    ) -> Any:
         """List files in a directory recursively, grouping them by directory.
 
         This function walks through the directory tree starting from the given path,
         collecting all files and organizing them by their parent directories.
-        It skips any directories specified in the ignored_dirs list.
+        It skips any directories specified in the ignored_dirs list, or excluded by .gitignore
+        files, without descending into them.
+        Directories inside the repository index are listed from memory without touching the disk.
+        In git mode the listing comes from `git ls-files` and follows .gitignore instead of the
+        ignore lists, falling back to a filesystem walk outside git work trees.
+
+        Large listings are kept within a token budget. Directories below `max_depth`, and
+        directories with too many files, are collapsed into a one-line summary such as
+        `/src/gen/ (collapsed): 4,213 files (.pb.go ×4,100, .go ×113)`; list a collapsed directory
+        directly to expand it. Whatever does not fit the budget is left for the next page, which
+        is fetched by calling again with the returned cursor.
 
         Args:
             directory (str): The path to the directory to list files from.
+            max_depth (int, optional): Directories this many levels below `directory` are collapsed
+                with everything under them. 0 picks the deepest level that fits the token budget,
+                -1 lists every level. Defaults to the configured depth.
+            cursor (str, optional): The cursor returned by a previous call with the same arguments,
+                to fetch the next page.
+            token_budget (int, optional): Approximate maximum size of the result in tokens.
+                Defaults to the configured budget.
+            details (bool, optional): Annotate every file with its language, kind (generated,
+                minified, vendored) when not plain text, line count and size, e.g.
+                `main.py (Python, 120 lines, 4.1 KB)`, to plan reads before making them.
+                Defaults to False.
 
         Returns:
             str: A formatted string containing the directory structure and files,
                 with files grouped by their parent directories. Each directory's
-                files are listed on a new line, sorted alphabetically.
+                files are listed on a new line, sorted alphabetically. In the tree format,
+                directories are indented under their parents and runs of similar file names are
+                brace-compressed (`test_{a,b}.py`).
 
         Example:
             Files grouped by directory (relative to /path/to/dir):
             /: ['file1.txt', 'file2.txt']
             /subdir: ['file3.txt', 'file4.txt']
+            /vendor/ (collapsed): 1,024 files in 31 directories (.go ×1,000, .md ×24)
         """
-        Logger.debug("Tool Call: List Files", data={"directory": directory})
+        Logger.debug(
+            "Tool Call: List Files",
+            data={
+                "directory": directory,
+                "max_depth": max_depth,
+                "cursor": cursor,
+                "token_budget": token_budget,
+                "details": details,
+            },
+        )
 
         trace.get_current_span().set_attribute("input", directory)
         directory = directory
         if directory[-1] == "/":
             directory = directory[:-1]
 
-        # Group files by directory
-        dir_files = defaultdict(list)
-
-        for root, _, files in os.walk(directory):
-            # Skip ignored directories
-            path_parts = Path(root).parts
-            if self.ignored_dirs and any(ignored_dir in path_parts for ignored_dir in self.ignored_dirs):
-                continue
-
-            # Get relative directory path
-            rel_dir = os.path.relpath(root, directory)
-            if rel_dir == ".":
-                rel_dir = "/"
-            else:
-                rel_dir = "/" + rel_dir
-
-            # Add files to this directory
-            for filename in files:
-                # Skip files with ignored extensions
-                if self.ignored_extensions and any(filename.endswith(ext) for ext in self.ignored_extensions):
-                    continue
-                dir_files[rel_dir].append(filename)
-
-        # Sort directories and files for readability
-        result = f"Files grouped by directory (relative to {directory}):\n"
-
-        for dir_path in sorted(dir_files.keys()):
-            files = sorted(dir_files[dir_path])
-            result += f"\n{dir_path}: {files}\n"
-
-        if not dir_files:
-            result = f"No files found in {directory}."
+        max_depth = config.TOOL_LIST_FILES_MAX_DEPTH if max_depth is None else max_depth
+        token_budget = token_budget or config.TOOL_LIST_FILES_TOKEN_BUDGET
+        collapse_threshold = config.TOOL_LIST_FILES_COLLAPSE_THRESHOLD
+
+        grouped_files = self._repo_index.list_files(directory) if self._repo_index else None
+        hidden_files: Dict[str, int] = {}
+        if grouped_files is not None and config.TOOL_LIST_FILES_HIDDEN_KINDS:
+            grouped_files, hidden_files = self._hide_files(directory, grouped_files)
+        if grouped_files is None and self._source == SOURCE_GIT:
+            grouped_files = walk_git_files(directory)
+        if grouped_files is None:
+            # Ignored directories are pruned during the walk, so they are never descended into
+            grouped_files = walk_files(directory, self._walk_rules(directory), config.REPO_INDEX_WALK_WORKERS)
+
+        hidden_note = ""
+        if hidden_files:
+            counts = ", ".join(f"{count:,} {kind}" for kind, count in sorted(hidden_files.items()))
+            hidden_note = f"\n[Hidden: {counts} file(s)]\n"
+
+        if not grouped_files:
+            result = f"No files found in {directory}.{hidden_note}"
+            trace.get_current_span().set_attribute("output", result)
+            return result
+
+        annotate = (lambda key, name: self._describe_file(directory, key, name)) if details else None
+        format_row = get_formatter(self._output_format, grouped_files.keys(), annotate)
+        if max_depth == 0:
+            # Sized without the file details, which would stat every file at every depth tried
+            estimate_row = get_formatter(self._output_format, grouped_files.keys(), None) if details else format_row
+            max_depth = auto_depth(grouped_files, collapse_threshold, token_budget, estimate_row)
+        rows = build_rows(grouped_files, max(max_depth, 0), collapse_threshold)
+
+        try:
+            page = paginate(rows, cursor, token_budget, format_row)
+        except ValueError as e:
+            raise ModelRetry(message=str(e))
+
+        # Directories and files are sorted for readability
+        result = get_header(self._output_format, directory)
+        result += "".join(format_row(row, page_start=index == 0) for index, row in enumerate(page.rows))
+
+        if page.next_cursor is not None:
+            result += (
+                f"\n[Truncated to fit the token budget, {page.remaining:,} directories left. "
+                f"Call again with cursor={page.next_cursor!r} to continue.]\n"
+            )
+        result += hidden_note
 
         trace.get_current_span().set_attribute("output", result)
         return result
+
+    def _walk_rules(self, directory: str) -> IgnoreRules:
+        if not config.REPO_INDEX_IGNORE_FILES:
+            return IgnoreRules(self.ignored_dirs, self.ignored_extensions)
+
+        # The listed directory is the root of the walk, as the repository is for the index
+        return IgnoreMatcher.for_repository(directory, self.ignored_dirs, self.ignored_extensions)
+
+    def _describe_file(self, directory: str, rel_dir: str, name: str) -> str:
+        path = os.path.join(directory, rel_dir, name)
+
+        # Sizes, line counts and kinds come from the repository index; files outside of it are only stat-ed
+        entry = self._repo_index.get(path) if self._repo_index is not None else None
+        if entry is not None:
+            size, line_count, kind = entry.size, self._repo_index.line_count(path), self._repo_index.kind(path)
+        else:
+            try:
+                size, line_count, kind = os.stat(path).st_size, None, None
+            except OSError:
+                size, line_count, kind = None, None, None
+
+        details = []
+        if language := detect_language(name):
+            details.append(language)
+        if kind is not None and kind != KIND_TEXT:
+            details.append(kind)
+        if line_count is not None:
+            details.append(f"{line_count:,} line{'s' if line_count != 1 else ''}")
+        if size is not None:
+            details.append(format_size(size))
+
+        return f"{name} ({', '.join(details)})" if details else name
+
+    def _hide_files(
+        self,
+        directory: str,
+        grouped_files: Dict[str, List[str]],
+    ) -> Tuple[Dict[str, List[str]], Dict[str, int]]:
+        # Kinds are cached in the index, so only the first listing of a file samples its content
+        hidden_kinds = config.TOOL_LIST_FILES_HIDDEN_KINDS
+        hidden: Dict[str, int] = {}
+        visible: Dict[str, List[str]] = {}
+
+        for rel_dir, names in grouped_files.items():
+            kept = []
+            for name in names:
+                kind = self._repo_index.kind(os.path.join(directory, rel_dir, name))
+                if kind in hidden_kinds:
+                    hidden[kind] = hidden.get(kind, 0) + 1
+                else:
+                    kept.append(name)
+            if kept:
+                visible[rel_dir] = kept
+
+        return visible, hidden
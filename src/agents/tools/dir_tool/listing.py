@@ -0,0 +1,222 @@
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Rough size of a token in characters; close enough for budgeting tool output
+CHARS_PER_TOKEN = 4
+# Separates the directory from the file offset in a cursor; the offset is always present, so a "#" in a
+# directory name is never mistaken for it
+CURSOR_OFFSET_SEPARATOR = "#"
+# File kinds shown in the summary of a collapsed directory
+SUMMARY_KINDS = 3
+# Longest inner suffix treated as part of a compound extension (".pb.go", ".min.js", ".d.ts")
+COMPOUND_SUFFIX_LENGTH = 5
+
+
+class ListingRow(NamedTuple):
+    """One directory of a listing: either its files, or a summary of a collapsed subtree."""
+
+    key: str  # Directory relative to the listed directory, "" for the listed directory itself
+    files: List[str]
+    collapsed: bool = False
+    dir_count: int = 0  # Directories summarized by a collapsed row, besides the row's own
+
+
+class ListingPage(NamedTuple):
+    rows: List[ListingRow]
+    next_cursor: Optional[str]
+    remaining: int  # Rows left after this page
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def file_kind(name: str) -> str:
+    """Return the extension used to group ``name`` in summaries, keeping compound ones like ``.pb.go``."""
+    parts = name.split(".")
+    if len(parts) == 1 or not parts[0] and len(parts) == 2:
+        # No extension, or a dotfile such as ".gitignore"
+        return name if name.startswith(".") else "(no extension)"
+    if len(parts) > 2 and parts[-2] and len(parts[-2]) <= COMPOUND_SUFFIX_LENGTH:
+        return "." + ".".join(parts[-2:])
+    return "." + parts[-1]
+
+
+def summarize_files(files: Iterable[str], dir_count: int = 0) -> str:
+    """Describe a set of files by count and most common kinds, e.g. ``4,213 files (.pb.go ×4,100, .go ×113)``."""
+    kinds = Counter(file_kind(name) for name in files)
+    total = sum(kinds.values())
+
+    summary = f"{total:,} file{'s' if total != 1 else ''}"
+    if dir_count:
+        summary += f" in {dir_count + 1:,} directories"
+
+    common = [f"{kind} ×{count:,}" for kind, count in kinds.most_common(SUMMARY_KINDS)]
+    if len(kinds) > SUMMARY_KINDS:
+        common.append("…")
+    if common:
+        summary += f" ({', '.join(common)})"
+
+    return summary
+
+
+def _depth(key: str) -> int:
+    return key.count("/") + 1 if key else 0
+
+
+def tree_order(key: str) -> List[str]:
+    """Sort key placing every directory right before its subdirectories ("a/b" < "a/b/c" < "a/b-c")."""
+    return key.split("/") if key else []
+
+
+def build_rows(grouped_files: Dict[str, List[str]], max_depth: int, collapse_threshold: int) -> List[ListingRow]:
+    """Turn a grouped listing into sorted rows, collapsing deep and huge directories.
+
+    Args:
+        grouped_files (Dict[str, List[str]]): File names keyed by directory, as returned by ``walk_files``.
+        max_depth (int): Directories at this depth are summarized together with everything below
+            them. 0 lists every level.
+        collapse_threshold (int): Directories with more files than this are summarized instead of
+            listed, except for the listed directory itself. 0 never collapses.
+
+    Returns:
+        List[ListingRow]: One row per listed or collapsed directory, in ``tree_order``.
+    """
+    rows: List[ListingRow] = []
+    subtree: Optional[ListingRow] = None
+
+    for key in sorted(grouped_files, key=tree_order):
+        files = grouped_files[key]
+
+        if subtree is not None and key.startswith(subtree.key + "/"):
+            subtree.files.extend(files)
+            rows[-1] = subtree = subtree._replace(dir_count=subtree.dir_count + 1)
+            continue
+        subtree = None
+
+        depth = _depth(key)
+        if max_depth and depth >= max_depth:
+            # Summarize the ancestor at max_depth, even if it has no files of its own
+            key = "/".join(key.split("/")[:max_depth])
+            subtree = ListingRow(key, list(files), collapsed=True, dir_count=0 if depth == max_depth else 1)
+            rows.append(subtree)
+        elif key and collapse_threshold and len(files) > collapse_threshold:
+            rows.append(ListingRow(key, files, collapsed=True))
+        else:
+            rows.append(ListingRow(key, sorted(files)))
+
+    return rows
+
+
+def auto_depth(
+    grouped_files: Dict[str, List[str]],
+    collapse_threshold: int,
+    token_budget: int,
+    render_row: Callable[[ListingRow], str],
+) -> int:
+    """Return the deepest ``max_depth`` whose listing fits ``token_budget``, 0 if everything fits, or 1.
+
+    Depths are tried from the shallowest, and each one is only rendered until it goes over the
+    budget. ``render_row`` should be cheap, e.g. without per-file details, since it only estimates.
+    """
+    deepest = max((_depth(key) for key in grouped_files), default=0)
+
+    fitting = 1
+    for max_depth in range(1, deepest + 2):
+        used = 0
+        for row in build_rows(grouped_files, max_depth if max_depth <= deepest else 0, collapse_threshold):
+            used += estimate_tokens(render_row(row))
+            if used > token_budget:
+                return fitting
+        fitting = max_depth if max_depth <= deepest else 0
+
+    return fitting
+
+
+def parse_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor into the directory key to resume from and the file offset inside it.
+
+    Raises:
+        ValueError: If the cursor has no offset, or the offset is not a non-negative integer.
+    """
+    key, separator, offset = cursor.rpartition(CURSOR_OFFSET_SEPARATOR)
+    if not separator or not offset.isdigit():
+        raise ValueError(f"Invalid cursor {cursor!r}")
+
+    return key, int(offset)
+
+
+def paginate(
+    rows: List[ListingRow],
+    cursor: Optional[str],
+    token_budget: int,
+    render_row: Callable[[ListingRow], str],
+) -> ListingPage:
+    """Take the rows starting at ``cursor`` that fit into ``token_budget``.
+
+    Cursors are the key of the first row not returned and the offset of its first file not
+    returned, which is only non-zero when a single row larger than the budget is split between
+    pages.
+
+    Raises:
+        ValueError: If ``cursor`` is malformed, or does not point into ``rows``: it was returned for
+            another listing, or the directory it resumes from changed since.
+    """
+    start, offset = 0, 0
+    if cursor:
+        key, offset = parse_cursor(cursor)
+        start = bisect_left(rows, tree_order(key), key=lambda row: tree_order(row.key))
+        row = rows[start] if start < len(rows) else None
+        if row is None or row.key != key or offset and (row.collapsed or offset >= len(row.files)):
+            raise ValueError(
+                f"Cursor {cursor!r} does not belong to this listing, or the directory changed since. "
+                "Call again without a cursor to start over."
+            )
+
+    page: List[ListingRow] = []
+    used = 0
+
+    for index in range(start, len(rows)):
+        row = rows[index]
+        if offset:
+            row = row._replace(files=row.files[offset:])
+
+        tokens = estimate_tokens(render_row(row))
+        if used + tokens <= token_budget:
+            page.append(row)
+            used += tokens
+            offset = 0
+            continue
+
+        if page or row.collapsed:
+            if not page:
+                # A summary is short; always make progress
+                return ListingPage([row], _cursor(rows, index + 1, 0), len(rows) - index - 1)
+            return ListingPage(page, _cursor(rows, index, offset), len(rows) - index)
+
+        # The first row alone is over budget: split its files
+        taken = _fitting_files(row, token_budget, render_row)
+        page.append(row._replace(files=row.files[:taken]))
+        return ListingPage(page, _cursor(rows, index, offset + taken), len(rows) - index)
+
+    return ListingPage(page, None, 0)
+
+
+def _cursor(rows: List[ListingRow], index: int, offset: int) -> Optional[str]:
+    if index >= len(rows):
+        return None
+    return f"{rows[index].key}{CURSOR_OFFSET_SEPARATOR}{offset}"
+
+
+def _fitting_files(row: ListingRow, token_budget: int, render_row: Callable[[ListingRow], str]) -> int:
+    # Binary search for the largest prefix of the files that fits, at least one file
+    low, high = 1, len(row.files)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(render_row(row._replace(files=row.files[:middle]))) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
@@ -0,0 +1,241 @@
+import re
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .listing import ListingRow, summarize_files, tree_order
+
+# Output formats of ListFilesTool
+FORMAT_GROUPED = "grouped"
+FORMAT_TREE = "tree"
+
+# Shortest common prefix worth folding into a brace group
+MIN_BRACE_PREFIX = 3
+# Shortest run of consecutive numbers written as a {first..last} range
+MIN_NUMERIC_RANGE = 3
+BRACE_SPECIAL_CHARS = re.compile(r"[{},]")
+DIGITS = "0123456789"
+TREE_INDENT = "  "
+SIZE_UNITS = ["B", "KB", "MB", "GB"]
+
+# Describes a file given its row key and name, e.g. "main.py (Python, 120 lines, 4.1 KB)"
+Annotate = Callable[[str, str], str]
+
+
+def format_size(size: int) -> str:
+    value = float(size)
+    for unit in SIZE_UNITS[:-1]:
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} {SIZE_UNITS[-1]}"
+
+
+def grouped_header(directory: str) -> str:
+    return f"Files grouped by directory (relative to {directory}):\n"
+
+
+def format_grouped_row(row: ListingRow, page_start: bool = False, annotate: Optional[Annotate] = None) -> str:
+    """Render a row as ``/dir: ['a.py', 'b.py']``, the original List-Files-Tool format."""
+    dir_path = "/" + row.key
+    if row.collapsed:
+        return f"\n{dir_path.rstrip('/')}/ (collapsed): {summarize_files(row.files, row.dir_count)}\n"
+
+    files = [annotate(row.key, name) for name in row.files] if annotate else row.files
+    return f"\n{dir_path}: {files}\n"
+
+
+def tree_header(directory: str) -> str:
+    return (
+        f"Files under {directory}, indented by directory "
+        "(braces expand like a shell: a{b,c}.py = ab.py ac.py, f{1..3}.go = f1.go f2.go f3.go):\n"
+    )
+
+
+class TreeRowFormatter:
+    """Render rows as an indented tree with compressed file names.
+
+    Directories are nested under the nearest ancestor that either has files or is where two
+    branches of the tree meet. Chains of directories in between are folded into one label
+    (``src/main/java/com/acme/``), and branch points without files of their own are printed once
+    as a header before their first row. Sibling files sharing a prefix and an extension are
+    written as one brace group, e.g. ``test_{client,server}.py`` or ``part{0..99}.pb.go``.
+
+    Args:
+        dir_keys (Iterable[str]): The keys of every directory with files, as in ``walk_files``.
+        annotate (Annotate, optional): Describes each file. Annotated files are listed one by one,
+            without brace groups.
+    """
+
+    def __init__(self, dir_keys: Iterable[str], annotate: Optional[Annotate] = None) -> None:
+        self._annotate = annotate
+        keys = sorted(dir_keys, key=tree_order)
+        self._keys = set(keys)
+
+        # Directories without files where the tree branches, and the first key below each
+        children: Dict[str, set] = {}
+        for key in keys:
+            parts = key.split("/") if key else []
+            for depth in range(1, len(parts)):
+                children.setdefault("/".join(parts[:depth]), set()).add(parts[depth])
+        self._branches = {key for key, names in children.items() if len(names) > 1 and key not in self._keys}
+        self._nodes = self._keys | self._branches
+
+        self._first_keys: Dict[str, str] = {}
+        for key in keys:
+            parent = self._parent(key)
+            while parent is not None and parent in self._branches and parent not in self._first_keys:
+                self._first_keys[parent] = key
+                parent = self._parent(parent)
+
+        self._levels: Dict[str, int] = {}
+
+    def __call__(self, row: ListingRow, page_start: bool = False) -> str:
+        """Render ``row``, preceded by the headers of the branch points it opens.
+
+        Args:
+            row (ListingRow): The row to render.
+            page_start (bool, optional): Whether ``row`` starts a page, in which case the headers of
+                all its branch points are repeated for context.
+        """
+        headers = []
+        parent = self._parent(row.key)
+        while parent is not None and parent in self._branches:
+            first_key = self._first_keys[parent]
+            if not page_start and not (first_key == row.key or first_key.startswith(row.key + "/")):
+                break
+            headers.append(f"{self._indent(parent)}{self._label(parent)}/\n")
+            parent = self._parent(parent)
+        headers.reverse()
+
+        label = self._label(row.key)
+        if row.collapsed:
+            line = f"{label}/ (collapsed): {summarize_files(row.files, row.dir_count)}"
+        elif self._annotate:
+            line = f"{label}/: {', '.join(self._annotate(row.key, name) for name in row.files)}"
+        else:
+            line = f"{label}/: {', '.join(compress_names(row.files))}"
+
+        return "".join(headers) + f"{self._indent(row.key)}{line}\n"
+
+    def _parent(self, key: str) -> Optional[str]:
+        while key:
+            key = key.rpartition("/")[0]
+            if key in self._nodes:
+                return key
+        return None
+
+    def _label(self, key: str) -> str:
+        parent = self._parent(key)
+        if not key:
+            return "."
+        return key[len(parent) + 1 :] if parent else key
+
+    def _indent(self, key: str) -> str:
+        return TREE_INDENT * self._level(key)
+
+    def _level(self, key: str) -> int:
+        if key not in self._levels:
+            parent = self._parent(key)
+            self._levels[key] = 0 if parent is None else self._level(parent) + 1
+        return self._levels[key]
+
+
+def compress_names(names: Iterable[str]) -> List[str]:
+    """Fold sorted runs of file names sharing a prefix and an extension into brace groups.
+
+    Example:
+        ```python
+        compress_names(["test_a.py", "test_b.py", "main.go", "m1.go", "m2.go", "m3.go"])
+        # ["m{1..3}.go", "main.go", "test_{a,b}.py"]
+        ```
+    """
+    by_suffix: Dict[str, List[str]] = {}
+    plain: List[str] = []
+
+    for name in names:
+        if BRACE_SPECIAL_CHARS.search(name):
+            plain.append(name)
+            continue
+        stem, dot, extension = name.rpartition(".")
+        if not stem:
+            # No extension, or a dotfile
+            stem, dot, extension = name, "", ""
+        by_suffix.setdefault(dot + extension, []).append(stem)
+
+    # Each entry is (first expanded name, rendered text), sorted by the former for a stable order
+    compressed = [(name, name) for name in plain]
+    for suffix, stems in by_suffix.items():
+        stems.sort()
+        start = 0
+        while start < len(stems):
+            prefix = stems[start]
+            end = start + 1
+
+            # Numbered files ("part1", "part2", ...) share a prefix of any length
+            base = prefix.rstrip(DIGITS)
+            if base != prefix:
+                while end < len(stems) and stems[end].startswith(base) and stems[end][len(base) :].isdigit():
+                    end += 1
+                if end - start > 1:
+                    compressed.append((stems[start] + suffix, _brace(base, stems[start:end], suffix)))
+                    start = end
+                    continue
+
+            while end < len(stems):
+                common = _common_prefix(prefix, stems[end])
+                while common and not (_is_boundary(common, stems[start]) and _is_boundary(common, stems[end])):
+                    common = common[:-1]
+                if len(common) < MIN_BRACE_PREFIX:
+                    break
+                prefix = common
+                end += 1
+            compressed.append((stems[start] + suffix, _brace(prefix, stems[start:end], suffix)))
+            start = end
+
+    return [text for _, text in sorted(compressed)]
+
+
+def _common_prefix(first: str, second: str) -> str:
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return first[:length]
+
+
+def _is_boundary(prefix: str, stem: str) -> bool:
+    # Only fold at word boundaries: "test_{a,b}" and "Order{Hook,Page}", but not "000{1_a,2_b}"
+    rest = stem[len(prefix) :]
+    return not prefix[-1].isalnum() or not rest or not rest[0].isalnum() or rest[0].isupper()
+
+
+def _brace(prefix: str, stems: List[str], suffix: str) -> str:
+    if len(stems) == 1:
+        return stems[0] + suffix
+
+    middles = [stem[len(prefix) :] for stem in stems]
+    if len(middles) >= MIN_NUMERIC_RANGE and all(middle.isdigit() for middle in middles):
+        numbers = sorted(int(middle) for middle in middles)
+        canonical = all(middle == str(int(middle)) for middle in middles)
+        if canonical and numbers[-1] - numbers[0] == len(numbers) - 1:
+            return f"{prefix}{{{numbers[0]}..{numbers[-1]}}}{suffix}"
+        if canonical:
+            middles = [str(number) for number in numbers]
+
+    return f"{prefix}{{{','.join(middles)}}}{suffix}"
+
+
+def get_formatter(name: str, dir_keys: Iterable[str], annotate: Optional[Annotate] = None) -> Callable[..., str]:
+    """Return the row renderer for an output format, defaulting to the grouped format."""
+    if name == FORMAT_TREE:
+        return TreeRowFormatter(dir_keys, annotate)
+    if annotate:
+        return partial(format_grouped_row, annotate=annotate)
+    return format_grouped_row
+
+
+def get_header(name: str, directory: str) -> str:
+    if name == FORMAT_TREE:
+        return tree_header(directory)
+    return grouped_header(directory)
@@ -1,3 +1,15 @@
+from .batch_reader import FileBatchReadTool, FileReadRequest
+from .content_cache import CacheStats, ContentCache, content_cache
 from .file_reader import FileReadTool
+from .lockfiles import DependencySummary, summarize_lockfile
 
-__all__ = ["FileReadTool"]
+__all__ = [
+    "CacheStats",
+    "ContentCache",
+    "DependencySummary",
+    "FileBatchReadTool",
+    "FileReadRequest",
+    "FileReadTool",
+    "content_cache",
+    "summarize_lockfile",
+]
@@ -0,0 +1,117 @@
+import contextvars
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, List, Optional
+
+from opentelemetry import trace
+from pydantic import BaseModel, Field
+from pydantic_ai import ModelRetry, Tool
+
+import config
+from utils import Logger
+
+from ..dir_tool.listing import CHARS_PER_TOKEN
+from ..io_executor import get_io_executor, run_in_io_executor
+from ..repo_index import RepositoryIndex
+from .content_cache import ContentCache, content_cache
+from .file_reader import FileReadTool
+
+
+class FileReadRequest(BaseModel):
+    file_path: str = Field(..., description="The path to the file to read")
+    line_number: int = Field(default=0, description="The starting line number to read from")
+    line_count: int = Field(default=200, description="The number of lines to read")
+
+
+class FileBatchReadTool:
+    def __init__(self, repo_index: Optional[RepositoryIndex] = None, cache: Optional[ContentCache] = content_cache):
+        # Every file is read exactly like a Read-File call, including the checks for binary and minified files
+        self._reader = FileReadTool(repo_index=repo_index, cache=cache)
+
+    def get_tool(self):
+        return Tool(
+            run_in_io_executor(self._run),
+            name="Read-Files",
+            takes_ctx=False,
+            max_retries=config.TOOL_FILE_READER_MAX_RETRIES,
+        )
+
+    def _run(self, files: List[FileReadRequest], token_budget: Optional[int] = None) -> str:
+        """Read several files, or several line ranges of files, in a single call.
+
+        Prefer this over consecutive Read-File calls when you already know which files you need,
+        e.g. the entry points, configuration files or every module of a package. The files are read
+        concurrently and returned in the order they were requested, each one in the same format as
+        Read-File. A file that cannot be read gets an error message in its place without failing the
+        others. Files that do not fit the token budget are listed at the end, to be requested again.
+
+        Args:
+            files (List[FileReadRequest]): The files to read, each with its own line range.
+            token_budget (int, optional): Approximate maximum size of the result in tokens.
+                Defaults to the configured budget.
+
+        Returns:
+            str: The contents of every file that fits the budget, one section per file.
+        """
+        Logger.debug("Tool Call: Read Files", data={"files": [request.file_path for request in files]})
+
+        trace.get_current_span().set_attribute("input", ", ".join(request.file_path for request in files))
+
+        if not files:
+            raise ModelRetry(message="No files requested")
+        if len(files) > config.TOOL_READ_FILES_MAX_FILES:
+            raise ModelRetry(
+                message=f"Too many files requested ({len(files)}), read at most {config.TOOL_READ_FILES_MAX_FILES} "
+                "per call"
+            )
+
+        executor = get_io_executor()
+        budget = (token_budget or config.TOOL_READ_FILES_TOKEN_BUDGET) * CHARS_PER_TOKEN
+        output = ""
+        skipped: List[FileReadRequest] = []
+        pending: Deque[Future] = deque()
+        submitted = 0
+        for index, request in enumerate(files):
+            # Only the next few files are in flight, so nothing far past the budget is read
+            while submitted < min(len(files), index + config.TOOL_READ_FILES_WORKERS):
+                pending.append(executor.submit(contextvars.copy_context().run, self._read, files[submitted]))
+                submitted += 1
+
+            future = pending.popleft()
+            # This call runs on the same executor: a read no worker has picked up yet is done here instead
+            section = self._read(request) if future.cancel() else future.result()
+            if output and len(output) + len(section) > budget:
+                skipped = files[index:]
+                break
+
+            if len(section) > budget:
+                # A single file larger than the whole budget is cut at a line boundary rather than left out
+                cut = section.rfind("\n", 0, budget) + 1 or budget
+                section = (
+                    section[:cut]
+                    + "\n[Cut to fit the token budget. Read the rest with Read-File or a smaller line_count.]\n"
+                )
+            output += section
+            if len(output) >= budget:
+                skipped = files[index + 1 :]
+                break
+
+        for future in pending:
+            future.cancel()
+
+        if skipped:
+            remaining = ", ".join(
+                f"{request.file_path} (line {request.line_number}, {request.line_count} lines)" for request in skipped
+            )
+            output += f"\n[Not read to fit the token budget, call again with: {remaining}]\n"
+
+        trace.get_current_span().set_attribute("output", output)
+        return output
+
+    def _read(self, request: FileReadRequest) -> str:
+        try:
+            content = self._reader._run(request.file_path, request.line_number, request.line_count)
+        except ModelRetry as e:
+            content = f"Error: {e.message}\n"
+
+        return f"=== {request.file_path} ===\n{content}\n"
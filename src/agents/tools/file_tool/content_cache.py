@@ -0,0 +1,136 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, NamedTuple, Tuple
+
+import config
+
+from .line_index import LineIndex
+
+# Files larger than this share of the cache are read through mmap instead, so one file cannot evict all the others
+MAX_FILE_SHARE = 8
+
+
+class CacheStats(NamedTuple):
+    hits: int  # Reads answered from the cache, including reads that waited for another agent's load
+    misses: int  # Reads that loaded the file
+    evictions: int
+    files: int
+    bytes: int
+
+
+class CachedFile(NamedTuple):
+    text: str  # The decoded file, with "\r\n" turned into "\n"
+    index: LineIndex  # Line offsets into ``text``
+    version: Tuple[int, int]  # The mtime and size the file had when it was loaded
+
+    @property
+    def nbytes(self) -> int:
+        # Line offsets grow as the file is read, so only the file itself is accounted for
+        return self.version[1]
+
+
+class ContentCache:
+    """Decoded contents of recently read files, shared by every agent of the process.
+
+    Files are keyed by path and only reused while they keep the mtime and size they had when they
+    were loaded. The cache is bounded by the total size of the files it holds, evicting the least
+    recently used first. Concurrent reads of a file that is not cached yet wait for a single load
+    instead of each reading and decoding it.
+
+    Example:
+        ```python
+        cache = ContentCache(max_bytes=64 * 1024 * 1024)
+        stat_result = os.stat(path)
+        cached = cache.get(path, (stat_result.st_mtime_ns, stat_result.st_size), lambda: Path(path).read_text())
+        cache.stats()  # CacheStats(hits=0, misses=1, evictions=0, files=1, bytes=4213)
+        ```
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._files: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self._loading: Dict[Tuple[str, Tuple[int, int]], Future] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def accepts(self, size: int) -> bool:
+        """Whether a file of ``size`` bytes is small enough to be cached."""
+        return self.max_bytes > 0 and size <= self.max_bytes // MAX_FILE_SHARE
+
+    def get(self, path: str, version: Tuple[int, int], load: Callable[[], str]) -> CachedFile:
+        """Return the cached contents of ``path``, calling ``load`` to read them if they are not cached.
+
+        Args:
+            path (str): The file.
+            version (Tuple[int, int]): The current mtime and size of the file, to tell whether a cached
+                copy is still up to date. Blobs of a pinned commit use their object id in place of the mtime.
+            load (Callable[[], str]): Reads and decodes the file. Only called by one of the threads
+                asking for the same file at the same time; the others wait for its result.
+
+        Returns:
+            CachedFile: The contents, shared between callers and never modified.
+        """
+        key = os.path.abspath(path)
+
+        with self._lock:
+            cached = self._files.get(key)
+            if cached is not None and cached.version == version:
+                self._files.move_to_end(key)
+                self._hits += 1
+                return cached
+
+            flight = self._loading.get((key, version))
+            leader = flight is None
+            if leader:
+                flight = self._loading[(key, version)] = Future()
+                self._misses += 1
+            else:
+                self._hits += 1
+
+        if not leader:
+            return flight.result()
+
+        try:
+            text = load()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[(key, version)]
+            flight.set_exception(e)
+            raise
+
+        cached = CachedFile(text=text, index=LineIndex(len(text)), version=version)
+        with self._lock:
+            del self._loading[(key, version)]
+            self._store(key, cached)
+        flight.set_result(cached)
+
+        return cached
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._files), self._bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._bytes = 0
+
+    def _store(self, key: str, cached: CachedFile) -> None:
+        previous = self._files.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+
+        self._files[key] = cached
+        self._bytes += cached.nbytes
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            _, evicted = self._files.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._evictions += 1
+
+
+content_cache = ContentCache(config.TOOL_FILE_READER_CACHE_BYTES)
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 
 from opentelemetry import trace
 from pydantic_ai import ModelRetry, Tool
@@ -6,53 +7,161 @@ from pydantic_ai import ModelRetry, Tool
 import config
 from utils import Logger
 
+from ..io_executor import run_in_io_executor
+from ..repo_index import KIND_BINARY, KIND_GENERATED, KIND_MINIFIED, KIND_VENDORED, RepositoryIndex, classify_file
+from .content_cache import ContentCache, content_cache
+from .line_index import Window, read_lines
+from .lockfiles import LOCKFILE_PARSERS, summarize_lockfile
+
+# Characters of a minified file returned instead of its lines
+MINIFIED_PREVIEW_CHARS = 2000
+
 
 class FileReadTool:
-    def __init__(self):
-        pass
+    def __init__(self, repo_index: Optional[RepositoryIndex] = None, cache: Optional[ContentCache] = content_cache):
+        self._repo_index = repo_index
+        self._cache = cache
 
     def get_tool(self):
-        return Tool(self._run, name="Read-File", takes_ctx=False, max_retries=config.TOOL_FILE_READER_MAX_RETRIES)
+        # The blocking file I/O runs on the shared I/O executor, so other agents keep the event loop
+        return Tool(
+            run_in_io_executor(self._run),
+            name="Read-File",
+            takes_ctx=False,
+            max_retries=config.TOOL_FILE_READER_MAX_RETRIES,
+        )
 
-    def _run(self, file_path: str, line_number: int = 0, line_count: int = 200) -> str:
+    def _run(self, file_path: str, line_number: int = 0, line_count: int = 200, raw: bool = False) -> str:
         """Read a file and return its contents.
 
+        Only the requested lines are read, through a memory map and a per-file index of line
+        offsets kept between calls, so paging through a large file reads every byte once. The total
+        line count is reported when it is known, or as a lower bound otherwise.
+
+        Binary files cannot be read. Minified files return a short preview instead of their lines,
+        lockfiles (uv.lock, poetry.lock, package-lock.json, go.sum) a summary of their direct and
+        transitive dependencies with the pinned versions of the direct ones, and generated or
+        vendored files are flagged as such, unless `raw` is set.
+
         Args:
             file_path (str): The path to the file to read.
             line_number (int, optional): The starting line number to read from. Defaults to 0.
             line_count (int, optional): The number of lines to read. Defaults to 200.
+            raw (bool, optional): Read the lines of minified, generated and vendored files and of
+                lockfiles as they are. Defaults to False.
 
         Returns:
             str: The contents of the file from the specified line number for the specified number of lines.
                 If the file is a .go file, returns an error message directing to use the Go-Analyzer-Tool.
                 If the file cannot be read, returns an error message with details about the failure.
         """
-        Logger.debug("Tool Call: Read File", data={"file_path": file_path})
+        Logger.debug("Tool Call: Read File", data={"file_path": file_path, "raw": raw})
 
         trace.get_current_span().set_attribute("input", file_path)
 
-        if not os.path.exists(file_path):
+        if not self._file_exists(file_path):
             raise ModelRetry(message="File not found")
 
-        try:
-            with open(file_path, "r") as file:
-                lines = file.readlines()
-                total_lines = len(lines)
-
-                if line_number > 0:
-                    lines = lines[line_number:]
-                if line_count > 0:
-                    lines = lines[:line_count]
-
-                output = (
-                    f"File Line:{line_number} to {line_number + line_count} from: {total_lines}\n--- start---\n"
-                    + "".join(lines)
-                    + "\n--- end ---\n"
-                )
+        kind = self._file_kind(file_path)
+        if kind == KIND_BINARY:
+            raise ModelRetry(message=f"{file_path} is a binary file and cannot be read as text")
+        if kind == KIND_MINIFIED and not raw:
+            output = self._minified_preview(file_path)
+            trace.get_current_span().set_attribute("output", output)
+            return output
+        if not raw and os.path.basename(file_path) in LOCKFILE_PARSERS:
+            if (output := self._lockfile_summary(file_path)) is not None:
                 trace.get_current_span().set_attribute("output", output)
-
                 return output
+
+        try:
+            window = read_lines(file_path, line_number, line_count, self._cache, self._repo_index)
         except PermissionError:
             raise ModelRetry(message="Permission denied when trying to read file")
         except Exception as e:
             raise ModelRetry(message=f"Failed to read file {file_path}. {str(e)}")
+
+        total_lines = self._total_lines(file_path, window)
+        output = (
+            f"File Line:{line_number} to {line_number + line_count} from: {total_lines}\n--- start---\n"
+            + window.text
+            + "\n--- end ---\n"
+        )
+        if kind in (KIND_GENERATED, KIND_VENDORED) and not raw:
+            output = f"Note: this file is {kind}, not hand-written code of this repository.\n" + output
+        trace.get_current_span().set_attribute("output", output)
+
+        return output
+
+    def _total_lines(self, file_path: str, window: Window) -> str:
+        if window.total_lines is not None:
+            return str(window.total_lines)
+
+        # The rest of the file is not scanned just to count it; a count from the manifest is used if there is one
+        entry = self._repo_index.get(file_path) if self._repo_index is not None else None
+        if entry is not None and entry.line_count is not None:
+            return str(entry.line_count)
+
+        return f"unknown (at least {window.known_lines})"
+
+    def _file_kind(self, file_path: str) -> Optional[str]:
+        if self._repo_index is not None and self._repo_index.get(file_path) is not None:
+            # Classified once per run, or read from the manifest
+            return self._repo_index.kind(file_path)
+
+        return classify_file(file_path, file_path.replace(os.sep, "/"))
+
+    def _minified_preview(self, file_path: str) -> str:
+        try:
+            if self._repo_index is not None and self._repo_index.objects is not None:
+                data = self._repo_index.read_bytes(file_path)
+                # At most 4 bytes per character in UTF-8
+                preview = data[: MINIFIED_PREVIEW_CHARS * 4].decode("utf-8", errors="replace")[:MINIFIED_PREVIEW_CHARS]
+                size = len(data)
+            else:
+                with open(file_path, "r", errors="replace") as file:
+                    preview = file.read(MINIFIED_PREVIEW_CHARS)
+                size = os.path.getsize(file_path)
+        except OSError as e:
+            raise ModelRetry(message=f"Failed to read file {file_path}. {str(e)}")
+
+        return (
+            f"{file_path} is minified ({size:,} bytes). Showing the first {len(preview):,} characters; "
+            "call again with raw=True to read it by lines.\n--- start---\n" + preview + "\n--- end ---\n"
+        )
+
+    def _lockfile_summary(self, file_path: str) -> Optional[str]:
+        def read_text(path: str) -> Optional[str]:
+            try:
+                if self._repo_index is not None:
+                    return self._repo_index.read_bytes(path).decode("utf-8")
+                with open(path, "rb") as file:
+                    return file.read().decode("utf-8")
+            except (OSError, UnicodeDecodeError):
+                return None
+
+        if (text := read_text(file_path)) is None:
+            # The raw read reports the error
+            return None
+
+        directory, name = os.path.split(file_path)
+        summary = summarize_lockfile(name, text, lambda sibling: read_text(os.path.join(directory, sibling)))
+        if summary is None:
+            return None
+
+        return (
+            f"{summary}\n[Summary of a {len(text.splitlines()):,}-line lockfile. Call again with raw=True to read its "
+            "lines.]\n"
+        )
+
+    def _file_exists(self, file_path: str) -> bool:
+        if self._repo_index is not None and self._repo_index.covers(file_path):
+            entry = self._repo_index.get(file_path)
+            if entry is not None:
+                return not entry.is_dir
+            # A commit has no files beyond its tree, but the work tree also holds untracked and
+            # ignored files that an index built from git or with ignore rules leaves out
+            if self._repo_index.objects is not None:
+                return False
+
+        return os.path.exists(file_path)
@@ -0,0 +1,191 @@
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from ..repo_index import RepositoryIndex
+    from .content_cache import ContentCache
+
+# Upper bound on the memory held by cached line offsets, at 8 bytes per line
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class Window(NamedTuple):
+    text: str  # The requested lines, with "\r\n" turned into "\n"
+    end_line: int  # One past the last line returned
+    total_lines: Optional[int]  # None until the whole file has been scanned
+    known_lines: int  # Lines known to exist; a lower bound on the total when it is None
+
+
+class LineIndex:
+    """Offsets of the lines of a file, found lazily as far as reads have reached.
+
+    ``offsets[i]`` is where line ``i`` starts, in bytes of a memory-mapped file or in characters of
+    a decoded one. Offsets are only scanned up to the furthest line requested so far, so paging
+    through a file scans every byte once, and reading its first lines never touches the rest. Once
+    the end of the file is reached, the last offset is its size.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.offsets = array("Q", [0])
+        self.complete = size == 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.offsets) * self.offsets.itemsize
+
+    def read(self, buffer: Union[mmap.mmap, str], start: int, count: int) -> Window:
+        """Return ``count`` lines from ``start``, or every line from ``start`` if ``count`` is not positive."""
+        start = max(start, 0)
+        end = start + count if count > 0 else None
+
+        with self._lock:
+            # One line past the window is scanned to tell whether the file goes on
+            self._scan(buffer, None if end is None else end + 1)
+            offsets = self.offsets
+            lines = len(offsets) - 1
+            first = min(start, lines)
+            last = lines if end is None else min(end, lines)
+            begin, stop = offsets[first], offsets[last]
+            total = lines if self.complete else None
+
+        text = buffer[begin:stop]
+        if isinstance(text, bytes):
+            text = text.decode("utf-8").replace("\r\n", "\n")
+        return Window(text=text, end_line=last, total_lines=total, known_lines=lines + (not self.complete))
+
+    def _scan(self, buffer: Union[mmap.mmap, str], line: Optional[int]) -> None:
+        offsets = self.offsets
+        separator = "\n" if isinstance(buffer, str) else b"\n"
+        position = offsets[-1]
+        while not self.complete and (line is None or len(offsets) <= line):
+            newline = buffer.find(separator, position)
+            if newline == -1:
+                # A last line without a trailing newline still counts
+                if position < self.size:
+                    offsets.append(self.size)
+                self.complete = True
+            else:
+                position = newline + 1
+                offsets.append(position)
+
+
+class LineIndexCache:
+    """Line indexes of recently read files, keyed by path and evicted least recently used first.
+
+    An index is only reused while the file keeps the size and mtime it had when the index was
+    created; a modified file gets a fresh index.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._indexes: "OrderedDict[str, Tuple[int, int, LineIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, stat_result: os.stat_result) -> LineIndex:
+        key = os.path.abspath(path)
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+                self._indexes.move_to_end(key)
+                return cached[2]
+
+            index = LineIndex(stat_result.st_size)
+            self._indexes[key] = (stat_result.st_mtime_ns, stat_result.st_size, index)
+            self._evict()
+            return index
+
+    def _evict(self) -> None:
+        # Indexes grow as they are read further, so their size is measured at eviction time
+        total = sum(index.nbytes for _, _, index in self._indexes.values())
+        while total > self.max_bytes and len(self._indexes) > 1:
+            _, (_, _, index) = self._indexes.popitem(last=False)
+            total -= index.nbytes
+
+
+_cache = LineIndexCache()
+
+
+def read_lines(
+    path: str,
+    start: int,
+    count: int,
+    cache: Optional["ContentCache"] = None,
+    repo_index: Optional["RepositoryIndex"] = None,
+) -> Window:
+    """Read a window of lines from a text file.
+
+    Files small enough for ``cache`` are decoded once and then served from it. Larger files are
+    read through a memory map and their cached line index, so only the window is copied out of
+    the file. The first read of a file scans it up to the end of the window; later reads of the
+    same file reuse the offsets found so far. When ``repo_index`` describes a commit, files of the
+    repository are decoded from their blobs instead.
+
+    Args:
+        path (str): The file to read.
+        start (int): The first line to return, counting from 0.
+        count (int): The number of lines to return; every remaining line if not positive.
+        cache (ContentCache, optional): Where to keep the decoded contents of small files.
+        repo_index (RepositoryIndex, optional): The index ``path`` belongs to, if any.
+
+    Returns:
+        Window: The lines, and what is known of the file's line count.
+
+    Raises:
+        OSError: If the file cannot be opened.
+        UnicodeDecodeError: If the window is not valid UTF-8.
+    """
+    if repo_index is not None and repo_index.objects is not None and repo_index.covers(path):
+        return _read_blob_lines(repo_index, path, start, count, cache)
+
+    with open(path, "rb") as file:
+        stat_result = os.fstat(file.fileno())
+        if cache is not None and cache.accepts(stat_result.st_size):
+            version = (stat_result.st_mtime_ns, stat_result.st_size)
+            cached = cache.get(path, version, lambda: file.read().decode("utf-8").replace("\r\n", "\n"))
+            return _read_decoded(cached.text, cached.index, start, count)
+
+        index = _cache.get(path, stat_result)
+        if stat_result.st_size == 0:
+            # Empty files cannot be mapped
+            return Window(text="", end_line=0, total_lines=0, known_lines=0)
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return index.read(buffer, start, count)
+
+
+def _read_blob_lines(
+    repo_index: "RepositoryIndex",
+    path: str,
+    start: int,
+    count: int,
+    cache: Optional["ContentCache"],
+) -> Window:
+    entry = repo_index.get(path)
+    if entry is None or entry.is_dir:
+        raise FileNotFoundError(f"{path} is not in commit {repo_index.objects.commit}")
+
+    def load() -> str:
+        return repo_index.read_bytes(path).decode("utf-8").replace("\r\n", "\n")
+
+    if cache is not None and cache.accepts(entry.size):
+        # A blob never changes, so its id is as good a version as an mtime
+        cached = cache.get(path, (int.from_bytes(entry.content_hash[:8], "big"), entry.size), load)
+        return _read_decoded(cached.text, cached.index, start, count)
+
+    text = load()
+    return _read_decoded(text, LineIndex(len(text)), start, count)
+
+
+def _read_decoded(text: str, index: LineIndex, start: int, count: int) -> Window:
+    window = index.read(text, start, count)
+    if window.total_lines is None:
+        # The whole file is in memory already, so counting its lines is cheap
+        total = text.count("\n") + (text[-1:] not in ("", "\n"))
+        window = window._replace(total_lines=total, known_lines=total)
+    return window
@@ -0,0 +1,210 @@
+import json
+import re
+import tomllib
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+# Direct dependencies listed with their pinned version; the rest are only counted
+MAX_LISTED_DEPENDENCIES = 100
+
+# The name at the start of a PEP 508 requirement, e.g. "requests" in "requests[socks]>=2.31"
+REQUIREMENT_NAME = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+GO_REQUIRE_LINE = re.compile(r"^\s*(?:require\s+)?([^\s()]+)\s+(v[^\s]+)(.*)$")
+
+
+class DependencySummary(NamedTuple):
+    format: str  # e.g. "uv", "npm"
+    direct: Dict[str, Optional[str]]  # Runtime dependencies of the project, with their locked version
+    development: Dict[str, Optional[str]]  # Dev, test and other optional groups
+    locked: int  # Distinct packages in the lockfile, the project itself excluded
+    note: Optional[str] = None  # What could not be determined, and why
+
+
+def _normalize(name: str) -> str:
+    # PEP 503: "Foo_Bar.baz" and "foo-bar-baz" are the same package
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _requirement_names(requirements: Iterable[str]) -> Set[str]:
+    names = set()
+    for requirement in requirements:
+        if match := REQUIREMENT_NAME.match(requirement):
+            names.add(_normalize(match.group(1)))
+    return names
+
+
+def parse_uv_lock(text: str, read_sibling: Callable[[str], Optional[str]]) -> DependencySummary:
+    data = tomllib.loads(text)
+    packages = data.get("package", [])
+    versions = {_normalize(package["name"]): package.get("version") for package in packages}
+
+    # Workspace members are the packages built from local sources
+    members = [package for package in packages if {"editable", "virtual"} & set(package.get("source", {}))]
+    member_names = {_normalize(member["name"]) for member in members}
+    direct: Set[str] = set()
+    development: Set[str] = set()
+    for member in members:
+        direct.update(_normalize(dependency["name"]) for dependency in member.get("dependencies", []))
+        for group in ("optional-dependencies", "dev-dependencies"):
+            for dependencies in member.get(group, {}).values():
+                development.update(_normalize(dependency["name"]) for dependency in dependencies)
+
+    direct -= member_names
+    development -= member_names | direct
+    return DependencySummary(
+        format="uv",
+        direct={name: versions.get(name) for name in direct},
+        development={name: versions.get(name) for name in development},
+        locked=len(set(versions) - member_names),
+    )
+
+
+def parse_poetry_lock(text: str, read_sibling: Callable[[str], Optional[str]]) -> DependencySummary:
+    data = tomllib.loads(text)
+    versions = {_normalize(package["name"]): package.get("version") for package in data.get("package", [])}
+
+    pyproject_text = read_sibling("pyproject.toml")
+    if pyproject_text is None:
+        return DependencySummary("poetry", {}, {}, len(versions), note="pyproject.toml not found")
+
+    pyproject = tomllib.loads(pyproject_text)
+    poetry = pyproject.get("tool", {}).get("poetry", {})
+    project = pyproject.get("project", {})
+
+    direct = {_normalize(name) for name in poetry.get("dependencies", {}) if name != "python"}
+    direct |= _requirement_names(project.get("dependencies", []))
+    development = {_normalize(name) for name in poetry.get("dev-dependencies", {})}
+    for group in poetry.get("group", {}).values():
+        development |= {_normalize(name) for name in group.get("dependencies", {})}
+    for requirements in project.get("optional-dependencies", {}).values():
+        development |= _requirement_names(requirements)
+
+    development -= direct
+    return DependencySummary(
+        format="poetry",
+        direct={name: versions.get(name) for name in direct},
+        development={name: versions.get(name) for name in development},
+        locked=len(versions),
+    )
+
+
+def parse_package_lock(text: str, read_sibling: Callable[[str], Optional[str]]) -> DependencySummary:
+    data = json.loads(text)
+    locked: Set[Tuple[str, Optional[str]]] = set()
+    versions: Dict[str, Optional[str]] = {}
+
+    if "packages" in data:
+        # Lockfile v2 and v3: installed paths, nested node_modules holding other versions of a package
+        for path, package in data["packages"].items():
+            if not path or package.get("link"):
+                continue
+            name = package.get("name") or path.rpartition("node_modules/")[2]
+            locked.add((name, package.get("version")))
+            if path == f"node_modules/{name}":
+                versions[name] = package.get("version")
+        root = data["packages"].get("", {})
+    else:
+        # Lockfile v1: a tree of dependencies, the top level being what is installed at the root
+        def visit(dependencies: Dict[str, dict], top_level: bool) -> None:
+            for name, package in dependencies.items():
+                locked.add((name, package.get("version")))
+                if top_level:
+                    versions[name] = package.get("version")
+                visit(package.get("dependencies", {}), False)
+
+        visit(data.get("dependencies", {}), True)
+        package_json = read_sibling("package.json")
+        root = json.loads(package_json) if package_json is not None else None
+
+    if root is None:
+        return DependencySummary("npm", {}, {}, len(locked), note="package.json not found")
+
+    direct = set(root.get("dependencies", {})) | set(root.get("peerDependencies", {}))
+    development = (set(root.get("devDependencies", {})) | set(root.get("optionalDependencies", {}))) - direct
+    return DependencySummary(
+        format="npm",
+        direct={name: versions.get(name) for name in direct},
+        development={name: versions.get(name) for name in development},
+        locked=len(locked),
+    )
+
+
+def parse_go_sum(text: str, read_sibling: Callable[[str], Optional[str]]) -> DependencySummary:
+    # "<module> <version>[/go.mod] <hash>"; modules only needed for their go.mod are listed too
+    modules = {line.split()[0] for line in text.splitlines() if line.strip()}
+
+    go_mod = read_sibling("go.mod")
+    if go_mod is None:
+        return DependencySummary("go", {}, {}, len(modules), note="go.mod not found")
+
+    direct: Dict[str, Optional[str]] = {}
+    in_require = False
+    for line in go_mod.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("require ("):
+            in_require = True
+            continue
+        if in_require and stripped == ")":
+            in_require = False
+            continue
+        if not (in_require or stripped.startswith("require ")):
+            continue
+
+        match = GO_REQUIRE_LINE.match(stripped)
+        if match and "// indirect" not in match.group(3):
+            direct[match.group(1)] = match.group(2)
+
+    return DependencySummary(format="go", direct=direct, development={}, locked=len(modules))
+
+
+LOCKFILE_PARSERS: Dict[str, Callable[[str, Callable[[str], Optional[str]]], DependencySummary]] = {
+    "uv.lock": parse_uv_lock,
+    "poetry.lock": parse_poetry_lock,
+    "package-lock.json": parse_package_lock,
+    "npm-shrinkwrap.json": parse_package_lock,
+    "go.sum": parse_go_sum,
+}
+
+
+def summarize_lockfile(name: str, text: str, read_sibling: Callable[[str], Optional[str]]) -> Optional[str]:
+    """Summarize the dependencies locked by a lockfile of a known format.
+
+    Args:
+        name (str): The file name, which selects the format.
+        text (str): The contents of the lockfile.
+        read_sibling (Callable[[str], Optional[str]]): Reads another file of the same directory by
+            name, e.g. the ``go.mod`` next to ``go.sum``; returns None if it does not exist.
+
+    Returns:
+        Optional[str]: The summary, or None if the format is unknown or the file cannot be parsed.
+    """
+    parser = LOCKFILE_PARSERS.get(name)
+    if parser is None:
+        return None
+
+    try:
+        summary = parser(text, read_sibling)
+    except (ValueError, KeyError, TypeError, AttributeError, IndexError):
+        # tomllib and json errors are ValueErrors; the rest come from unexpected shapes
+        return None
+
+    transitive = max(summary.locked - len(summary.direct) - len(summary.development), 0)
+    output = f"Dependency summary of {name} ({summary.format}): {summary.locked:,} packages locked\n"
+    if summary.note is not None:
+        output += f"Direct dependencies unknown: {summary.note}\n"
+    else:
+        output += (
+            f"Direct: {len(summary.direct):,}, development and optional: {len(summary.development):,}, "
+            f"transitive: {transitive:,}\n"
+        )
+
+    for title, dependencies in (("Direct dependencies", summary.direct), ("Development", summary.development)):
+        if not dependencies:
+            continue
+        output += f"\n{title}:\n"
+        names = sorted(dependencies)
+        for dependency in names[:MAX_LISTED_DEPENDENCIES]:
+            output += f"  {dependency} {dependencies[dependency] or '(not locked)'}\n"
+        if len(names) > MAX_LISTED_DEPENDENCIES:
+            output += f"  ... {len(names) - MAX_LISTED_DEPENDENCIES:,} more\n"
+
+    return output
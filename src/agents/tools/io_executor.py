@@ -0,0 +1,52 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import config
+
+R = TypeVar("R")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by the blocking file I/O of every agent tool.
+
+    The pool is separate from the event loop's default executor, so slow disks cannot starve
+    other ``asyncio.to_thread`` users, and its size (``TOOL_IO_WORKERS``) bounds how many tool
+    calls hit the filesystem at once.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.TOOL_IO_WORKERS, thread_name_prefix="tool-io")
+        return _executor
+
+
+async def run_io(func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """Run a blocking function on the I/O executor without blocking the event loop.
+
+    Context variables, such as the current tracing span, are carried over to the worker thread,
+    like ``asyncio.to_thread`` does.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+def run_in_io_executor(func: Callable[..., R]) -> Callable[..., Awaitable[R]]:
+    """Wrap a blocking tool function into a coroutine function running on the I/O executor.
+
+    The wrapper keeps the name, signature and docstring of ``func``, which the tool schema is
+    generated from.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> R:
+        return await run_io(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,48 @@
+from .classifier import (
+    KIND_BINARY,
+    KIND_GENERATED,
+    KIND_MINIFIED,
+    KIND_TEXT,
+    KIND_VENDORED,
+    classify_file,
+    classify_name,
+)
+from .content import FileScan, count_lines, scan_file
+from .git import list_git_files, walk_git_files
+from .git_objects import GitObjectStore, TreeEntry
+from .gitignore import IgnoreSpec
+from .ignore import DEFAULT_IGNORED_DIRS, DEFAULT_IGNORED_EXTENSIONS, IgnoreMatcher, IgnoreRules
+from .index import SOURCE_GIT, SOURCE_WALK, IndexEntry, RepositoryIndex
+from .languages import detect_language
+from .manifest import Manifest
+from .walker import iter_tree, walk_files
+
+__all__ = [
+    "DEFAULT_IGNORED_DIRS",
+    "DEFAULT_IGNORED_EXTENSIONS",
+    "FileScan",
+    "GitObjectStore",
+    "IgnoreMatcher",
+    "IgnoreRules",
+    "IgnoreSpec",
+    "IndexEntry",
+    "KIND_BINARY",
+    "KIND_GENERATED",
+    "KIND_MINIFIED",
+    "KIND_TEXT",
+    "KIND_VENDORED",
+    "Manifest",
+    "RepositoryIndex",
+    "SOURCE_GIT",
+    "SOURCE_WALK",
+    "TreeEntry",
+    "classify_file",
+    "classify_name",
+    "count_lines",
+    "detect_language",
+    "iter_tree",
+    "list_git_files",
+    "scan_file",
+    "walk_files",
+    "walk_git_files",
+]
@@ -0,0 +1,150 @@
+import hashlib
+import re
+from typing import Optional
+
+# File kinds, from the cheapest to detect to the most expensive
+KIND_TEXT = "text"
+KIND_BINARY = "binary"  # Not text; never worth sending to the model
+KIND_MINIFIED = "minified"  # Text with very long lines, e.g. bundled JavaScript
+KIND_GENERATED = "generated"  # Produced by a tool: lockfiles, protobuf stubs, files marked "DO NOT EDIT"
+KIND_VENDORED = "vendored"  # Third-party code copied into the repository
+
+# Bytes read from the start of a file to classify it
+SAMPLE_SIZE = 8192
+# Share of control bytes above which a sample without NUL bytes is still treated as binary
+BINARY_CONTROL_RATIO = 0.3
+# Average line length, in a sample with at least one full line, above which text is minified
+MINIFIED_AVERAGE_LINE_LENGTH = 500
+# Lines at the top of a file searched for a "generated" marker
+GENERATED_HEADER_LINES = 10
+
+# Directory names holding third-party code
+VENDORED_DIRS = frozenset(
+    ["vendor", "vendors", "third_party", "third-party", "thirdparty", "external", "extern", "node_modules"]
+)
+# Files produced by package managers
+LOCKFILE_NAMES = frozenset(
+    [
+        "uv.lock",
+        "poetry.lock",
+        "Pipfile.lock",
+        "pdm.lock",
+        "package-lock.json",
+        "npm-shrinkwrap.json",
+        "yarn.lock",
+        "pnpm-lock.yaml",
+        "bun.lockb",
+        "go.sum",
+        "Cargo.lock",
+        "composer.lock",
+        "Gemfile.lock",
+        "mix.lock",
+        "pubspec.lock",
+        "Podfile.lock",
+        "packages.lock.json",
+        "flake.lock",
+    ]
+)
+GENERATED_SUFFIXES = (".pb.go", ".pb.gw.go", "_pb2.py", "_pb2_grpc.py", "_pb2.pyi", ".pb.cc", ".pb.h", ".g.dart")
+MINIFIED_SUFFIXES = (".min.js", ".min.css", ".min.mjs", ".bundle.js", ".js.map", ".css.map")
+
+# Markers used by common code generators in their header comment. "auto-generated" alone is also
+# ordinary prose ("IDs are auto-generated"), so it only counts in the tags and phrases generators use.
+GENERATED_MARKER = re.compile(
+    rb"code generated .* do not edit|@generated|<auto-?generated"
+    rb"|generated (?:by|from|file)\b.*(?:do not|don't) (?:edit|modify)"
+    rb"|this file (?:is|was|has been) (?:auto-?|automatically )?generated",
+    re.IGNORECASE,
+)
+# Control bytes other than tab, newline, form feed and carriage return
+CONTROL_BYTES = bytes(range(0, 9)) + bytes([11]) + bytes(range(14, 32)) + bytes([127])
+
+
+def settings_fingerprint() -> str:
+    """A stable digest of the classification settings, used to invalidate caches built with different ones."""
+    settings = (
+        SAMPLE_SIZE,
+        BINARY_CONTROL_RATIO,
+        MINIFIED_AVERAGE_LINE_LENGTH,
+        GENERATED_HEADER_LINES,
+        sorted(VENDORED_DIRS),
+        sorted(LOCKFILE_NAMES),
+        GENERATED_SUFFIXES,
+        MINIFIED_SUFFIXES,
+        GENERATED_MARKER.pattern,
+    )
+    return hashlib.blake2b(repr(settings).encode(), digest_size=16).hexdigest()
+
+
+def classify_name(path: str) -> Optional[str]:
+    """Classify a file from its path alone, or return None if its content has to be sampled.
+
+    Args:
+        path (str): The file path relative to the repository root, in POSIX form.
+    """
+    rel_dir, _, name = path.rpartition("/")
+    if rel_dir and VENDORED_DIRS.intersection(rel_dir.split("/")):
+        return KIND_VENDORED
+    if name in LOCKFILE_NAMES or name.endswith(GENERATED_SUFFIXES):
+        return KIND_GENERATED
+    if name.endswith(MINIFIED_SUFFIXES):
+        return KIND_MINIFIED
+
+    return None
+
+
+def classify_sample(sample: bytes) -> str:
+    """Classify a file from the first ``SAMPLE_SIZE`` bytes of its content.
+
+    Args:
+        sample (bytes): The start of the file.
+
+    Returns:
+        str: One of ``KIND_BINARY``, ``KIND_MINIFIED``, ``KIND_GENERATED`` and ``KIND_TEXT``.
+    """
+    if not sample:
+        return KIND_TEXT
+
+    if b"\0" in sample:
+        return KIND_BINARY
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the sample is still text
+        if e.start < len(sample) - 3 and len(sample.translate(None, CONTROL_BYTES)) < len(sample) * (
+            1 - BINARY_CONTROL_RATIO
+        ):
+            return KIND_BINARY
+
+    header = b"\n".join(sample.split(b"\n", GENERATED_HEADER_LINES)[:GENERATED_HEADER_LINES])
+    if GENERATED_MARKER.search(header):
+        return KIND_GENERATED
+
+    # Only complete lines count, so a long first line in a short sample is not mistaken for minified code
+    newlines = sample.count(b"\n")
+    if len(sample) >= SAMPLE_SIZE and len(sample) / (newlines + 1) > MINIFIED_AVERAGE_LINE_LENGTH:
+        return KIND_MINIFIED
+
+    return KIND_TEXT
+
+
+def classify_file(abs_path: str, path: str) -> Optional[str]:
+    """Classify a file, reading at most ``SAMPLE_SIZE`` bytes of it.
+
+    Args:
+        abs_path (str): The file to classify.
+        path (str): The same file relative to the repository root, in POSIX form.
+
+    Returns:
+        Optional[str]: The file kind, or None if the file cannot be read.
+    """
+    if kind := classify_name(path):
+        return kind
+
+    try:
+        with open(abs_path, "rb") as file:
+            sample = file.read(SAMPLE_SIZE)
+    except OSError:
+        return None
+
+    return classify_sample(sample)
@@ -0,0 +1,56 @@
+import hashlib
+from typing import NamedTuple, Optional
+
+from .classifier import SAMPLE_SIZE, classify_name, classify_sample
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileScan(NamedTuple):
+    content_hash: bytes  # 128-bit BLAKE2b digest
+    line_count: int  # A last line without a trailing newline counts
+    kind: str  # See classifier.py
+
+
+def scan_file(abs_path: str, path: str) -> Optional[FileScan]:
+    """Hash, count the lines of and classify a file in a single read.
+
+    Args:
+        abs_path (str): The file to read.
+        path (str): The same file relative to the repository root, in POSIX form.
+
+    Returns:
+        Optional[FileScan]: The results, or None if the file cannot be read.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    lines = 0
+    last = b"\n"
+    sample = None
+    try:
+        with open(abs_path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                if sample is None:
+                    sample = chunk[:SAMPLE_SIZE]
+                digest.update(chunk)
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+    except OSError:
+        return None
+
+    kind = classify_name(path) or classify_sample(sample or b"")
+    return FileScan(digest.digest(), lines + (last != b"\n"), kind)
+
+
+def count_lines(path: str) -> Optional[int]:
+    """Count the lines of a file, or return None if it cannot be read."""
+    lines = 0
+    last = b"\n"
+    try:
+        with open(path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+    except OSError:
+        return None
+
+    return lines + (last != b"\n")
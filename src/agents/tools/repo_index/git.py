@@ -0,0 +1,57 @@
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+
+def list_git_files(directory: Union[str, Path]) -> Optional[List[str]]:
+    """List the files git considers part of the work tree under ``directory``.
+
+    These are the tracked files plus the untracked files that are not excluded by ``.gitignore``,
+    ``.git/info/exclude`` or the global excludes file, as reported by ``git ls-files``. Git reads
+    them from its index instead of walking the tree, so build output and dependency directories
+    are skipped without any hardcoded ignore lists.
+
+    Args:
+        directory (str | Path): A directory inside a git work tree.
+
+    Returns:
+        Optional[List[str]]: POSIX paths relative to ``directory``, or None if ``directory`` is not
+            inside a git work tree or git is not available.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=directory,
+            check=True,
+            capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    paths = result.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+
+    # Unmerged files are reported once per conflict stage
+    return list(dict.fromkeys(path for path in paths if path))
+
+
+def walk_git_files(directory: Union[str, Path]) -> Optional[Dict[str, List[str]]]:
+    """Group the files git reports under ``directory`` by their parent directory.
+
+    Args:
+        directory (str | Path): A directory inside a git work tree.
+
+    Returns:
+        Optional[Dict[str, List[str]]]: File names keyed by their directory relative to ``directory``
+            (``""`` for the root itself), in the same shape as ``walk_files``. None if
+            ``directory`` is not inside a git work tree.
+    """
+    paths = list_git_files(directory)
+    if paths is None:
+        return None
+
+    dir_files: Dict[str, List[str]] = {}
+    for path in paths:
+        rel_dir, _, name = path.rpartition("/")
+        dir_files.setdefault(rel_dir, []).append(name)
+
+    return dir_files
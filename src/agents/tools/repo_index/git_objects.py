@@ -0,0 +1,129 @@
+import subprocess
+import threading
+from pathlib import Path
+from typing import IO, List, NamedTuple, Optional, Union
+
+# Tree entry modes that are neither regular files nor executables: symlinks and submodules
+SKIPPED_MODES = frozenset(["120000", "160000"])
+
+
+class TreeEntry(NamedTuple):
+    path: str  # POSIX path relative to the repository root
+    size: int
+    oid: str  # The hex object id of the blob
+
+
+class GitObjectStore:
+    """Read-only view of a repository at a pinned commit, served from git's object database.
+
+    Files are listed from the commit's tree with ``git ls-tree`` and read from their blobs
+    through one long-lived ``git cat-file --batch`` process, so a bare clone or a clone without
+    a checkout can be analyzed, and changes to the working tree during a run are not seen.
+    Reads are serialized on the process; each one is a single round trip on its pipes.
+
+    Example:
+        ```python
+        with GitObjectStore("/path/to/repo", "main") as objects:
+            entries = objects.list_tree()  # [TreeEntry(path="src/main.py", size=812, oid="4b825d..."), ...]
+            objects.read(entries[0].oid)  # b"import sys\n..."
+        ```
+    """
+
+    def __init__(self, repo_path: Union[str, Path], revision: str = "HEAD") -> None:
+        self.repo_path = Path(repo_path)
+        self.commit = self._git("rev-parse", "--verify", "--end-of-options", f"{revision}^{{commit}}").decode().strip()
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def list_tree(self) -> List[TreeEntry]:
+        """List every file of the commit, recursively."""
+        output = self._git("ls-tree", "-r", "-z", "--long", "--full-tree", self.commit)
+
+        entries: List[TreeEntry] = []
+        for record in output.decode("utf-8", errors="surrogateescape").split("\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition("\t")
+            mode, object_type, oid, size = meta.split()
+            if object_type != "blob" or mode in SKIPPED_MODES:
+                continue
+            entries.append(TreeEntry(path=path, size=int(size), oid=oid))
+
+        return entries
+
+    def read(self, oid: str) -> bytes:
+        """Return the contents of a blob.
+
+        Raises:
+            FileNotFoundError: If the object does not exist, e.g. it was not fetched into a partial clone.
+            OSError: If the ``git cat-file`` process fails.
+        """
+        with self._lock:
+            process = self._batch_process()
+            try:
+                process.stdin.write(oid.encode() + b"\n")
+                process.stdin.flush()
+                header = process.stdout.readline()
+                if not header:
+                    raise OSError("git cat-file exited")
+
+                # "<oid> <type> <size>", or "<oid> missing"
+                fields = header.split()
+                data = self._read_exactly(process.stdout, int(fields[2]) + 1)[:-1] if len(fields) == 3 else None
+            except (OSError, ValueError) as e:
+                # The protocol state is unknown after a failure, so the next read starts a new process
+                self._stop()
+                raise OSError(f"Failed to read git object {oid} from {self.repo_path}: {e}") from e
+
+        if data is None:
+            raise FileNotFoundError(f"Git object {oid} not found in {self.repo_path}")
+        return data
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def __enter__(self) -> "GitObjectStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _batch_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+
+        return self._process
+
+    def _stop(self) -> None:
+        if self._process is None:
+            return
+
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            process.stdout.close()
+
+    @staticmethod
+    def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+        data = stream.read(size)
+        if len(data) != size:
+            raise OSError("git cat-file exited early")
+        return data
+
+    def _git(self, *args: str) -> bytes:
+        try:
+            return subprocess.run(["git", *args], cwd=self.repo_path, check=True, capture_output=True).stdout
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"git {args[0]} failed in {self.repo_path}: {e.stderr.decode().strip()}") from e
@@ -0,0 +1,237 @@
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+GLOB_CHARS = frozenset("*?[\\")
+
+
+@dataclass(slots=True)
+class _Rule:
+    index: int  # Position in the file; when several rules match, the last one wins
+    pattern: str  # The glob without the "!" prefix, the anchoring "/" and the trailing "/"
+    negated: bool
+    dir_only: bool
+    anchored: bool  # Matched against the path relative to the file's directory, not the base name
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression for ``re.fullmatch``."""
+    out = []
+    i, n = 0, len(pattern)
+
+    while i < n:
+        char = pattern[i]
+
+        if char == "*":
+            if pattern.startswith("**", i):
+                end = i + 2
+                whole_segment = (i == 0 or pattern[i - 1] == "/") and (end == n or pattern[end] == "/")
+                if whole_segment and end == n:
+                    # "abc/**" matches everything inside abc
+                    out.append(".*")
+                    i = end
+                    continue
+                if whole_segment:
+                    # "**/" matches zero or more directories
+                    out.append("(?:.*/)?")
+                    i = end + 1
+                    continue
+                # Any other "**" is a regular "*"
+                i = end - 1
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = i + 1
+            if end < n and pattern[end] in "!^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1 : end].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append(f"(?!/)[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(char))
+
+        i += 1
+
+    return "".join(out)
+
+
+class _CompiledRules:
+    """Lookup structures for one set of rules.
+
+    Plain names and paths go into dictionaries, ``*.ext`` and ``prefix*`` patterns into
+    dictionaries bucketed by affix length, and everything else into a single alternation regex
+    per match target whose groups are ordered from the last rule to the first. Classifying a
+    path takes a handful of hash lookups and at most two regex matches, independent of the
+    number of rules.
+    """
+
+    def __init__(self, rules: Iterable[_Rule]) -> None:
+        self._names: Dict[str, int] = {}
+        self._paths: Dict[str, int] = {}
+        self._suffixes: Dict[str, int] = {}
+        self._prefixes: Dict[str, int] = {}
+        name_patterns: List[Tuple[int, str]] = []
+        path_patterns: List[Tuple[int, str]] = []
+
+        for rule in rules:
+            pattern = rule.pattern
+            literal = not (GLOB_CHARS & set(pattern))
+
+            if rule.anchored:
+                if literal:
+                    self._paths[pattern] = rule.index
+                else:
+                    path_patterns.append((rule.index, _glob_to_regex(pattern)))
+            elif literal:
+                self._names[pattern] = rule.index
+            elif pattern.startswith("*") and not (GLOB_CHARS & set(pattern[1:])):
+                self._suffixes[pattern[1:]] = rule.index
+            elif pattern.endswith("*") and not (GLOB_CHARS & set(pattern[:-1])):
+                self._prefixes[pattern[:-1]] = rule.index
+            else:
+                name_patterns.append((rule.index, _glob_to_regex(pattern)))
+
+        self._suffix_lengths = tuple(sorted({len(suffix) for suffix in self._suffixes}))
+        self._prefix_lengths = tuple(sorted({len(prefix) for prefix in self._prefixes}))
+        self._name_regex, self._name_groups = self._compile(name_patterns)
+        self._path_regex, self._path_groups = self._compile(path_patterns)
+
+    @staticmethod
+    def _compile(patterns: List[Tuple[int, str]]) -> Tuple[Optional[re.Pattern], Tuple[int, ...]]:
+        if not patterns:
+            return None, ()
+
+        # The regex engine tries alternatives left to right, so the last rule goes first
+        patterns = sorted(patterns, reverse=True)
+        regex = re.compile("|".join(f"({pattern})" for _, pattern in patterns), re.DOTALL)
+
+        # Group numbers of every top-level alternative, mapped back to rule indexes
+        groups = []
+        group = 1
+        for _, pattern in patterns:
+            groups.append(group)
+            group += 1 + re.compile(pattern).groups
+        group_to_rule = [0] * group
+        for group, (index, _) in zip(groups, patterns):
+            group_to_rule[group] = index
+
+        return regex, tuple(group_to_rule)
+
+    def last_match(self, path: str, name: str) -> int:
+        """Return the index of the last rule matching ``path`` / ``name``, or -1."""
+        best = self._names.get(name, -1)
+        best = max(best, self._paths.get(path, -1))
+
+        name_length = len(name)
+        for length in self._suffix_lengths:
+            if length > name_length:
+                break
+            best = max(best, self._suffixes.get(name[name_length - length :], -1))
+        for length in self._prefix_lengths:
+            if length > name_length:
+                break
+            best = max(best, self._prefixes.get(name[:length], -1))
+
+        if self._name_regex is not None and (match := self._name_regex.fullmatch(name)):
+            best = max(best, self._name_groups[match.lastindex])
+        if self._path_regex is not None and (match := self._path_regex.fullmatch(path)):
+            best = max(best, self._path_groups[match.lastindex])
+
+        return best
+
+
+class IgnoreSpec:
+    """The compiled rules of a single ``.gitignore``-style file.
+
+    Args:
+        lines (Iterable[str]): The lines of the file.
+        base (str): The directory containing the file, relative to the repository root in POSIX
+            form (``""`` for the root). Rules only apply to paths below it.
+    """
+
+    def __init__(self, lines: Iterable[str], base: str = "") -> None:
+        lines = list(lines)
+        self.base = base
+        self.source = "\n".join(lines)
+        self._rules = self._parse(lines)
+        self._files = _CompiledRules(rule for rule in self._rules if not rule.dir_only)
+        self._dirs = _CompiledRules(self._rules)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], base: str = "") -> Optional["IgnoreSpec"]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as file:
+                return cls(file.read().splitlines(), base)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _parse(lines: Iterable[str]) -> List[_Rule]:
+        rules = []
+
+        for line in lines:
+            # Trailing spaces are ignored unless escaped
+            stripped = line.rstrip(" ")
+            if stripped.endswith("\\") and len(stripped) < len(line):
+                stripped += " "
+            line = stripped
+
+            if not line or line.startswith("#"):
+                continue
+
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            elif line.startswith(("\\!", "\\#")):
+                line = line[1:]
+
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+
+            # A separator at the start or in the middle anchors the pattern to the file's directory
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+
+            rules.append(_Rule(index=len(rules), pattern=line, negated=negated, dir_only=dir_only, anchored=anchored))
+
+        return rules
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def match(self, rel_path: str, name: str, is_dir: bool) -> Optional[bool]:
+        """Decide whether a path is ignored by this file.
+
+        Args:
+            rel_path (str): The path relative to the repository root, inside ``base``.
+            name (str): The last component of ``rel_path``.
+            is_dir (bool): Whether the path is a directory; directory-only rules need it.
+
+        Returns:
+            Optional[bool]: True if ignored, False if re-included by a ``!`` rule, None if no
+                rule matches.
+        """
+        if self.base:
+            rel_path = rel_path[len(self.base) + 1 :]
+
+        compiled = self._dirs if is_dir else self._files
+        index = compiled.last_match(rel_path, name)
+        if index < 0:
+            return None
+
+        return not self._rules[index].negated
@@ -0,0 +1,377 @@
+import hashlib
+import os
+import stat
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
+
+from utils import Logger
+
+from .classifier import SAMPLE_SIZE, classify_file, classify_name, classify_sample
+from .content import count_lines, scan_file
+from .git import list_git_files
+from .git_objects import GitObjectStore
+from .ignore import IgnoreMatcher, IgnoreRules
+from .walker import iter_tree
+
+# Where the index gets its file list from
+SOURCE_WALK = "walk"
+SOURCE_GIT = "git"
+
+if TYPE_CHECKING:
+    from .manifest import Manifest
+
+
+@dataclass(slots=True)
+class IndexEntry:
+    path: str  # POSIX path relative to the repository root
+    size: int
+    mtime_ns: int
+    ignored: bool = False
+    is_dir: bool = False
+    content_hash: Optional[bytes] = None
+    line_count: Optional[int] = None  # Filled in by the manifest, or on first use
+    kind: Optional[str] = None  # See classifier.py; filled in by the manifest, or on first use
+
+
+class RepositoryIndex:
+    """In-memory snapshot of a repository's files, built once per analysis run.
+
+    The index walks the repository a single time and keeps the path, size, mtime and ignore flag
+    of every entry it sees. Ignored directories are recorded as a single entry and never
+    descended into. Directory listings for the repository or any of its subdirectories, and file
+    lookups for the read tool, are answered from memory afterwards.
+
+    An index built with ``from_git_objects`` describes a commit instead of the working tree: its
+    files are read from git blobs through ``read_bytes``, and the disk is never touched.
+
+    Example:
+        ```python
+        index = RepositoryIndex.build(Path("/path/to/repo"))
+        index.list_files("/path/to/repo/src")  # {"": ["main.py"], "utils": ["repo.py"]}
+        index.get("/path/to/repo/src/main.py")  # IndexEntry(path="src/main.py", ...)
+        ```
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        entries: Dict[str, IndexEntry],
+        objects: Optional[GitObjectStore] = None,
+        rules_fingerprint: str = SOURCE_GIT,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.objects = objects
+        # The fingerprint of the ignore rules the files were selected with, or "git" when git listed them
+        self.rules_fingerprint = rules_fingerprint
+        self._entries = entries
+
+        # Non-ignored file names grouped by directory, plus the sorted directory keys so that
+        # any subtree is a contiguous range found with bisect.
+        self._dir_files: Dict[str, List[str]] = {}
+        for entry in entries.values():
+            if entry.ignored or entry.is_dir:
+                continue
+            rel_dir, _, name = entry.path.rpartition("/")
+            self._dir_files.setdefault(rel_dir, []).append(name)
+
+        for files in self._dir_files.values():
+            files.sort()
+        self._dir_keys = sorted(self._dir_files)
+
+    @classmethod
+    def build(
+        cls,
+        root: Union[str, Path],
+        rules: Optional[IgnoreRules] = None,
+        manifest: Optional["Manifest"] = None,
+        source: str = SOURCE_WALK,
+        workers: int = 1,
+    ) -> "RepositoryIndex":
+        """Walk ``root`` once and build an index of everything found under it.
+
+        Args:
+            root (str | Path): The repository root.
+            rules (IgnoreRules, optional): Ignore rules. Defaults to the default ignore lists combined
+                with the repository's .gitignore files and .ai/ignore.
+            manifest (Manifest, optional): A persistent manifest to refresh incrementally instead of
+                walking the whole tree. Entries built from a manifest carry content hashes.
+            source (str, optional): ``"walk"`` to walk the filesystem with ``rules``, or ``"git"``
+                to take the file list from ``git ls-files`` and let ``.gitignore`` decide what is
+                excluded. Falls back to walking when ``root`` is not a git work tree.
+            workers (int, optional): Directories listed (and files hashed) concurrently. More than
+                one helps on network filesystems, where the walk is bound by I/O latency.
+
+        Returns:
+            RepositoryIndex: The populated index.
+        """
+        rules = rules or IgnoreMatcher.for_repository(root)
+
+        if source == SOURCE_GIT:
+            if (paths := list_git_files(root)) is not None:
+                return cls._build_from_paths(root, paths, manifest, workers)
+            Logger.debug(f"{root} is not a git work tree, falling back to walking the filesystem")
+
+        if manifest is not None:
+            return cls(root, manifest.refresh(root, rules, workers=workers), rules_fingerprint=rules.fingerprint)
+
+        entries: Dict[str, IndexEntry] = {}
+
+        for rel_dir, files, ignored in iter_tree(os.path.abspath(root), rules, workers):
+            for dir_entry in files:
+                entry = cls._make_entry(rel_dir, dir_entry, ignored=False)
+                entries[entry.path] = entry
+            for dir_entry in ignored:
+                entry = cls._make_entry(rel_dir, dir_entry, ignored=True)
+                entries[entry.path] = entry
+
+        return cls(root, entries, rules_fingerprint=rules.fingerprint)
+
+    @classmethod
+    def from_git_objects(cls, root: Union[str, Path], objects: GitObjectStore) -> "RepositoryIndex":
+        """Index the files of the commit pinned by ``objects`` instead of the working tree at ``root``.
+
+        Only committed files are listed, so, like the ``"git"`` source, ``.gitignore`` has already
+        decided what is excluded. Blob ids stand in for content hashes.
+        """
+        entries: Dict[str, IndexEntry] = {}
+        for tree_entry in objects.list_tree():
+            entries[tree_entry.path] = IndexEntry(
+                path=tree_entry.path,
+                size=tree_entry.size,
+                mtime_ns=0,
+                content_hash=bytes.fromhex(tree_entry.oid),
+            )
+
+        return cls(root, entries, objects=objects)
+
+    @classmethod
+    def _build_from_paths(
+        cls,
+        root: Union[str, Path],
+        paths: List[str],
+        manifest: Optional["Manifest"],
+        workers: int = 1,
+    ) -> "RepositoryIndex":
+        # Git already excluded everything that should be ignored, so no rules are applied
+        if manifest is not None:
+            return cls(root, manifest.refresh(root, IgnoreRules([], []), paths=paths, workers=workers))
+
+        entries: Dict[str, IndexEntry] = {}
+        for path in paths:
+            try:
+                stat_result = os.stat(os.path.join(root, path))
+            except OSError:
+                # Deleted from the work tree but still tracked
+                continue
+            if stat.S_ISDIR(stat_result.st_mode):
+                # Submodules are listed as a single path
+                continue
+
+            entries[path] = IndexEntry(path=path, size=stat_result.st_size, mtime_ns=stat_result.st_mtime_ns)
+
+        return cls(root, entries)
+
+    @staticmethod
+    def _make_entry(rel_dir: str, dir_entry: os.DirEntry, ignored: bool) -> IndexEntry:
+        path = f"{rel_dir}/{dir_entry.name}" if rel_dir else dir_entry.name
+        try:
+            stat = dir_entry.stat()
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            # Broken symlinks are still listed, like os.walk does
+            size, mtime_ns = 0, 0
+
+        return IndexEntry(
+            path=path,
+            size=size,
+            mtime_ns=mtime_ns,
+            ignored=ignored,
+            is_dir=ignored and dir_entry.is_dir(),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def file_count(self) -> int:
+        return sum(len(files) for files in self._dir_files.values())
+
+    def relative_path(self, path: Union[str, Path]) -> Optional[str]:
+        """Return ``path`` relative to the repository root, or None if it is outside of it."""
+        path = os.path.abspath(path)
+        if path == self.root:
+            return ""
+
+        rel_path = os.path.relpath(path, self.root)
+        if rel_path == ".." or rel_path.startswith(".." + os.sep):
+            return None
+
+        return rel_path.replace(os.sep, "/")
+
+    def get(self, path: Union[str, Path]) -> Optional[IndexEntry]:
+        rel_path = self.relative_path(path)
+        if rel_path is None:
+            return None
+
+        return self._entries.get(rel_path)
+
+    def line_count(self, path: Union[str, Path]) -> Optional[int]:
+        """Return the number of lines of an indexed file.
+
+        Counts from the manifest are used as they are. Otherwise the file is read once and the
+        count is kept on its entry for the rest of the run.
+        """
+        entry = self.get(path)
+        if entry is None or entry.ignored or entry.is_dir:
+            return None
+
+        if entry.line_count is None:
+            if self.objects is not None:
+                data = self._read_object(entry)
+                entry.line_count = None if data is None else data.count(b"\n") + (data[-1:] not in (b"", b"\n"))
+            else:
+                entry.line_count = count_lines(os.path.join(self.root, entry.path))
+
+        return entry.line_count
+
+    def kind(self, path: Union[str, Path]) -> Optional[str]:
+        """Return the kind of an indexed file (text, binary, minified, generated or vendored).
+
+        Kinds from the manifest are used as they are. Otherwise the first few KB of the file are
+        sampled once and the result is kept on its entry for the rest of the run.
+        """
+        entry = self.get(path)
+        if entry is None or entry.ignored or entry.is_dir:
+            return None
+
+        if entry.kind is None:
+            if self.objects is not None:
+                entry.kind = classify_name(entry.path)
+                if entry.kind is None and (data := self._read_object(entry)) is not None:
+                    entry.kind = classify_sample(data[:SAMPLE_SIZE])
+            else:
+                entry.kind = classify_file(os.path.join(self.root, entry.path), entry.path)
+
+        return entry.kind
+
+    def read_bytes(self, path: Union[str, Path]) -> bytes:
+        """Read a whole file: from its blob when the index describes a commit, from disk otherwise.
+
+        Paths outside the repository are always read from disk.
+
+        Raises:
+            FileNotFoundError: If the index describes a commit that does not contain ``path``.
+            OSError: If the file or the blob cannot be read.
+        """
+        if self.objects is None or not self.covers(path):
+            with open(path, "rb") as file:
+                return file.read()
+
+        entry = self.get(path)
+        if entry is None or entry.is_dir:
+            raise FileNotFoundError(f"{path} is not in commit {self.objects.commit}")
+
+        return self.objects.read(entry.content_hash.hex())
+
+    def tree_hash(self, excluded_dirs: Iterable[str] = (".ai",)) -> str:
+        """Hash the indexed files into a Merkle tree and return the hash of its root.
+
+        Each directory hashes the names and hashes of its files and subdirectories, so the result
+        only changes when a file is added, removed, renamed or modified. Ignored files are left out,
+        as are top-level ``excluded_dirs``. Files without a content hash (no manifest) are hashed
+        once and the hash is kept on their entry.
+
+        Blob ids and the manifest's BLAKE2b digests differ, so an index built from git objects and
+        one built from the working tree never hash the same.
+        """
+        excluded = set(excluded_dirs)
+        children: Dict[str, List[Tuple[str, bytes]]] = {"": []}
+        for rel_dir in self._dir_keys:
+            if rel_dir.partition("/")[0] in excluded:
+                continue
+            files = children.setdefault(rel_dir, [])
+            for name in self._dir_files[rel_dir]:
+                files.append((name, b"f" + self._content_hash(self._entries[f"{rel_dir}/{name}" if rel_dir else name])))
+            # Parents with no files of their own still need a node
+            parent = rel_dir
+            while parent:
+                parent = parent.rpartition("/")[0]
+                children.setdefault(parent, [])
+
+        # Deepest directories first, so every subdirectory is hashed before its parent
+        for rel_dir in sorted(children, key=lambda key: key.count("/") + bool(key), reverse=True):
+            digest = hashlib.sha256()
+            for name, node_hash in sorted(children[rel_dir]):
+                digest.update(name.encode() + b"\0" + node_hash + b"\0")
+            if not rel_dir:
+                return digest.hexdigest()
+            parent, _, name = rel_dir.rpartition("/")
+            children[parent].append((name, b"d" + digest.digest()))
+
+    def _content_hash(self, entry: IndexEntry) -> bytes:
+        if entry.content_hash is None:
+            scan = scan_file(os.path.join(self.root, entry.path), entry.path)
+            if scan is None:
+                # Unreadable files still count by name and size
+                return f"unreadable:{entry.size}".encode()
+            entry.content_hash, entry.line_count, entry.kind = scan
+
+        return entry.content_hash
+
+    def _read_object(self, entry: IndexEntry) -> Optional[bytes]:
+        try:
+            return self.objects.read(entry.content_hash.hex())
+        except OSError:
+            return None
+
+    def covers(self, path: Union[str, Path]) -> bool:
+        """Whether the index is authoritative for ``path``.
+
+        Paths outside the repository, or inside an ignored directory that was never walked, are
+        not covered and must be looked up on the filesystem instead.
+        """
+        rel_path = self.relative_path(path)
+        if rel_path is None:
+            return False
+
+        parent = rel_path
+        while parent:
+            parent = parent.rpartition("/")[0]
+            entry = self._entries.get(parent)
+            if entry is not None and entry.is_dir:
+                return False
+
+        return True
+
+    def list_files(self, directory: Union[str, Path]) -> Optional[Dict[str, List[str]]]:
+        """Group the non-ignored files under ``directory`` by their parent directory.
+
+        Args:
+            directory (str | Path): A directory inside the repository.
+
+        Returns:
+            Optional[Dict[str, List[str]]]: Sorted file names keyed by their directory relative to
+                ``directory`` (``""`` for ``directory`` itself), in the same shape as
+                ``walk_files``. None if ``directory`` is outside the repository.
+        """
+        rel_dir = self.relative_path(directory)
+        if rel_dir is None:
+            return None
+
+        if not rel_dir:
+            return {key: list(self._dir_files[key]) for key in self._dir_keys}
+
+        # "src" < "src-x" < "src/..." < "src0", so the subtree of "src" is the range ["src/", "src0")
+        prefix = rel_dir + "/"
+        start = bisect_left(self._dir_keys, prefix)
+        end = bisect_left(self._dir_keys, rel_dir + chr(ord("/") + 1))
+
+        dir_files = {}
+        if rel_dir in self._dir_files:
+            dir_files[""] = list(self._dir_files[rel_dir])
+        for key in self._dir_keys[start:end]:
+            dir_files[key[len(prefix) :]] = list(self._dir_files[key])
+
+        return dir_files
@@ -0,0 +1,139 @@
+from typing import Optional
+
+# Languages by file extension; compound extensions are looked up before the last one
+EXTENSION_LANGUAGES = {
+    # Python
+    ".py": "Python",
+    ".pyi": "Python",
+    ".ipynb": "Jupyter",
+    # Go
+    ".go": "Go",
+    # JavaScript / TypeScript
+    ".js": "JavaScript",
+    ".mjs": "JavaScript",
+    ".cjs": "JavaScript",
+    ".jsx": "JavaScript",
+    ".ts": "TypeScript",
+    ".mts": "TypeScript",
+    ".cts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".d.ts": "TypeScript",
+    ".vue": "Vue",
+    ".svelte": "Svelte",
+    # JVM
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".kts": "Kotlin",
+    ".scala": "Scala",
+    ".groovy": "Groovy",
+    ".gradle": "Gradle",
+    # C family
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".cxx": "C++",
+    ".hh": "C++",
+    ".hpp": "C++",
+    ".cs": "C#",
+    ".m": "Objective-C",
+    ".mm": "Objective-C",
+    ".swift": "Swift",
+    # Other languages
+    ".rs": "Rust",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".dart": "Dart",
+    ".ex": "Elixir",
+    ".exs": "Elixir",
+    ".erl": "Erlang",
+    ".hs": "Haskell",
+    ".ml": "OCaml",
+    ".lua": "Lua",
+    ".r": "R",
+    ".jl": "Julia",
+    ".pl": "Perl",
+    ".clj": "Clojure",
+    # Shell
+    ".sh": "Shell",
+    ".bash": "Shell",
+    ".zsh": "Shell",
+    ".ps1": "PowerShell",
+    # Data and configuration
+    ".json": "JSON",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".toml": "TOML",
+    ".ini": "INI",
+    ".cfg": "INI",
+    ".xml": "XML",
+    ".csv": "CSV",
+    ".env": "Dotenv",
+    ".properties": "Properties",
+    # Interfaces and queries
+    ".proto": "Protobuf",
+    ".graphql": "GraphQL",
+    ".gql": "GraphQL",
+    ".sql": "SQL",
+    ".thrift": "Thrift",
+    # Web
+    ".html": "HTML",
+    ".htm": "HTML",
+    ".css": "CSS",
+    ".scss": "SCSS",
+    ".sass": "Sass",
+    ".less": "Less",
+    # Documentation
+    ".md": "Markdown",
+    ".mdx": "Markdown",
+    ".rst": "reStructuredText",
+    ".txt": "Text",
+    # Infrastructure
+    ".tf": "Terraform",
+    ".hcl": "HCL",
+    ".dockerfile": "Dockerfile",
+    ".mk": "Makefile",
+}
+
+# Languages of files recognised by their whole name
+FILE_NAME_LANGUAGES = {
+    "Dockerfile": "Dockerfile",
+    "Containerfile": "Dockerfile",
+    "Makefile": "Makefile",
+    "GNUmakefile": "Makefile",
+    "Jenkinsfile": "Groovy",
+    "Gemfile": "Ruby",
+    "Rakefile": "Ruby",
+    "Vagrantfile": "Ruby",
+    "BUILD": "Starlark",
+    "BUILD.bazel": "Starlark",
+    "WORKSPACE": "Starlark",
+    "go.mod": "Go Module",
+    "go.sum": "Go Checksums",
+    "CMakeLists.txt": "CMake",
+}
+
+
+def detect_language(name: str) -> Optional[str]:
+    """Guess the language of a file from its name, without reading it.
+
+    Args:
+        name (str): The file name, with or without its directory.
+
+    Returns:
+        Optional[str]: The language name, or None if the name is not recognised.
+    """
+    name = name.rpartition("/")[2]
+    if name in FILE_NAME_LANGUAGES:
+        return FILE_NAME_LANGUAGES[name]
+    if name.startswith("Dockerfile."):
+        return "Dockerfile"
+
+    lower = name.lower()
+    first_dot = lower.find(".", 1)
+    while first_dot != -1:
+        if language := EXTENSION_LANGUAGES.get(lower[first_dot:]):
+            return language
+        first_dot = lower.find(".", first_dot + 1)
+
+    return None
@@ -0,0 +1,459 @@
+import os
+import sqlite3
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from utils import Logger
+
+from .classifier import settings_fingerprint
+from .content import scan_file
+from .ignore import GITIGNORE_FILE_NAME, IgnoreRules
+from .index import IndexEntry
+from .walker import scan_directory, traverse
+
+MANIFEST_DIR = Path(".ai") / "cache"
+MANIFEST_FILE_NAME = "manifest.db"
+
+# Bump when the tables change; older manifests are discarded and rebuilt.
+SCHEMA_VERSION = 3
+
+# Directories modified this close to the previous scan may have changed again within the same
+# mtime tick, so their listing is not trusted (the same "racily clean" problem git has).
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def ensure_cache_dir(path: Union[str, Path]) -> None:
+    """Create the cache directory ``path`` and keep its contents out of git.
+
+    Every writer of ``<repo>/.ai/cache/`` calls this, so the cache is never committed, including by
+    the cronjob's ``git add .``.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    gitignore = path / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n")
+
+
+class Manifest:
+    """Persistent record of a repository's files, stored in SQLite under ``<repo>/.ai/cache/``.
+
+    The manifest keeps the path, size, mtime, content hash, line count and kind (binary,
+    generated, ...) of every indexed file, plus the mtime of every walked directory. Refreshing it
+    against the working tree only lists directories whose mtime changed since the previous run and
+    only hashes files whose size or mtime changed, so repeated runs over a mostly unchanged
+    repository cost one ``stat`` per file instead of a full walk and a full read.
+
+    Editing a file in place does not change its directory's mtime, which is why files in
+    unchanged directories are still stat-ed individually. A changed ``.gitignore`` forces its
+    whole subtree to be listed again, since it may classify any path below it differently.
+
+    Example:
+        ```python
+        manifest = Manifest.for_repository(Path("/path/to/repo"))
+        entries = manifest.refresh("/path/to/repo", IgnoreRules())
+        ```
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+
+    @classmethod
+    def for_repository(cls, repo_path: Union[str, Path]) -> "Manifest":
+        return cls(Path(repo_path) / MANIFEST_DIR / MANIFEST_FILE_NAME)
+
+    @staticmethod
+    def fingerprint(rules: IgnoreRules) -> str:
+        # Kinds are stored too, so a manifest written with other classifier settings is discarded as well
+        return f"{rules.fingerprint}:{settings_fingerprint()}"
+
+    def refresh(
+        self,
+        root: Union[str, Path],
+        rules: IgnoreRules,
+        paths: Optional[Iterable[str]] = None,
+        workers: int = 1,
+    ) -> Dict[str, IndexEntry]:
+        """Bring the manifest up to date with the working tree under ``root``.
+
+        Args:
+            root (str | Path): The repository root.
+            rules (IgnoreRules): The ignore rules used to classify entries. A manifest written
+                with different rules, or different file classifier settings, is discarded.
+            paths (Iterable[str], optional): The files to record, relative to ``root``, when the
+                file list comes from somewhere else than a directory walk (e.g. ``git ls-files``).
+                Only the hashes are reused from the previous run in that case.
+            workers (int, optional): Directories (or, with ``paths``, files) refreshed concurrently.
+
+        Returns:
+            Dict[str, IndexEntry]: Every entry found, keyed by its path relative to ``root``.
+        """
+        root = os.path.abspath(root)
+        scan_started_ns = time.time_ns()
+        fingerprint = self.fingerprint(rules)
+        previous_entries, previous_dirs, previous_scan_ns = self._load(fingerprint)
+
+        if paths is not None:
+            return self._refresh_paths(
+                root, paths, previous_entries, previous_dirs, fingerprint, scan_started_ns, workers
+            )
+
+        # Children of every previously seen directory, so unchanged directories are not listed again
+        previous_children: Dict[str, List[IndexEntry]] = {}
+        for entry in previous_entries.values():
+            previous_children.setdefault(entry.path.rpartition("/")[0], []).append(entry)
+        previous_subdirs: Dict[str, List[str]] = {}
+        for rel_dir in previous_dirs:
+            if rel_dir:
+                previous_subdirs.setdefault(rel_dir.rpartition("/")[0], []).append(rel_dir)
+
+        cache_dir = os.path.relpath(self.path.parent, root).replace(os.sep, "/")
+        entries: Dict[str, IndexEntry] = {}
+        dir_mtimes: Dict[str, int] = {}
+        rescanned_dirs = 0
+        hashed_files = 0
+
+        def visit(item: Tuple[str, IgnoreRules, bool]):
+            # (directory, rules in effect for its parent, whether an ignore file above it changed)
+            rel_dir, parent_rules, force = item
+            abs_dir = os.path.join(root, rel_dir) if rel_dir else root
+            prefix = f"{rel_dir}/" if rel_dir else ""
+
+            try:
+                dir_mtime_ns = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                return None, ()
+
+            unchanged = (
+                not force
+                and previous_dirs.get(rel_dir) == dir_mtime_ns
+                and dir_mtime_ns < previous_scan_ns - RACY_WINDOW_NS
+            )
+
+            # Editing a .gitignore in place changes how the whole subtree is classified, without
+            # touching the directory's mtime. Adding or removing one does change the mtime.
+            previous_ignore_file = previous_entries.get(prefix + GITIGNORE_FILE_NAME)
+            if unchanged and previous_ignore_file is None:
+                ignore_file_changed = False
+            else:
+                ignore_file_changed = self._file_state(os.path.join(abs_dir, GITIGNORE_FILE_NAME)) != (
+                    (previous_ignore_file.size, previous_ignore_file.mtime_ns) if previous_ignore_file else None
+                )
+            force = force or ignore_file_changed
+
+            children: List[Tuple[str, bool, bool]] = []  # (path, ignored, is_dir)
+            subdirs: List[str] = []
+
+            rescanned = not unchanged or ignore_file_changed
+            if not rescanned:
+                previous_dir_children = previous_children.get(rel_dir, [])
+                children = [(entry.path, entry.ignored, entry.is_dir) for entry in previous_dir_children]
+                subdirs = previous_subdirs.get(rel_dir, [])
+                dir_rules = parent_rules.enter(
+                    rel_dir, abs_dir, [entry.path.rpartition("/")[2] for entry in previous_dir_children]
+                )
+            else:
+                scan = scan_directory(abs_dir, parent_rules, rel_dir)
+                if scan is None:
+                    return None, ()
+
+                dir_rules = scan.rules
+                children.extend((prefix + dir_entry.name, False, False) for dir_entry in scan.files)
+                children.extend((prefix + dir_entry.name, True, dir_entry.is_dir()) for dir_entry in scan.ignored)
+                for dir_entry in scan.subdirs:
+                    if prefix + dir_entry.name == cache_dir:
+                        # Never index the manifest itself
+                        children.append((cache_dir, True, True))
+                    else:
+                        subdirs.append(prefix + dir_entry.name)
+
+            dir_entries = []
+            dir_hashed = 0
+            for path, ignored, is_dir in children:
+                try:
+                    stat_result = os.stat(os.path.join(root, path))
+                except OSError:
+                    # Broken symlinks are still listed, like os.walk does
+                    stat_result = None
+
+                previous = previous_entries.get(path)
+                entry, hashed = self._refresh_entry(root, path, stat_result, previous, ignored, is_dir)
+                dir_entries.append(entry)
+                dir_hashed += hashed
+
+            result = (rel_dir, dir_mtime_ns, dir_entries, rescanned, dir_hashed)
+            return result, [(subdir, dir_rules, force) for subdir in subdirs]
+
+        # Directories are visited concurrently with several workers, so hashing overlaps with listing too
+        for result in traverse(("", rules, False), visit, workers):
+            if result is None:
+                continue
+            rel_dir, dir_mtime_ns, dir_entries, rescanned, dir_hashed = result
+            dir_mtimes[rel_dir] = dir_mtime_ns
+            entries.update((entry.path, entry) for entry in dir_entries)
+            rescanned_dirs += rescanned
+            hashed_files += dir_hashed
+
+        self._save(entries, dir_mtimes, fingerprint, scan_started_ns, previous_entries, previous_dirs)
+        Logger.debug(
+            "Repository manifest refreshed",
+            data={
+                "manifest": str(self.path),
+                "entries": len(entries),
+                "directories": len(dir_mtimes),
+                "rescanned_directories": rescanned_dirs,
+                "hashed_files": hashed_files,
+            },
+        )
+
+        return entries
+
+    @staticmethod
+    def _file_state(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+
+        return stat_result.st_size, stat_result.st_mtime_ns
+
+    def _refresh_paths(
+        self,
+        root: str,
+        paths: Iterable[str],
+        previous_entries: Dict[str, IndexEntry],
+        previous_dirs: Dict[str, int],
+        fingerprint: str,
+        scan_started_ns: int,
+        workers: int = 1,
+    ) -> Dict[str, IndexEntry]:
+        entries: Dict[str, IndexEntry] = {}
+        hashed_files = 0
+
+        def refresh(path: str) -> Optional[Tuple[IndexEntry, bool]]:
+            try:
+                stat_result = os.stat(os.path.join(root, path))
+            except OSError:
+                # Deleted from the work tree but still tracked
+                return None
+            if stat.S_ISDIR(stat_result.st_mode):
+                # Submodules are listed as a single path
+                return None
+
+            return self._refresh_entry(root, path, stat_result, previous_entries.get(path), False, False)
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="repo-walker") as executor:
+                results = list(executor.map(refresh, paths))
+        else:
+            results = map(refresh, paths)
+
+        for result in results:
+            if result is None:
+                continue
+            entry, hashed = result
+            entries[entry.path] = entry
+            hashed_files += hashed
+
+        # No directory mtimes: a later walk-based refresh lists every directory again
+        self._save(entries, {}, fingerprint, scan_started_ns, previous_entries, previous_dirs)
+        Logger.debug(
+            "Repository manifest refreshed",
+            data={"manifest": str(self.path), "entries": len(entries), "hashed_files": hashed_files},
+        )
+
+        return entries
+
+    @staticmethod
+    def _refresh_entry(
+        root: str,
+        path: str,
+        stat_result: Optional[os.stat_result],
+        previous: Optional[IndexEntry],
+        ignored: bool,
+        is_dir: bool,
+    ) -> Tuple[IndexEntry, bool]:
+        abs_path = os.path.join(root, path)
+        if stat_result is not None:
+            size, mtime_ns = stat_result.st_size, stat_result.st_mtime_ns
+        else:
+            size, mtime_ns = 0, 0
+
+        content_hash = None
+        line_count = None
+        kind = None
+        hashed = False
+        if not ignored:
+            if previous is not None and (previous.size, previous.mtime_ns) == (size, mtime_ns):
+                content_hash, line_count, kind = previous.content_hash, previous.line_count, previous.kind
+            if content_hash is None or line_count is None or kind is None:
+                content_hash, line_count, kind = scan_file(abs_path, path) or (None, None, None)
+                hashed = True
+
+        entry = IndexEntry(
+            path=path,
+            size=size,
+            mtime_ns=mtime_ns,
+            ignored=ignored,
+            is_dir=is_dir,
+            content_hash=content_hash,
+            line_count=line_count,
+            kind=kind,
+        )
+
+        return entry, hashed
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            connection.executescript(
+                f"""
+                DROP TABLE IF EXISTS entries;
+                DROP TABLE IF EXISTS dirs;
+                DROP TABLE IF EXISTS meta;
+                CREATE TABLE entries (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash BLOB,
+                    line_count INTEGER,
+                    kind TEXT,
+                    ignored INTEGER NOT NULL,
+                    is_dir INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL) WITHOUT ROWID;
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+                PRAGMA user_version = {SCHEMA_VERSION};
+                """
+            )
+
+        return connection
+
+    def _load(self, fingerprint: str) -> Tuple[Dict[str, IndexEntry], Dict[str, int], int]:
+        if not self.path.exists():
+            return {}, {}, 0
+
+        try:
+            connection = self._connect()
+        except sqlite3.Error as e:
+            self._discard(e)
+            return {}, {}, 0
+
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+            if meta.get("rules") != fingerprint:
+                return {}, {}, 0
+
+            entries = {
+                path: IndexEntry(
+                    path=path,
+                    size=size,
+                    mtime_ns=mtime_ns,
+                    ignored=bool(ignored),
+                    is_dir=bool(is_dir),
+                    content_hash=content_hash,
+                    line_count=line_count,
+                    kind=kind,
+                )
+                for path, size, mtime_ns, content_hash, line_count, kind, ignored, is_dir in connection.execute(
+                    "SELECT path, size, mtime_ns, content_hash, line_count, kind, ignored, is_dir FROM entries"
+                )
+            }
+            dirs = dict(connection.execute("SELECT path, mtime_ns FROM dirs"))
+
+            return entries, dirs, int(meta.get("scanned_at_ns", 0))
+        except sqlite3.Error as e:
+            self._discard(e)
+            return {}, {}, 0
+        finally:
+            connection.close()
+
+    def _discard(self, error: sqlite3.Error):
+        if isinstance(error, sqlite3.OperationalError):
+            # Locked or busy: another run owns the manifest, so it is only left unused this time
+            Logger.warning(f"Ignoring the unavailable repository manifest {self.path}: {error}")
+            return
+
+        Logger.warning(f"Discarding unreadable repository manifest {self.path}: {error}")
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def _save(
+        self,
+        entries: Dict[str, IndexEntry],
+        dir_mtimes: Dict[str, int],
+        fingerprint: str,
+        scanned_at_ns: int,
+        previous_entries: Dict[str, IndexEntry],
+        previous_dirs: Dict[str, int],
+    ):
+        # Only the rows that changed since the previous run are written, in a single transaction
+        try:
+            ensure_cache_dir(self.path.parent)
+            connection = self._connect()
+        except (OSError, sqlite3.Error) as e:
+            Logger.warning(f"Failed to save the repository manifest {self.path}: {e}")
+            return
+
+        try:
+            with connection:
+                stored_rules = connection.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+                if stored_rules != (fingerprint,) or not (previous_entries or previous_dirs):
+                    # Written with other rules, or not loaded: the stored rows are not known, so all are replaced
+                    previous_entries, previous_dirs = {}, {}
+                    connection.execute("DELETE FROM entries")
+                    connection.execute("DELETE FROM dirs")
+
+                connection.executemany(
+                    "DELETE FROM entries WHERE path = ?",
+                    ((path,) for path in previous_entries.keys() - entries.keys()),
+                )
+                connection.executemany(
+                    """
+                    INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (path) DO UPDATE SET
+                        size = excluded.size,
+                        mtime_ns = excluded.mtime_ns,
+                        content_hash = excluded.content_hash,
+                        line_count = excluded.line_count,
+                        kind = excluded.kind,
+                        ignored = excluded.ignored,
+                        is_dir = excluded.is_dir
+                    """,
+                    (
+                        (
+                            entry.path,
+                            entry.size,
+                            entry.mtime_ns,
+                            entry.content_hash,
+                            entry.line_count,
+                            entry.kind,
+                            entry.ignored,
+                            entry.is_dir,
+                        )
+                        for path, entry in entries.items()
+                        if previous_entries.get(path) != entry
+                    ),
+                )
+                connection.executemany(
+                    "DELETE FROM dirs WHERE path = ?",
+                    ((path,) for path in previous_dirs.keys() - dir_mtimes.keys()),
+                )
+                connection.executemany(
+                    "INSERT INTO dirs VALUES (?, ?) ON CONFLICT (path) DO UPDATE SET mtime_ns = excluded.mtime_ns",
+                    ((path, mtime_ns) for path, mtime_ns in dir_mtimes.items() if previous_dirs.get(path) != mtime_ns),
+                )
+                connection.executemany(
+                    "INSERT INTO meta VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    [("rules", fingerprint), ("scanned_at_ns", str(scanned_at_ns))],
+                )
+        except sqlite3.Error as e:
+            # The index is still built from the refreshed entries, only the next run starts over
+            Logger.warning(f"Failed to save the repository manifest {self.path}: {e}")
+        finally:
+            connection.close()
@@ -0,0 +1,172 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+from .ignore import IgnoreRules
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class DirectoryScan(NamedTuple):
+    files: List[os.DirEntry]  # Non-ignored files
+    subdirs: List[os.DirEntry]  # Directories to descend into
+    ignored: List[os.DirEntry]  # Ignored files and pruned directories
+    rules: IgnoreRules  # The rules that apply inside this directory, for its subdirectories
+
+
+def scan_directory(abs_dir: str, rules: IgnoreRules, rel_dir: str = "") -> Optional[DirectoryScan]:
+    """List a single directory and classify its entries.
+
+    Entry types come from ``os.scandir`` and do not need an extra ``stat`` call on most
+    filesystems. Symlinked directories are dropped, since they are not followed.
+
+    Args:
+        abs_dir (str): The directory to list.
+        rules (IgnoreRules): The ignore rules in effect for the directory's parent.
+        rel_dir (str, optional): The directory relative to the walk root, in POSIX form.
+
+    Returns:
+        Optional[DirectoryScan]: The classified entries, or None if the directory cannot be read.
+    """
+    try:
+        with os.scandir(abs_dir) as iterator:
+            entries = list(iterator)
+    except OSError:
+        return None
+
+    # Picks up the directory's own ignore file, if the rules support one
+    rules = rules.enter(rel_dir, abs_dir, [entry.name for entry in entries])
+
+    files = []
+    subdirs = []
+    ignored = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+
+        if is_dir and entry.is_symlink():
+            continue
+
+        if rules.is_ignored(rel_dir, entry.name, is_dir):
+            ignored.append(entry)
+        elif is_dir:
+            subdirs.append(entry)
+        else:
+            files.append(entry)
+
+    return DirectoryScan(files, subdirs, ignored, rules)
+
+
+def traverse(root: T, visit: Callable[[T], Tuple[R, Iterable[T]]], workers: int = 1) -> Iterator[R]:
+    """Visit a tree of directories, optionally with a bounded thread pool.
+
+    ``visit`` processes one directory and returns its result along with the subdirectories to
+    visit next. With a single worker the tree is visited depth-first in the calling thread.
+    With more, every subdirectory is submitted to the pool as soon as its parent has been
+    visited, so that on high-latency filesystems many directories are listed at the same time;
+    results are then yielded in completion order.
+
+    Args:
+        root (T): The first directory to visit.
+        visit (Callable[[T], Tuple[R, Iterable[T]]]): Processes a directory. Called from worker
+            threads when ``workers`` is greater than 1, so it must not share mutable state.
+        workers (int, optional): The maximum number of directories visited at the same time.
+
+    Yields:
+        R: The result of every visited directory.
+    """
+    if workers <= 1:
+        stack = [root]
+        while stack:
+            result, children = visit(stack.pop())
+            yield result
+            stack.extend(reversed(list(children)))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="repo-walker") as executor:
+        pending = {executor.submit(visit, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result, children = future.result()
+                yield result
+                pending.update(executor.submit(visit, child) for child in children)
+
+
+def iter_tree(
+    directory: str,
+    rules: IgnoreRules,
+    workers: int = 1,
+) -> Iterator[Tuple[str, List[os.DirEntry], List[os.DirEntry]]]:
+    """Walk a directory tree, pruning ignored subtrees before descending into them.
+
+    Unlike ``os.walk`` followed by filtering, ignored directories are never opened, so nothing
+    below ``node_modules``, ``.git`` and friends is ever listed or stat-ed.
+
+    Symlinked directories are not followed and unreadable directories are skipped, matching
+    ``os.walk`` defaults.
+
+    Args:
+        directory (str): The directory to walk.
+        rules (IgnoreRules): The ignore rules used to prune directories and drop files.
+        workers (int, optional): Directories listed concurrently. With more than one worker the
+            whole tree is scanned first and then yielded in sorted order, with sorted entries,
+            so the output does not depend on thread scheduling.
+
+    Yields:
+        Tuple[str, List[os.DirEntry], List[os.DirEntry]]: The directory path relative to ``directory``
+            in POSIX form (``""`` for the root itself), the non-ignored file entries it contains and
+            the ignored entries (files and pruned directories) found in it.
+    """
+
+    def visit(item: Tuple[str, str, IgnoreRules]):
+        rel_dir, abs_dir, dir_rules = item
+        scan = scan_directory(abs_dir, dir_rules, rel_dir)
+        if scan is None:
+            return None, ()
+
+        subdirs = [
+            (f"{rel_dir}/{entry.name}" if rel_dir else entry.name, entry.path, scan.rules) for entry in scan.subdirs
+        ]
+        return (rel_dir, scan.files, scan.ignored), subdirs
+
+    results = traverse(("", directory, rules), visit, workers)
+
+    if workers > 1:
+        # Sorting by path components puts every directory right before its subdirectories
+        results = sorted(filter(None, results), key=lambda result: result[0].split("/"))
+        for rel_dir, files, ignored in results:
+            yield rel_dir, sorted(files, key=_entry_name), sorted(ignored, key=_entry_name)
+        return
+
+    for result in results:
+        if result is not None:
+            yield result
+
+
+def _entry_name(entry: os.DirEntry) -> str:
+    return entry.name
+
+
+def walk_files(directory: str, rules: IgnoreRules, workers: int = 1) -> Dict[str, List[str]]:
+    """Group the non-ignored files under ``directory`` by their parent directory.
+
+    Args:
+        directory (str): The directory to walk.
+        rules (IgnoreRules): The ignore rules used to prune directories and drop files.
+        workers (int, optional): Directories listed concurrently, see ``iter_tree``.
+
+    Returns:
+        Dict[str, List[str]]: File names keyed by their directory relative to ``directory``
+            (``""`` for the root itself). Directories without files are omitted.
+    """
+    dir_files = {}
+
+    for rel_dir, files, _ in iter_tree(directory, rules, workers):
+        if files:
+            dir_files[rel_dir] = [entry.name for entry in files]
+
+    return dir_files
@@ -0,0 +1,14 @@
+from .relevance_index import RelevanceIndex, tokenize
+from .relevant_code import RelevantCodeTool
+from .search_code import SearchCodeTool
+from .trigram_index import TrigramIndex, required_literals, trigrams
+
+__all__ = [
+    "RelevanceIndex",
+    "RelevantCodeTool",
+    "SearchCodeTool",
+    "TrigramIndex",
+    "required_literals",
+    "tokenize",
+    "trigrams",
+]
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from utils import Logger, get_clean_commit
+
+from ..file_tool import ContentCache, content_cache
+from ..file_tool.line_index import read_lines
+from ..repo_index.classifier import settings_fingerprint
+from ..repo_index.manifest import MANIFEST_DIR, ensure_cache_dir
+from ..symbol_tool import Symbol, SymbolIndex
+from ..symbol_tool.symbol_index import MAX_SOURCE_BYTES
+
+RELEVANCE_FILE_NAME = "relevance.db"
+
+# Bump when the chunking, the tokenizer or the stored format change; older indexes are ignored.
+SCHEMA_VERSION = 2
+
+# Indexes of older commits, or other settings, kept in the cache, most recent first
+MAX_CACHED_COMMITS = 5
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Names say more about a chunk than its body, so their terms are counted this many times
+NAME_WEIGHT = 3
+
+WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Parts of an identifier: "HTTPRequestHandler" -> "HTTP", "Request", "Handler"
+SUBWORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# Words too common in code or in questions to tell chunks apart
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be by class const def do else elif end for from func function get go how if import in is it
+    let new nil none not null of on or package private public return self set static the this to true false type var
+    void what when where which with
+    """.split()
+)
+
+
+def _stem(word: str) -> str:
+    # Plurals are folded so that "orders" finds "order"; anything more aggressive hurts identifiers
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Split code or a question into lowercase terms, breaking identifiers into their parts."""
+    terms: List[str] = []
+    for word in WORD_PATTERN.findall(text):
+        parts = [part.lower() for part in SUBWORD_PATTERN.findall(word)]
+        if len(parts) > 1:
+            # The whole identifier is kept as well, so an exact name ranks above its scattered parts
+            terms.append(word.lower().strip("_"))
+        terms.extend(parts)
+
+    return [_stem(term) for term in terms if len(term) > 1 and term not in STOP_WORDS]
+
+
+class Chunk(NamedTuple):
+    path: str  # POSIX path relative to the repository root
+    qualname: str
+    kind: str
+    line: int  # First line, 1-based
+    end_line: int  # Last line, inclusive; the start of the first nested definition for classes
+
+
+class ScoredChunk(NamedTuple):
+    chunk: Chunk
+    score: float
+
+
+def _chunks(symbols: List[Symbol]) -> List[Chunk]:
+    """Turn the definitions of a file into non-overlapping chunks.
+
+    A definition containing other definitions, usually a class, is cut where the first nested one
+    starts, so that its chunk holds the header, docstring and attributes and every method is a
+    chunk of its own.
+    """
+    ordered = sorted(symbols, key=lambda symbol: (symbol.line, -symbol.end_line))
+    chunks: List[Chunk] = []
+    for position, symbol in enumerate(ordered):
+        end_line = symbol.end_line
+        following = ordered[position + 1] if position + 1 < len(ordered) else None
+        if following is not None and following.line <= symbol.end_line:
+            end_line = max(following.line - 1, symbol.line)
+        chunks.append(Chunk(symbol.path, symbol.qualname, symbol.kind, symbol.line, end_line))
+
+    return chunks
+
+
+class RelevanceIndex:
+    """BM25 index over the function- and class-sized chunks of a repository.
+
+    Chunks are the definitions found by the symbol index, so only languages with a symbol extractor
+    are covered. Every chunk is indexed with the terms of its path, its qualified name and its source,
+    identifiers being split into their parts. The index is built on the first query and, when the
+    files are read from a commit or the working tree matches one, cached in ``.ai/cache/relevance.db``
+    under that commit and the settings it was built with; a later run on the same commit loads it
+    instead of reading and tokenizing every definition again.
+
+    Example:
+        ```python
+        relevance = RelevanceIndex(symbol_index, cache_path=RelevanceIndex.cache_path_for(repo_path))
+        relevance.search("http handlers for orders", limit=5)  # [ScoredChunk(chunk=Chunk(...), score=7.4), ...]
+        ```
+    """
+
+    def __init__(
+        self,
+        symbol_index: SymbolIndex,
+        cache_path: Optional[Union[str, Path]] = None,
+        cache: Optional[ContentCache] = content_cache,
+    ) -> None:
+        self._symbol_index = symbol_index
+        self._cache_path = Path(cache_path) if cache_path is not None else None
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._built = False
+        self._chunks: List[Chunk] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}  # Term -> (chunk, term frequency)
+
+    @staticmethod
+    def cache_path_for(repo_path: Union[str, Path]) -> Path:
+        return Path(repo_path) / MANIFEST_DIR / RELEVANCE_FILE_NAME
+
+    def __len__(self) -> int:
+        self._build()
+        return len(self._chunks)
+
+    def search(self, query: str, limit: int = 10) -> List[ScoredChunk]:
+        """Return the chunks that best match the terms of ``query``, best first."""
+        self._build()
+        if not self._chunks:
+            return []
+
+        average_length = sum(self._lengths) / len(self._lengths)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (len(self._chunks) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, frequency in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[chunk_id] / average_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [ScoredChunk(self._chunks[chunk_id], score) for chunk_id, score in best]
+
+    def chunk_text(self, chunk: Chunk, max_lines: Optional[int] = None) -> str:
+        """Read the source of ``chunk``, at most ``max_lines`` lines of it."""
+        line_count = chunk.end_line - chunk.line + 1
+        if max_lines is not None:
+            line_count = min(line_count, max_lines)
+        root = self._symbol_index.root
+        path = os.path.join(root, chunk.path) if root is not None else chunk.path
+        return read_lines(path, chunk.line - 1, line_count, self._cache, self._symbol_index.repo_index).text
+
+    def _build(self) -> None:
+        with self._lock:
+            if self._built:
+                return
+            self._built = True
+
+            start_time = time.time()
+            commit = self._commit() if self._cache_path is not None else None
+            cache_key = self._cache_key(commit) if commit is not None else None
+            if cache_key is not None and self._load(cache_key):
+                source = "cache"
+            else:
+                self._index()
+                source = "source"
+                if cache_key is not None:
+                    self._save(cache_key)
+
+            Logger.debug(
+                "Relevance index ready",
+                data={
+                    "source": source,
+                    "commit": commit,
+                    "chunks": len(self._chunks),
+                    "terms": len(self._postings),
+                    "total_time": f"{time.time() - start_time:.2f}s",
+                },
+            )
+
+    def _commit(self) -> Optional[str]:
+        repo_index = self._symbol_index.repo_index
+        if repo_index is None:
+            return None
+        if repo_index.objects is not None:
+            # The files were read from this commit, whatever the working tree holds
+            return repo_index.objects.commit
+
+        return get_clean_commit(Path(repo_index.root))
+
+    def _cache_key(self, commit: str) -> str:
+        # The commit fixes the files; the settings deciding which of them are indexed, and how, are part of the key
+        settings = (
+            self._symbol_index.repo_index.rules_fingerprint,
+            settings_fingerprint(),
+            MAX_SOURCE_BYTES,
+            NAME_WEIGHT,
+            sorted(STOP_WORDS),
+            WORD_PATTERN.pattern,
+            SUBWORD_PATTERN.pattern,
+        )
+        return f"{commit}:{hashlib.blake2b(repr(settings).encode(), digest_size=16).hexdigest()}"
+
+    def _index(self) -> None:
+        by_file: Dict[str, List[Symbol]] = {}
+        for symbol in self._symbol_index.symbols():
+            by_file.setdefault(symbol.path, []).append(symbol)
+
+        for symbols in by_file.values():
+            try:
+                path = self._symbol_index.abs_path(symbols[0])
+                text = read_lines(path, 0, 0, self._cache, self._symbol_index.repo_index).text
+            except (OSError, UnicodeDecodeError):
+                continue
+
+            lines = text.split("\n")
+            for chunk in _chunks(symbols):
+                terms = Counter(tokenize("\n".join(lines[chunk.line - 1 : chunk.end_line])))
+                terms.update(tokenize(chunk.path))
+                for _ in range(NAME_WEIGHT):
+                    terms.update(tokenize(chunk.qualname))
+
+                chunk_id = len(self._chunks)
+                self._chunks.append(chunk)
+                self._lengths.append(sum(terms.values()))
+                for term, frequency in terms.items():
+                    self._postings.setdefault(term, []).append((chunk_id, frequency))
+
+    def _load(self, cache_key: str) -> bool:
+        if not self._cache_path.exists():
+            return False
+
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute("SELECT data FROM indexes WHERE cache_key = ?", (cache_key,)).fetchone()
+            finally:
+                connection.close()
+            if row is None:
+                return False
+
+            data = json.loads(zlib.decompress(row[0]))
+            self._chunks = [Chunk(*chunk) for chunk in data["chunks"]]
+            self._lengths = data["lengths"]
+            self._postings = {
+                term: [tuple(posting) for posting in postings] for term, postings in data["postings"].items()
+            }
+        except (sqlite3.Error, zlib.error, ValueError, KeyError, TypeError) as e:
+            Logger.warning(f"Ignoring the unreadable relevance index in {self._cache_path}: {e}")
+            self._chunks, self._lengths, self._postings = [], [], {}
+            return False
+
+        return True
+
+    def _save(self, cache_key: str) -> None:
+        data = zlib.compress(
+            json.dumps({"chunks": self._chunks, "lengths": self._lengths, "postings": self._postings}).encode()
+        )
+        try:
+            ensure_cache_dir(self._cache_path.parent)
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO indexes (cache_key, created_at, data) VALUES (?, ?, ?)",
+                        (cache_key, time.time(), data),
+                    )
+                    connection.execute(
+                        "DELETE FROM indexes WHERE cache_key NOT IN "
+                        "(SELECT cache_key FROM indexes ORDER BY created_at DESC LIMIT ?)",
+                        (MAX_CACHED_COMMITS,),
+                    )
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as e:
+            # The index still serves this run; the next one rebuilds it
+            Logger.warning(f"Failed to cache the relevance index in {self._cache_path}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._cache_path)
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            connection.executescript(
+                f"""
+                DROP TABLE IF EXISTS indexes;
+                CREATE TABLE indexes (cache_key TEXT PRIMARY KEY, created_at REAL NOT NULL, data BLOB NOT NULL);
+                PRAGMA user_version = {SCHEMA_VERSION};
+                """
+            )
+
+        return connection
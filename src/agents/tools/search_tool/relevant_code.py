@@ -0,0 +1,88 @@
+from typing import Optional
+
+from opentelemetry import trace
+from pydantic_ai import ModelRetry, Tool
+
+import config
+from utils import Logger
+
+from ..dir_tool.listing import CHARS_PER_TOKEN
+from ..io_executor import run_in_io_executor
+from .relevance_index import RelevanceIndex
+
+# Lines shown of a single chunk; the rest is left to Read-Symbol or Read-File
+MAX_CHUNK_LINES = 80
+
+
+class RelevantCodeTool:
+    def __init__(self, relevance_index: Optional[RelevanceIndex] = None):
+        self._relevance_index = relevance_index
+
+    def get_tool(self):
+        return Tool(
+            run_in_io_executor(self._run),
+            name="Find-Relevant-Code",
+            takes_ctx=False,
+            max_retries=config.TOOL_SEARCH_CODE_MAX_RETRIES,
+        )
+
+    def _run(self, query: str, top_k: Optional[int] = None, token_budget: Optional[int] = None) -> str:
+        """Find the functions, methods and classes most related to a description, ranked by keyword relevance.
+
+        Use it when you know what the code does but not what it is called, e.g. `http handlers for
+        orders`, `database session setup` or `retry failed payment`. Queries are matched on words,
+        including the parts of identifiers (`order` matches `OrderService` and `create_order`), so
+        use the words the code would use. For an exact name or string use Search-Code or Read-Symbol.
+
+        Args:
+            query (str): Keywords describing the code to find.
+            top_k (int, optional): Maximum number of results. Defaults to the configured number.
+            token_budget (int, optional): Approximate maximum size of the result in tokens.
+                Defaults to the configured budget.
+
+        Returns:
+            str: The best matching definitions, best first, each with its file, line range and source,
+                e.g. `[1] OrderHandler.create (method) in src/orders/api.py, lines 40-58`.
+        """
+        Logger.debug("Tool Call: Find Relevant Code", data={"query": query, "top_k": top_k})
+
+        trace.get_current_span().set_attribute("input", query)
+
+        if self._relevance_index is None:
+            raise ModelRetry(message="Relevance search is not available, use Search-Code instead")
+        if not query.strip():
+            raise ModelRetry(message="The query is empty")
+
+        results = self._relevance_index.search(query, limit=top_k or config.TOOL_FIND_CODE_TOP_K)
+        if not results:
+            raise ModelRetry(message=f"No code matches {query!r}. Try other words, or Search-Code for an exact string")
+
+        budget = (token_budget or config.TOOL_FIND_CODE_TOKEN_BUDGET) * CHARS_PER_TOKEN
+        output = ""
+        skipped = []
+        for rank, (chunk, _) in enumerate(results, start=1):
+            header = f"[{rank}] {chunk.qualname} ({chunk.kind}) in {chunk.path}, lines {chunk.line}-{chunk.end_line}\n"
+            if skipped or output and len(output) + len(header) > budget:
+                skipped.append(f"{chunk.qualname} in {chunk.path}:{chunk.line}")
+                continue
+
+            try:
+                text = self._relevance_index.chunk_text(chunk, MAX_CHUNK_LINES)
+            except (OSError, UnicodeDecodeError) as e:
+                output += f"{header}Error: {e}\n\n"
+                continue
+
+            section = f"{header}--- start---\n{text}\n--- end ---\n"
+            if chunk.end_line - chunk.line + 1 > MAX_CHUNK_LINES:
+                section += f"[Cut after {MAX_CHUNK_LINES} lines. Read the rest with Read-Symbol {chunk.qualname}.]\n"
+            if output and len(output) + len(section) > budget:
+                # Results further down are still named, so they can be read if the top ones do not help
+                skipped.append(f"{chunk.qualname} in {chunk.path}:{chunk.line}")
+                continue
+            output += section + "\n"
+
+        if skipped:
+            output += f"[More results not shown to fit the token budget: {', '.join(skipped)}]\n"
+
+        trace.get_current_span().set_attribute("output", output)
+        return output
@@ -0,0 +1,180 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+from opentelemetry import trace
+from pydantic_ai import ModelRetry, Tool
+
+import config
+from utils import Logger
+
+from ..file_tool import ContentCache, content_cache
+from ..file_tool.line_index import read_lines
+from ..io_executor import run_in_io_executor
+from ..repo_index import KIND_TEXT, RepositoryIndex
+from .trigram_index import MAX_INDEXED_BYTES, TrigramIndex, required_literals
+
+# Characters of a matching line shown; longer lines, usually minified code, are cut
+MAX_LINE_CHARS = 300
+
+
+class SearchCodeTool:
+    def __init__(
+        self,
+        repo_index: Optional[RepositoryIndex] = None,
+        trigram_index: Optional[TrigramIndex] = None,
+        cache: Optional[ContentCache] = content_cache,
+    ):
+        self._repo_index = repo_index
+        self._trigram_index = trigram_index
+        self._cache = cache
+
+    def get_tool(self):
+        return Tool(
+            run_in_io_executor(self._run),
+            name="Search-Code",
+            takes_ctx=False,
+            max_retries=config.TOOL_SEARCH_CODE_MAX_RETRIES,
+        )
+
+    def _run(
+        self,
+        query: str,
+        regex: bool = False,
+        ignore_case: bool = False,
+        path: Optional[str] = None,
+        context_lines: int = 2,
+    ) -> str:
+        """Search the text files of the repository for a string or a regular expression.
+
+        Use it to find where something is defined, used, configured or imported instead of reading
+        files one by one, e.g. `def create_app`, `@app.route`, `DATABASE_URL` or, with `regex`,
+        `class \\w+Repository`. Matches are found line by line and returned with the surrounding
+        lines, numbered from 0 like the `line_number` of Read-File. Generated, vendored, minified and
+        binary files are not searched.
+
+        Args:
+            query (str): The text to search for, or a Python regular expression if `regex` is set.
+            regex (bool, optional): Treat `query` as a regular expression. Defaults to False.
+            ignore_case (bool, optional): Match regardless of case. Defaults to False.
+            path (str, optional): Only search this directory or file. Defaults to the whole repository.
+            context_lines (int, optional): Lines shown before and after every match. Defaults to 2.
+
+        Returns:
+            str: The matches grouped by file, with matching lines marked by `:` and context lines
+                by `-`, e.g. `  42: def create_app():`.
+        """
+        Logger.debug(
+            "Tool Call: Search Code",
+            data={"query": query, "regex": regex, "ignore_case": ignore_case, "path": path},
+        )
+
+        trace.get_current_span().set_attribute("input", query)
+
+        if self._repo_index is None:
+            raise ModelRetry(message="Code search is not available, use Read-File instead")
+        if not query:
+            raise ModelRetry(message="The query is empty")
+
+        try:
+            pattern = re.compile(query if regex else re.escape(query), re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise ModelRetry(message=f"Invalid regular expression: {e}")
+
+        prefix = ""
+        if path:
+            # Relative paths, like the ones in the results, are taken from the repository root
+            prefix = self._repo_index.relative_path(os.path.join(self._repo_index.root, path))
+            if prefix is None:
+                raise ModelRetry(message=f"{path} is outside the repository")
+
+        max_results = config.TOOL_SEARCH_CODE_MAX_RESULTS
+        context_lines = max(context_lines, 0)
+        output = ""
+        results = 0
+        files_with_matches = 0
+        skipped_results = 0
+        literals = required_literals(query) if regex else [query]
+        if ignore_case and not query.isascii():
+            # Trigrams are only case-folded for ASCII
+            literals = []
+        for file_path in self._candidates(literals, prefix):
+            matches = self._search_file(file_path, pattern, whole_text=not regex)
+            if not matches:
+                continue
+
+            files_with_matches += 1
+            if results >= max_results:
+                skipped_results += len(matches[1])
+                continue
+
+            lines, numbers = matches
+            numbers = numbers[: max_results - results]
+            results += len(numbers)
+            output += self._format_matches(file_path, lines, numbers, context_lines)
+
+        if not output:
+            result = f"No matches for {query!r}."
+        else:
+            result = f"{results} match(es) in {files_with_matches} file(s):\n{output}"
+            if skipped_results:
+                result += (
+                    f"\n[{skipped_results} more match(es) not shown. Narrow the query or pass `path` to see them.]\n"
+                )
+
+        trace.get_current_span().set_attribute("output", result)
+        return result
+
+    def _candidates(self, literals: List[str], prefix: str) -> List[str]:
+        # Without a trigram index, or with literals too short to use it, every text file is read
+        candidates = self._trigram_index.candidates(literals) if self._trigram_index is not None else None
+        if candidates is None:
+            grouped = self._repo_index.list_files(self._repo_index.root) or {}
+            paths = (f"{rel_dir}/{name}" if rel_dir else name for rel_dir, names in grouped.items() for name in names)
+            candidates = sorted(path for path in paths if self._searchable(path))
+
+        if prefix:
+            candidates = [
+                candidate for candidate in candidates if candidate == prefix or candidate.startswith(prefix + "/")
+            ]
+        return candidates
+
+    def _searchable(self, path: str) -> bool:
+        abs_path = os.path.join(self._repo_index.root, path)
+        entry = self._repo_index.get(abs_path)
+        return entry is not None and entry.size <= MAX_INDEXED_BYTES and self._repo_index.kind(abs_path) == KIND_TEXT
+
+    def _search_file(self, path: str, pattern: re.Pattern, whole_text: bool) -> Optional[Tuple[List[str], List[int]]]:
+        try:
+            text = read_lines(os.path.join(self._repo_index.root, path), 0, 0, self._cache, self._repo_index).text
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        # A substring that is not in the text is not in any of its lines; anchors make regexes differ per line
+        if whole_text and pattern.search(text) is None:
+            return None
+
+        lines = text.splitlines()
+        numbers = [number for number, line in enumerate(lines) if pattern.search(line)]
+        return (lines, numbers) if numbers else None
+
+    @staticmethod
+    def _format_matches(path: str, lines: List[str], numbers: List[int], context_lines: int) -> str:
+        output = f"\n{path}\n"
+        matched = set(numbers)
+        previous_end = -1
+        for number in numbers:
+            start = max(number - context_lines, previous_end + 1)
+            if previous_end >= 0 and start > previous_end + 1:
+                output += "  --\n"
+            for index in range(start, min(number + context_lines + 1, len(lines))):
+                if index <= previous_end:
+                    continue
+                line = lines[index]
+                if len(line) > MAX_LINE_CHARS:
+                    line = line[:MAX_LINE_CHARS] + " [...]"
+                # Line numbers are 0-based, like the line_number argument of Read-File
+                output += f"  {index}{':' if index in matched else '-'} {line}\n"
+                previous_end = index
+
+        return output
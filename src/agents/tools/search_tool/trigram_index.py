@@ -0,0 +1,256 @@
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from utils import Logger
+
+from ..repo_index import KIND_TEXT, RepositoryIndex
+from ..repo_index.manifest import MANIFEST_DIR, ensure_cache_dir
+
+TRIGRAMS_FILE_NAME = "trigrams.db"
+
+# Bump when the tables or the trigram encoding change; older indexes are discarded and rebuilt.
+SCHEMA_VERSION = 1
+
+# Files larger than this are not indexed; they are almost always data or generated code
+MAX_INDEXED_BYTES = 1024 * 1024
+
+# Characters that give a regex character its special meaning
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+# Escaped characters that stand for themselves; other escapes (\d, \n, \b, ...) match a class or a position
+REGEX_ESCAPED_LITERALS = REGEX_SPECIAL | set("/-\"'#@%&=<>,;:!~` ")
+# An inline flag group turning on verbose mode, e.g. "(?x)" or "(?ix:...)"
+VERBOSE_FLAG = re.compile(r"\(\?[aiLmsu]*x")
+
+
+def trigrams(data: bytes) -> Set[int]:
+    """Return the distinct case-folded byte trigrams of ``data``, each packed into an integer."""
+    data = data.lower()
+    return {(a << 16) | (b << 8) | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+def _skip_group(pattern: str, index: int) -> int:
+    """Return the index after the group opening at ``index``, skipping nested groups and escapes."""
+    depth = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+
+    return index
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Return literal strings that every match of the regex ``pattern`` must contain.
+
+    The extraction is conservative: an alternation or the verbose flag anywhere in the pattern
+    disables it, groups and character classes are skipped, and optional or repeated characters end
+    a literal run. An empty list means the pattern cannot narrow the search.
+    """
+    if "|" in pattern.replace("\\\\", "").replace("\\|", ""):
+        return []
+    # In verbose mode whitespace and comments are not matched, so the characters are not literals
+    if VERBOSE_FLAG.search(pattern):
+        return []
+
+    literals: List[str] = []
+    run = ""
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        literal = None
+        if char == "\\" and index + 1 < len(pattern):
+            if pattern[index + 1] in REGEX_ESCAPED_LITERALS:
+                literal = pattern[index + 1]
+            index += 2
+        elif char == "[":
+            # Skip the whole class, including a leading "]" or "^]"
+            end = index + 1
+            if pattern[end : end + 1] == "^":
+                end += 1
+            if pattern[end : end + 1] == "]":
+                end += 1
+            while end < len(pattern) and pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            index = end + 1
+        elif char == "(":
+            # Groups may be optional, repeated or lookarounds, so nothing inside them is relied on
+            index = _skip_group(pattern, index)
+        elif char == "{":
+            # A counted repetition makes the previous character optional when its minimum is 0
+            end = pattern.find("}", index)
+            end = len(pattern) if end == -1 else end
+            if pattern[index + 1 : end].split(",")[0].strip() in ("", "0") and run:
+                run = run[:-1]
+            index = end + 1
+        elif char in REGEX_SPECIAL:
+            if char in "?*" and run:
+                # The previous character may be absent
+                run = run[:-1]
+            index += 1
+        else:
+            literal = char
+            index += 1
+
+        if literal is not None:
+            run += literal
+        else:
+            if len(run) >= 3:
+                literals.append(run)
+            run = ""
+
+    if len(run) >= 3:
+        literals.append(run)
+    return literals
+
+
+class TrigramIndex:
+    """Trigram index of the text files of a repository, stored next to the repository manifest.
+
+    Every indexed file is recorded with the case-folded byte trigrams it contains. A search for
+    a substring, or a regex with literal parts, only has to read the files containing all of the
+    query's trigrams. The index is refreshed once per run from the repository index: files whose
+    content hash (or size and mtime, without a manifest) did not change keep their trigrams.
+
+    Example:
+        ```python
+        trigram_index = TrigramIndex.for_repository(Path("/path/to/repo"))
+        trigram_index.refresh(repo_index)
+        trigram_index.candidates(["create_app"])  # ["src/app.py", "tests/test_app.py"]
+        ```
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+
+    @classmethod
+    def for_repository(cls, repo_path: Union[str, Path]) -> "TrigramIndex":
+        return cls(Path(repo_path) / MANIFEST_DIR / TRIGRAMS_FILE_NAME)
+
+    def refresh(self, repo_index: RepositoryIndex) -> None:
+        """Bring the index up to date with the text files of ``repo_index``."""
+        start_time = time.time()
+        current = self._indexable_files(repo_index)
+
+        ensure_cache_dir(self.path.parent)
+        connection = self._connect()
+        try:
+            stored: Dict[str, Tuple[int, bytes]] = {
+                path: (file_id, version)
+                for file_id, path, version in connection.execute("SELECT id, path, version FROM files")
+            }
+
+            removed = [file_id for path, (file_id, _) in stored.items() if path not in current]
+            changed = [path for path, version in current.items() if stored.get(path, (None, None))[1] != version]
+
+            with connection:
+                for file_id in removed:
+                    self._remove(connection, file_id)
+                for path in changed:
+                    if path in stored:
+                        self._remove(connection, stored[path][0])
+                    self._add(connection, repo_index, path, current[path])
+        finally:
+            connection.close()
+
+        Logger.debug(
+            "Trigram index refreshed",
+            data={
+                "index": str(self.path),
+                "files": len(current),
+                "indexed_files": len(changed),
+                "removed_files": len(removed),
+                "total_time": f"{time.time() - start_time:.2f}s",
+            },
+        )
+
+    def candidates(self, literals: Iterable[str]) -> Optional[List[str]]:
+        """Return the files that may contain every one of ``literals``, ignoring case.
+
+        Returns:
+            Optional[List[str]]: Sorted file paths relative to the repository root, or None if the
+                literals are too short to narrow the search and every file has to be searched.
+        """
+        required: Set[int] = set()
+        for literal in literals:
+            required |= trigrams(literal.encode("utf-8"))
+        if not required or not self.path.exists():
+            return None
+
+        connection = self._connect()
+        try:
+            placeholders = ", ".join("?" * len(required))
+            rows = connection.execute(
+                f"""
+                SELECT files.path FROM postings JOIN files ON files.id = postings.file_id
+                WHERE postings.trigram IN ({placeholders})
+                GROUP BY postings.file_id HAVING COUNT(*) = ?
+                ORDER BY files.path
+                """,
+                [*required, len(required)],
+            )
+            return [path for (path,) in rows]
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _indexable_files(repo_index: RepositoryIndex) -> Dict[str, bytes]:
+        files: Dict[str, bytes] = {}
+        for rel_dir, names in (repo_index.list_files(repo_index.root) or {}).items():
+            for name in names:
+                path = f"{rel_dir}/{name}" if rel_dir else name
+                entry = repo_index.get(os.path.join(repo_index.root, path))
+                if entry is None or entry.size > MAX_INDEXED_BYTES:
+                    continue
+                if repo_index.kind(os.path.join(repo_index.root, path)) != KIND_TEXT:
+                    continue
+                # The content hash survives touches and checkouts; without a manifest, size and mtime stand in
+                files[path] = entry.content_hash or f"{entry.size}:{entry.mtime_ns}".encode()
+
+        return files
+
+    @staticmethod
+    def _add(connection: sqlite3.Connection, repo_index: RepositoryIndex, path: str, version: bytes) -> None:
+        try:
+            # Files above MAX_INDEXED_BYTES were already left out
+            data = repo_index.read_bytes(os.path.join(repo_index.root, path))
+        except OSError:
+            return
+
+        file_id = connection.execute("INSERT INTO files (path, version) VALUES (?, ?)", (path, version)).lastrowid
+        connection.executemany("INSERT INTO postings VALUES (?, ?)", ((trigram, file_id) for trigram in trigrams(data)))
+
+    @staticmethod
+    def _remove(connection: sqlite3.Connection, file_id: int) -> None:
+        connection.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            connection.executescript(
+                f"""
+                DROP TABLE IF EXISTS postings;
+                DROP TABLE IF EXISTS files;
+                CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, version BLOB NOT NULL);
+                CREATE TABLE postings (
+                    trigram INTEGER NOT NULL,
+                    file_id INTEGER NOT NULL,
+                    PRIMARY KEY (trigram, file_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX postings_file ON postings (file_id);
+                PRAGMA user_version = {SCHEMA_VERSION};
+                """
+            )
+
+        return connection
@@ -0,0 +1,5 @@
+from .definitions import Symbol, extract_symbols
+from .symbol_index import SymbolIndex
+from .symbol_reader import SymbolReadTool
+
+__all__ = ["Symbol", "SymbolIndex", "SymbolReadTool", "extract_symbols"]
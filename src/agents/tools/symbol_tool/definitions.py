@@ -0,0 +1,260 @@
+import ast
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Symbol kinds
+KIND_CLASS = "class"
+KIND_FUNCTION = "function"
+KIND_METHOD = "method"
+KIND_INTERFACE = "interface"
+KIND_TYPE = "type"  # Go structs and named types, TypeScript type aliases, Java enums and records
+
+# Lines searched for the opening brace of a definition whose signature spans several lines
+SIGNATURE_MAX_LINES = 20
+
+
+class Symbol(NamedTuple):
+    name: str  # e.g. "run"
+    qualname: str  # The name with its enclosing classes, e.g. "AnalyzerAgent.run"
+    kind: str
+    path: str  # POSIX path relative to the repository root
+    line: int  # First line, 1-based, including decorators and annotations
+    end_line: int  # Last line, inclusive
+
+
+def extract_python(text: str, path: str) -> List[Symbol]:
+    """Find the classes, functions and methods of a Python module with the ``ast`` module."""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return []
+
+    symbols: List[Symbol] = []
+
+    def visit(node: ast.AST, scope: List[str], in_class: bool) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                is_class = isinstance(child, ast.ClassDef)
+                kind = KIND_CLASS if is_class else KIND_METHOD if in_class else KIND_FUNCTION
+                line = min([child.lineno] + [decorator.lineno for decorator in child.decorator_list])
+                qualname = ".".join(scope + [child.name])
+                symbols.append(Symbol(child.name, qualname, kind, path, line, child.end_lineno or child.lineno))
+                visit(child, scope + [child.name], is_class)
+            elif not isinstance(child, ast.Lambda):
+                # Definitions nested in if/try blocks still belong to the enclosing scope
+                visit(child, scope, in_class)
+
+    visit(tree, [], False)
+    return symbols
+
+
+def _block_end(lines: List[str], line_index: int, column: int) -> Optional[int]:
+    """Return the index of the line closing the first ``{`` block at or after ``line_index``.
+
+    String literals and comments are skipped, so braces inside them are not counted. Returns None
+    for a declaration without a body: when a ``;`` or a new unindented line comes before the
+    block, or no block opens within ``SIGNATURE_MAX_LINES`` lines.
+    """
+    depth = 0
+    opened = False
+    in_block_comment = False
+    for index in range(line_index, len(lines)):
+        line = lines[index]
+        if not opened and index > line_index:
+            if index - line_index >= SIGNATURE_MAX_LINES or line[:1] not in ("", " ", "\t", ")", "{"):
+                return None
+
+        position = column if index == line_index else 0
+        quote = None
+        while position < len(line):
+            char = line[position]
+            if in_block_comment:
+                if line.startswith("*/", position):
+                    in_block_comment = False
+                    position += 1
+            elif quote is not None:
+                if char == "\\":
+                    position += 1
+                elif char == quote:
+                    quote = None
+            elif line.startswith("//", position):
+                break
+            elif line.startswith("/*", position):
+                in_block_comment = True
+                position += 1
+            elif char in "\"'`":
+                quote = char
+            elif char == ";" and not opened:
+                # A declaration without a body, such as an abstract method
+                return None
+            elif char == "{":
+                depth += 1
+                opened = True
+            elif char == "}":
+                depth -= 1
+                if opened and depth == 0:
+                    return index
+            position += 1
+
+    return len(lines) - 1 if opened else None
+
+
+def _scan_blocks(
+    text: str,
+    path: str,
+    patterns: List[Tuple[re.Pattern, str]],
+    member_kinds: Tuple[str, ...],
+    qualify: Optional[Callable[[re.Match, List[str]], List[str]]] = None,
+) -> List[Symbol]:
+    """Find definitions in a brace-delimited language with line-anchored patterns.
+
+    Every pattern captures the definition name in its ``name`` group. The body of a definition
+    runs to the brace closing its first block; definitions without a body span their first line.
+    Names are qualified with the definitions enclosing them. Patterns of kind ``KIND_METHOD``
+    match class members, and only count directly inside a definition of a kind in
+    ``member_kinds``; inside a function body they would match calls.
+    """
+    # Only "\n" ends a line, as for read_lines; splitlines() would also split at form feeds and the like
+    lines = text.split("\n")
+    symbols: List[Symbol] = []
+    scopes: List[Tuple[str, str, int]] = []  # Enclosing definitions: name, kind and last line index
+    annotation_start: Optional[int] = None
+
+    for index, line in enumerate(lines):
+        stripped = line.lstrip()
+        if stripped.startswith("@") and not stripped.startswith("@interface"):
+            # Java annotations and TypeScript decorators belong to the definition below them
+            if annotation_start is None:
+                annotation_start = index
+            continue
+
+        while scopes and scopes[-1][2] < index:
+            scopes.pop()
+        in_member_scope = bool(scopes) and scopes[-1][1] in member_kinds
+
+        for pattern, kind in patterns:
+            if kind == KIND_METHOD and not in_member_scope:
+                continue
+            match = pattern.match(line)
+            if match is None:
+                continue
+
+            end = _block_end(lines, index, match.end("name"))
+            end = index if end is None else end
+
+            name = match.group("name")
+            scope = [scope_name for scope_name, _, _ in scopes]
+            if qualify is not None:
+                scope = qualify(match, scope)
+            if kind == KIND_FUNCTION and in_member_scope:
+                kind = KIND_METHOD
+            start = index if annotation_start is None else annotation_start
+            symbols.append(Symbol(name, ".".join(scope + [name]), kind, path, start + 1, end + 1))
+
+            if end > index:
+                scopes.append((name, kind, end))
+            break
+
+        if stripped and not stripped.startswith(("//", "/*", "*")):
+            annotation_start = None
+
+    return symbols
+
+
+GO_PATTERNS = [
+    (re.compile(r"^func\s+(?:\((?P<receiver>[^)]*)\)\s*)?(?P<name>\w+)\s*[\[(]"), KIND_FUNCTION),
+    (re.compile(r"^type\s+(?P<name>\w+)(?:\[[^\]]*\])?\s+interface\b"), KIND_INTERFACE),
+    (re.compile(r"^type\s+(?P<name>\w+)(?:\[[^\]]*\])?\s+(?!interface\b)\S"), KIND_TYPE),
+]
+
+
+def _go_receiver(match: re.Match, scope: List[str]) -> List[str]:
+    # "func (s *Server) Run()" is qualified as "Server.Run"
+    receiver = match.groupdict().get("receiver")
+    if not receiver:
+        return scope
+    type_name = re.sub(r"\[.*\]", "", receiver.split()[-1]).lstrip("*")
+    return [type_name]
+
+
+def extract_go(text: str, path: str) -> List[Symbol]:
+    symbols = _scan_blocks(text, path, GO_PATTERNS, (), qualify=_go_receiver)
+    return [
+        symbol._replace(kind=KIND_METHOD) if symbol.kind == KIND_FUNCTION and "." in symbol.qualname else symbol
+        for symbol in symbols
+    ]
+
+
+JS_MODIFIERS = r"(?:(?:export|default|declare|abstract|async|static|public|private|protected|readonly|override)\s+)*"
+JS_PATTERNS = [
+    (re.compile(rf"^\s*{JS_MODIFIERS}class\s+(?P<name>[\w$]+)"), KIND_CLASS),
+    (re.compile(rf"^\s*{JS_MODIFIERS}interface\s+(?P<name>[\w$]+)"), KIND_INTERFACE),
+    (re.compile(rf"^\s*{JS_MODIFIERS}(?:type|enum)\s+(?P<name>[\w$]+)\b"), KIND_TYPE),
+    (re.compile(rf"^\s*{JS_MODIFIERS}function\s*\*?\s*(?P<name>[\w$]+)"), KIND_FUNCTION),
+    (
+        re.compile(
+            rf"^\s*{JS_MODIFIERS}(?:const|let|var)\s+(?P<name>[\w$]+)\s*(?::[^=]+)?=\s*(?:async\s+)?"
+            r"(?:function\b|(?:<[^>]*>)?\([^)]*\)?\s*(?::[^=]+)?=>|[\w$]+\s*=>)"
+        ),
+        KIND_FUNCTION,
+    ),
+    # Class members: "async run(a, b) {", "get name(): string {", "private save = async () => {"
+    (
+        re.compile(
+            rf"^\s+{JS_MODIFIERS}(?:get\s+|set\s+|\*\s*)?(?P<name>(?!(?:if|for|while|switch|catch|return|function)\b)"
+            r"[\w$]+)\s*(?:<[^>]*>)?\s*(?:\(|=\s*(?:async\s+)?(?:\([^)]*\)|[\w$]+)\s*=>)"
+        ),
+        KIND_METHOD,
+    ),
+]
+
+
+def extract_javascript(text: str, path: str) -> List[Symbol]:
+    return _scan_blocks(text, path, JS_PATTERNS, (KIND_CLASS, KIND_INTERFACE))
+
+
+JAVA_MODIFIERS = (
+    r"(?:(?:public|protected|private|static|final|abstract|sealed|non-sealed|default|synchronized|native|strictfp)\s+)*"
+)
+JAVA_PATTERNS = [
+    (re.compile(rf"^\s*{JAVA_MODIFIERS}class\s+(?P<name>\w+)"), KIND_CLASS),
+    (re.compile(rf"^\s*{JAVA_MODIFIERS}@?interface\s+(?P<name>\w+)"), KIND_INTERFACE),
+    (re.compile(rf"^\s*{JAVA_MODIFIERS}(?:enum|record)\s+(?P<name>\w+)"), KIND_TYPE),
+    # Methods and constructors: a return type (absent for constructors), a name and an open parameter list
+    (
+        re.compile(
+            rf"^\s+{JAVA_MODIFIERS}(?:<[^>]*>\s+)?(?:[\w.$]+(?:<[^()]*>)?(?:\[\])*\s+)?"
+            r"(?P<name>(?!(?:if|for|while|switch|catch|return|new|throw|else|try|synchronized)\b)\w+)\s*\("
+        ),
+        KIND_METHOD,
+    ),
+]
+
+
+def extract_java(text: str, path: str) -> List[Symbol]:
+    return _scan_blocks(text, path, JAVA_PATTERNS, (KIND_CLASS, KIND_INTERFACE, KIND_TYPE))
+
+
+# Extractors by the language names of repo_index.languages
+EXTRACTORS: Dict[str, Callable[[str, str], List[Symbol]]] = {
+    "Python": extract_python,
+    "Go": extract_go,
+    "JavaScript": extract_javascript,
+    "TypeScript": extract_javascript,
+    "Java": extract_java,
+}
+
+
+def extract_symbols(text: str, path: str, language: Optional[str]) -> List[Symbol]:
+    """Find the definitions of a source file.
+
+    Args:
+        text (str): The source code.
+        path (str): The file path relative to the repository root, in POSIX form.
+        language (str, optional): The language of the file, as detected by ``detect_language``.
+
+    Returns:
+        List[Symbol]: The definitions in source order; empty for unsupported languages.
+    """
+    extractor = EXTRACTORS.get(language or "")
+    return extractor(text, path) if extractor is not None else []
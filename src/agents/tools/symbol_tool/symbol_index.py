@@ -0,0 +1,151 @@
+import difflib
+import os
+import threading
+from typing import Dict, List, Optional
+
+from utils import Logger
+
+from ..repo_index import KIND_TEXT, RepositoryIndex, detect_language
+from .definitions import EXTRACTORS, Symbol, extract_symbols
+
+# Source files larger than this are not parsed; they are almost always generated
+MAX_SOURCE_BYTES = 1024 * 1024
+
+
+class SymbolIndex:
+    """Definitions of the classes, functions and methods of a repository, built once per run.
+
+    The index is built on the first lookup from the files of the repository index, and shared by
+    every agent of the run. Files outside the repository index are parsed on demand when a lookup
+    names them.
+
+    Example:
+        ```python
+        symbols = SymbolIndex(repo_index)
+        symbols.find("AnalyzerAgent.run")  # [Symbol(name="run", qualname="AnalyzerAgent.run", ...)]
+        symbols.find("run", "src/agents/analyzer.py")
+        ```
+    """
+
+    def __init__(self, repo_index: Optional[RepositoryIndex] = None) -> None:
+        self._repo_index = repo_index
+        self._lock = threading.Lock()
+        self._built = False
+        self._files: Dict[str, List[Symbol]] = {}  # Symbols by absolute file path
+        self._by_name: Dict[str, List[Symbol]] = {}
+
+    @property
+    def repo_index(self) -> Optional[RepositoryIndex]:
+        return self._repo_index
+
+    @property
+    def root(self) -> Optional[str]:
+        return self._repo_index.root if self._repo_index is not None else None
+
+    def abs_path(self, symbol: Symbol) -> str:
+        """The absolute path of the file defining ``symbol``."""
+        return os.path.join(self.root, symbol.path) if self.root is not None else symbol.path
+
+    def symbols(self) -> List[Symbol]:
+        """Every definition of the repository, grouped by file."""
+        self._build()
+        return [symbol for symbols in self._files.values() for symbol in symbols]
+
+    def file_symbols(self, file_path: str) -> List[Symbol]:
+        """The definitions of one file, parsing it if it has not been parsed yet."""
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            if abs_path not in self._files:
+                self._files[abs_path] = self._parse(abs_path)
+            return self._files[abs_path]
+
+    def find(self, name: str, file_path: Optional[str] = None) -> List[Symbol]:
+        """Find the definitions matching a name.
+
+        Args:
+            name (str): A bare name (``run``) or a name qualified with its enclosing classes
+                (``AnalyzerAgent.run``); the last parts of a qualified name are enough.
+            file_path (str, optional): Only look in this file.
+
+        Returns:
+            List[Symbol]: The matching definitions, exact qualified names first.
+        """
+        if file_path is not None:
+            candidates = [symbol for symbol in self.file_symbols(file_path) if symbol.name == name.rpartition(".")[2]]
+        else:
+            self._build()
+            candidates = self._by_name.get(name.rpartition(".")[2], [])
+
+        if "." not in name:
+            return list(candidates)
+
+        exact = [symbol for symbol in candidates if symbol.qualname == name]
+        suffix = [symbol for symbol in candidates if symbol.qualname.endswith("." + name)]
+        return exact + suffix
+
+    def suggest(self, name: str, file_path: Optional[str] = None, limit: int = 5) -> List[str]:
+        """Return defined names close to ``name``, for an error message when nothing matches."""
+        if file_path is not None:
+            names = {symbol.qualname for symbol in self.file_symbols(file_path)}
+        else:
+            self._build()
+            names = {symbol.qualname for symbols in self._by_name.values() for symbol in symbols}
+
+        matches = difflib.get_close_matches(name, names, n=limit, cutoff=0.6)
+        # Qualified names are also matched on their last part, e.g. "run" for "Agent.run_all"
+        short = name.rpartition(".")[2].lower()
+        matches += sorted(qualname for qualname in names if short in qualname.lower() and qualname not in matches)
+        return matches[:limit]
+
+    def _build(self) -> None:
+        with self._lock:
+            if self._built:
+                return
+            self._built = True
+
+            if self._repo_index is None:
+                return
+
+            grouped = self._repo_index.list_files(self._repo_index.root) or {}
+            for rel_dir, names in grouped.items():
+                for name in names:
+                    if detect_language(name) not in EXTRACTORS:
+                        continue
+                    abs_path = os.path.join(self._repo_index.root, rel_dir, name)
+                    if abs_path not in self._files:
+                        self._files[abs_path] = self._parse(abs_path)
+
+            for symbols in self._files.values():
+                for symbol in symbols:
+                    self._by_name.setdefault(symbol.name, []).append(symbol)
+
+            Logger.debug(
+                "Symbol index built",
+                data={"files": len(self._files), "symbols": sum(len(names) for names in self._by_name.values())},
+            )
+
+    def _parse(self, abs_path: str) -> List[Symbol]:
+        language = detect_language(abs_path)
+        if language not in EXTRACTORS:
+            return []
+
+        path = abs_path
+        entry = self._repo_index.get(abs_path) if self._repo_index is not None else None
+        if entry is not None:
+            if entry.size > MAX_SOURCE_BYTES or self._repo_index.kind(abs_path) not in (KIND_TEXT, None):
+                return []
+            path = entry.path
+
+        try:
+            if self._repo_index is not None and self._repo_index.objects is not None:
+                data = self._repo_index.read_bytes(abs_path)
+            else:
+                with open(abs_path, "rb") as file:
+                    data = file.read(MAX_SOURCE_BYTES + 1)
+        except OSError:
+            return []
+        text = data.decode("utf-8", errors="replace")
+        if len(text) > MAX_SOURCE_BYTES:
+            return []
+
+        return extract_symbols(text, path, language)
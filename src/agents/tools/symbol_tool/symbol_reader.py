@@ -0,0 +1,93 @@
+from typing import Optional
+
+from opentelemetry import trace
+from pydantic_ai import ModelRetry, Tool
+
+import config
+from utils import Logger
+
+from ..file_tool import ContentCache, content_cache
+from ..file_tool.line_index import read_lines
+from ..io_executor import run_in_io_executor
+from ..repo_index import RepositoryIndex
+from .symbol_index import SymbolIndex
+
+# Definitions returned by a single call; further matches are only listed
+MAX_MATCHES = 5
+# Lines returned for a single definition; longer ones are cut
+MAX_SYMBOL_LINES = 400
+
+
+class SymbolReadTool:
+    def __init__(
+        self,
+        symbol_index: Optional[SymbolIndex] = None,
+        repo_index: Optional[RepositoryIndex] = None,
+        cache: Optional[ContentCache] = content_cache,
+    ):
+        self._symbol_index = symbol_index or SymbolIndex(repo_index)
+        self._cache = cache
+
+    def get_tool(self):
+        return Tool(
+            run_in_io_executor(self._run),
+            name="Read-Symbol",
+            takes_ctx=False,
+            max_retries=config.TOOL_FILE_READER_MAX_RETRIES,
+        )
+
+    def _run(self, symbol: str, file_path: Optional[str] = None) -> str:
+        """Read the source of a class, function or method by name, instead of paging through its file.
+
+        Supports Python, Go, JavaScript, TypeScript and Java. Methods can be qualified with their
+        class (`UserService.create`, Go receivers as `Server.Run`), and the last parts of a qualified
+        name are enough. Decorators and annotations are included.
+
+        Args:
+            symbol (str): The name of the definition, e.g. `create_app` or `UserService.create`.
+            file_path (str, optional): Only look in this file. Defaults to the whole repository.
+
+        Returns:
+            str: The source of every matching definition, with its file and line range, e.g.
+                `Symbol: UserService.create (method) in src/users.py, lines 40-58`.
+        """
+        Logger.debug("Tool Call: Read Symbol", data={"symbol": symbol, "file_path": file_path})
+
+        trace.get_current_span().set_attribute("input", symbol)
+
+        matches = self._symbol_index.find(symbol, file_path)
+        if not matches:
+            suggestions = self._symbol_index.suggest(symbol, file_path)
+            hint = f" Similar names: {', '.join(suggestions)}." if suggestions else ""
+            raise ModelRetry(message=f"No definition of {symbol} found.{hint}")
+
+        output = ""
+        for match in matches[:MAX_MATCHES]:
+            line_count = min(match.end_line - match.line + 1, MAX_SYMBOL_LINES)
+            try:
+                window = read_lines(
+                    self._symbol_index.abs_path(match),
+                    match.line - 1,
+                    line_count,
+                    self._cache,
+                    self._symbol_index.repo_index,
+                )
+            except Exception as e:
+                raise ModelRetry(message=f"Failed to read {match.path}. {str(e)}")
+
+            output += (
+                f"Symbol: {match.qualname} ({match.kind}) in {match.path}, lines {match.line}-{match.end_line}\n"
+                f"--- start---\n{window.text}\n--- end ---\n"
+            )
+            if line_count < match.end_line - match.line + 1:
+                output += (
+                    f"[Cut after {MAX_SYMBOL_LINES} lines. Read the rest with Read-File from line "
+                    f"{match.line - 1 + MAX_SYMBOL_LINES}.]\n"
+                )
+
+        if len(matches) > MAX_MATCHES:
+            others = ", ".join(f"{match.qualname} in {match.path}:{match.line}" for match in matches[MAX_MATCHES:])
+            output += f"\n[{len(matches) - MAX_MATCHES} more definitions, pass file_path to pick one: {others}]\n"
+
+        trace.get_current_span().set_attribute("output", output)
+        return output
@@ -33,6 +33,8 @@ ANALYZER_AGENT_RETRIES = int(os.getenv("ANALYZER_AGENT_RETRIES", "2"))
 ANALYZER_LLM_TIMEOUT = int(os.getenv("ANALYZER_LLM_TIMEOUT", "180"))
 ANALYZER_LLM_MAX_TOKENS = int(os.getenv("ANALYZER_LLM_MAX_TOKENS", "8192"))
 ANALYZER_LLM_TEMPERATURE = float(os.getenv("ANALYZER_LLM_TEMPERATURE", "0.0"))
+# Skip an analysis when the repository (.ai/ excluded), its prompts and the model are unchanged since its last run
+ANALYZER_SKIP_UNCHANGED = str_to_bool(os.getenv("ANALYZER_SKIP_UNCHANGED", "true"))
 
 # Documenter
 DOCUMENTER_LLM_MODEL = os.environ["DOCUMENTER_LLM_MODEL"]
@@ -57,6 +59,8 @@ GITLAB_USER_NAME = os.getenv("GITLAB_USER_NAME", "AI Analyzer")
 GITLAB_USER_USERNAME = os.getenv("GITLAB_USER_USERNAME", "agent_doc")
 GITLAB_USER_EMAIL = os.getenv("GITLAB_USER_EMAIL")
 GITLAB_OAUTH_TOKEN = os.getenv("GITLAB_OAUTH_TOKEN")
+# Clone projects without checking out their files, and analyze them from git objects at the cloned commit
+CRONJOB_READ_GIT_OBJECTS = str_to_bool(os.getenv("CRONJOB_READ_GIT_OBJECTS", "true"))
 
 # General
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -68,6 +72,45 @@ FILE_LOG_LEVEL = getattr(logging, os.getenv("FILE_LOG_LEVEL", "INFO").upper())
 # Agent Tools Settings
 TOOL_FILE_READER_MAX_RETRIES = int(os.getenv("TOOL_FILE_READER_MAX_RETRIES", "2"))
 TOOL_LIST_FILES_MAX_RETRIES = int(os.getenv("TOOL_LIST_FILES_MAX_RETRIES", "2"))
+# Total size of the file contents shared between agents of a run; larger files are read from disk each time
+TOOL_FILE_READER_CACHE_BYTES = int(os.getenv("TOOL_FILE_READER_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Threads running the blocking file I/O of agent tools, shared by every agent of the process
+TOOL_IO_WORKERS = max(1, int(os.getenv("TOOL_IO_WORKERS", "16")))
+TOOL_SEARCH_CODE_MAX_RETRIES = int(os.getenv("TOOL_SEARCH_CODE_MAX_RETRIES", "2"))
+# Matching lines returned by one Search-Code call
+TOOL_SEARCH_CODE_MAX_RESULTS = int(os.getenv("TOOL_SEARCH_CODE_MAX_RESULTS", "50"))
+# Find-Relevant-Code: results per call and approximate size limit of the result
+TOOL_FIND_CODE_TOP_K = int(os.getenv("TOOL_FIND_CODE_TOP_K", "8"))
+TOOL_FIND_CODE_TOKEN_BUDGET = int(os.getenv("TOOL_FIND_CODE_TOKEN_BUDGET", "8000"))
+# Read-Files: files per call, files read concurrently, and approximate size limit of the combined result
+TOOL_READ_FILES_MAX_FILES = int(os.getenv("TOOL_READ_FILES_MAX_FILES", "30"))
+TOOL_READ_FILES_WORKERS = max(1, int(os.getenv("TOOL_READ_FILES_WORKERS", "8")))
+TOOL_READ_FILES_TOKEN_BUDGET = int(os.getenv("TOOL_READ_FILES_TOKEN_BUDGET", "20000"))
+# "walk" walks the filesystem with the built-in ignore lists, "git" lists files with `git ls-files`
+TOOL_LIST_FILES_SOURCE = os.getenv("TOOL_LIST_FILES_SOURCE", "walk").lower()
+# "grouped" prints one Python list per directory, "tree" an indented tree with brace-compressed file names
+TOOL_LIST_FILES_FORMAT = os.getenv("TOOL_LIST_FILES_FORMAT", "grouped").lower()
+# File kinds left out of listings of indexed directories: binary, minified, generated, vendored
+TOOL_LIST_FILES_HIDDEN_KINDS = frozenset(
+    kind.strip() for kind in os.getenv("TOOL_LIST_FILES_HIDDEN_KINDS", "binary").lower().split(",") if kind.strip()
+)
+# Approximate size limit of one listing page; the rest is returned on the following pages
+TOOL_LIST_FILES_TOKEN_BUDGET = int(os.getenv("TOOL_LIST_FILES_TOKEN_BUDGET", "8000"))
+# Depth below which directories are collapsed; 0 picks the deepest depth that fits the budget, -1 lists all
+TOOL_LIST_FILES_MAX_DEPTH = int(os.getenv("TOOL_LIST_FILES_MAX_DEPTH", "0"))
+# Directories with more files than this are summarized instead of listed; 0 disables
+TOOL_LIST_FILES_COLLAPSE_THRESHOLD = int(os.getenv("TOOL_LIST_FILES_COLLAPSE_THRESHOLD", "200"))
+
+# Repository Index Settings
+REPO_INDEX_MANIFEST_ENABLED = str_to_bool(os.getenv("REPO_INDEX_MANIFEST_ENABLED", "true"))
+# Apply the repository's .gitignore files and .ai/ignore on top of the built-in ignore lists
+REPO_INDEX_IGNORE_FILES = str_to_bool(os.getenv("REPO_INDEX_IGNORE_FILES", "true"))
+# Directories listed concurrently while walking; raise it for clones on network-backed volumes
+REPO_INDEX_WALK_WORKERS = max(1, int(os.getenv("REPO_INDEX_WALK_WORKERS", "1")))
+# Keep a trigram index of the repository next to the manifest, so Search-Code only reads files that can match
+REPO_INDEX_SEARCH_INDEX_ENABLED = str_to_bool(os.getenv("REPO_INDEX_SEARCH_INDEX_ENABLED", "true"))
+# Keep the Find-Relevant-Code index of every analyzed commit, so a clean re-run on the same commit reuses it
+REPO_INDEX_RELEVANCE_CACHE_ENABLED = str_to_bool(os.getenv("REPO_INDEX_RELEVANCE_CACHE_ENABLED", "true"))
 
 # HTTP Retry Client Settings
 HTTP_RETRY_MAX_ATTEMPTS = int(os.getenv("HTTP_RETRY_MAX_ATTEMPTS", "5"))
@@ -75,6 +118,29 @@ HTTP_RETRY_MULTIPLIER = int(os.getenv("HTTP_RETRY_MULTIPLIER", "1"))
 HTTP_RETRY_MAX_WAIT_PER_ATTEMPT = int(os.getenv("HTTP_RETRY_MAX_WAIT_PER_ATTEMPT", "60"))
 HTTP_RETRY_MAX_TOTAL_WAIT = int(os.getenv("HTTP_RETRY_MAX_TOTAL_WAIT", "300"))
 
+# HTTP Client Pool Settings, shared by every agent of the process
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "20"))
+HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "10"))
+# Seconds an idle connection is kept open for the next request
+HTTP_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "30"))
+# Needs the h2 package; falls back to HTTP/1.1 without it
+HTTP_CLIENT_HTTP2 = str_to_bool(os.getenv("HTTP_CLIENT_HTTP2", "false"))
+
+# LLM Rate Limits, applied to every request of the process before it is sent; 0 disables a limit.
+# Set the per-minute limits to the provider's quota for the configured models, e.g. Gemini's RPM and TPM.
+LLM_MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+# Grow the concurrency up to LLM_MAX_CONCURRENT_REQUESTS while calls succeed, halve it on 429/503 or slow responses
+LLM_ADAPTIVE_CONCURRENCY = str_to_bool(os.getenv("LLM_ADAPTIVE_CONCURRENCY", "true"))
+LLM_MIN_CONCURRENT_REQUESTS = int(os.getenv("LLM_MIN_CONCURRENT_REQUESTS", "1"))
+
+# LLM Response Cache: responses of requests sent with temperature 0 are replayed by later runs
+LLM_RESPONSE_CACHE_ENABLED = str_to_bool(os.getenv("LLM_RESPONSE_CACHE_ENABLED", "true"))
+LLM_RESPONSE_CACHE_PATH = os.getenv("LLM_RESPONSE_CACHE_PATH", "~/.cache/ai-doc-gen/llm-responses.db")
+# Least recently used responses are evicted beyond this size
+LLM_RESPONSE_CACHE_MAX_BYTES = int(os.getenv("LLM_RESPONSE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
 # --------------------------
 # Helper Function
 
@@ -1,14 +1,33 @@
+import sqlite3
+import time
+from typing import Optional
+
 from opentelemetry import trace
+from pydantic import Field
 
+import config
 from agents.analyzer import AnalyzerAgent, AnalyzerAgentConfig
+from agents.tools import (
+    GitObjectStore,
+    IgnoreMatcher,
+    IgnoreRules,
+    Manifest,
+    RepositoryIndex,
+    TrigramIndex,
+    content_cache,
+    run_io,
+)
 from utils.repo import get_repo_version
 
 from .base_handler import BaseHandler, BaseHandlerConfig
-from utils import Logger
+from utils import Logger, get_http_client_manager
 
 
 class AnalyzeHandlerConfig(BaseHandlerConfig, AnalyzerAgentConfig):
-    pass
+    git_revision: Optional[str] = Field(
+        default=None,
+        description="Analyze this commit, branch or tag from the git objects instead of the working tree",
+    )
 
 
 class AnalyzeHandler(BaseHandler):
@@ -32,6 +51,102 @@ class AnalyzeHandler(BaseHandler):
                     "input": str(self.config.repo_path),
                 }
             )
-            result = await self.agent.run()
+            objects = None
+            if self.config.git_revision:
+                objects = await run_io(GitObjectStore, self.config.repo_path, self.config.git_revision)
+                span.set_attribute("git_commit", objects.commit)
+
+            try:
+                repo_index = await self._build_repo_index(objects)
+                span.set_attribute("indexed_files", repo_index.file_count)
+                trigram_index = await self._build_trigram_index(repo_index)
+
+                result = await self.agent.run(repo_index=repo_index, trigram_index=trigram_index)
+            finally:
+                if objects is not None:
+                    objects.close()
+
+            cache_stats = content_cache.stats()
+            span.set_attributes({"file_cache_hits": cache_stats.hits, "file_cache_misses": cache_stats.misses})
+            Logger.info("File content cache", data=cache_stats._asdict())
+
+            http_client_manager = get_http_client_manager()
+            pool_stats = http_client_manager.stats()
+            span.set_attributes({"http_requests": pool_stats.requests, "http_connections": pool_stats.connections})
+            Logger.info("HTTP client pool", data=pool_stats._asdict())
+            if http_client_manager.limiter is not None:
+                limiter_stats = http_client_manager.limiter.stats()
+                span.set_attributes(
+                    {
+                        "llm_concurrency_window": limiter_stats.window,
+                        "llm_concurrency_decreases": limiter_stats.decreases,
+                        "llm_throttled_requests": limiter_stats.throttled,
+                        "llm_wait_seconds": limiter_stats.wait_seconds,
+                    }
+                )
+                Logger.info("LLM rate limiter", data=limiter_stats._asdict())
+            if http_client_manager.cache is not None:
+                response_cache_stats = http_client_manager.cache.stats()
+                span.set_attributes(
+                    {"llm_cache_hits": response_cache_stats.hits, "llm_cache_misses": response_cache_stats.misses}
+                )
+                Logger.info("LLM response cache", data=response_cache_stats._asdict())
 
             return result
+
+    async def _build_repo_index(self, objects: Optional[GitObjectStore] = None) -> RepositoryIndex:
+        start_time = time.time()
+        if objects is not None:
+            # Blob ids already identify the content, so there is nothing for a manifest to cache
+            repo_index = await run_io(RepositoryIndex.from_git_objects, self.config.repo_path, objects)
+            Logger.info(
+                "Repository index built from git objects",
+                data={
+                    "commit": objects.commit,
+                    "files": repo_index.file_count,
+                    "total_time": f"{time.time() - start_time:.2f}s",
+                },
+            )
+            return repo_index
+
+        manifest = Manifest.for_repository(self.config.repo_path) if config.REPO_INDEX_MANIFEST_ENABLED else None
+        if config.REPO_INDEX_IGNORE_FILES:
+            rules = IgnoreMatcher.for_repository(self.config.repo_path)
+        else:
+            rules = IgnoreRules()
+
+        build_options = {
+            "rules": rules,
+            "source": config.TOOL_LIST_FILES_SOURCE,
+            "workers": config.REPO_INDEX_WALK_WORKERS,
+        }
+        try:
+            repo_index = await run_io(RepositoryIndex.build, self.config.repo_path, manifest=manifest, **build_options)
+        except sqlite3.Error as e:
+            # The manifest only saves work, so a locked or corrupt one falls back to a plain walk
+            Logger.warning(f"Failed to use the repository manifest {manifest.path}: {e}")
+            repo_index = await run_io(RepositoryIndex.build, self.config.repo_path, manifest=None, **build_options)
+        Logger.info(
+            "Repository index built",
+            data={
+                "entries": len(repo_index),
+                "files": repo_index.file_count,
+                "total_time": f"{time.time() - start_time:.2f}s",
+            },
+        )
+
+        return repo_index
+
+    async def _build_trigram_index(self, repo_index: RepositoryIndex) -> Optional[TrigramIndex]:
+        if not config.REPO_INDEX_SEARCH_INDEX_ENABLED:
+            return None
+
+        trigram_index = TrigramIndex.for_repository(self.config.repo_path)
+        try:
+            await run_io(trigram_index.refresh, repo_index)
+        except sqlite3.Error as e:
+            # Search-Code still works without the index, only slower
+            Logger.warning(f"Failed to refresh the trigram index {trigram_index.path}: {e}")
+            return None
+
+        return trigram_index
@@ -13,12 +13,14 @@ from pydantic import BaseModel, Field
 import config
 from config import load_config_from_file
 from handlers.analyze import AnalyzeHandler, AnalyzeHandlerConfig
-from utils import Logger
+from utils import Logger, has_uncommitted_changes
 from utils.dict import merge_dicts
 
 from .base_handler import AbstractHandler
 
 COMMIT_MESSAGE_TITLE = "[AI] Analyzer-Agent: Create/Update AI Analysis"
+# Where the analyzer writes its results; changes anywhere else (e.g. caches) do not warrant a merge request
+ANALYSIS_OUTPUT_DIR = ".ai/docs"
 IGNORED_PROJECTS: List[int] = [  # List of project IDs to ignore
 ]
 
@@ -129,6 +131,10 @@ class JobAnalyzeHandler(AbstractHandler):
             repo = self._clone_project(project)
             # # Analyze project
             await self._analyze_project(project=project, repo=repo)
+            if not has_uncommitted_changes(Path(repo.working_dir), ANALYSIS_OUTPUT_DIR):
+                # Every analysis was skipped because the project is unchanged since the last one
+                Logger.info(f"Project {project.name} (ID: {project.id}) has no new analysis results")
+                return
             # Create MR
             await self._create_merge_request(project=project, repo=repo)
             # Cleanup
@@ -150,7 +156,11 @@ class JobAnalyzeHandler(AbstractHandler):
             url=git_url,
             to_path=self._config.working_path / f"{project.name}-{project.id}",
             branch=project.default_branch,
+            no_checkout=config.CRONJOB_READ_GIT_OBJECTS,
         )
+        if config.CRONJOB_READ_GIT_OBJECTS:
+            # The code is analyzed from git objects; only .ai/ (configuration and previous results) is checked out
+            repo.git.sparse_checkout("set", "--no-cone", "/.ai/")
 
         repo.git.config("user.name", config.GITLAB_USER_NAME)
         repo.git.config("user.email", config.GITLAB_USER_EMAIL)
@@ -173,6 +183,8 @@ class JobAnalyzeHandler(AbstractHandler):
         base_config = {
             "repo_path": Path(repo.working_dir),
         }
+        if config.CRONJOB_READ_GIT_OBJECTS:
+            base_config["git_revision"] = repo.head.commit.hexsha
 
         # Merge project config with base config (project config takes precedence)
         final_config = merge_dicts(base_config, project_config)
@@ -20,7 +20,7 @@ from config import load_config
 from handlers.analyze import AnalyzeHandler, AnalyzeHandlerConfig
 from handlers.cronjob import JobAnalyzeHandler, JobAnalyzeHandlerConfig
 from handlers.readme import ReadmeHandler, ReadmeHandlerConfig
-from utils import Logger
+from utils import Logger, get_http_client_manager
 
 nest_asyncio.apply()
 
@@ -195,20 +195,24 @@ async def main() -> Optional[int]:
         print("Error: Please specify a command (analyze, document, cronjob)")
         return 1
 
-    match args.command:
-        case "analyze":
-            await analyze(args)
-        case "document":
-            await document(args)
-        case "cronjob":
-            if args.sub_command == "analyze":
-                await cronjob_analyze(args)
-            else:
-                print(f"Error: Unknown cronjob sub-command '{args.sub_command}'")
+    try:
+        match args.command:
+            case "analyze":
+                await analyze(args)
+            case "document":
+                await document(args)
+            case "cronjob":
+                if args.sub_command == "analyze":
+                    await cronjob_analyze(args)
+                else:
+                    print(f"Error: Unknown cronjob sub-command '{args.sub_command}'")
+                    return 1
+            case _:
+                print(f"Error: Unknown command '{args.command}'")
                 return 1
-        case _:
-            print(f"Error: Unknown command '{args.command}'")
-            return 1
+    finally:
+        # The pool is shared by every handler and project of the run, so it is only closed on the way out
+        await get_http_client_manager().aclose()
 
 
 def cli_main():
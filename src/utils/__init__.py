@@ -1,7 +1,24 @@
 from .dict import merge_dicts
 from .logger import Logger
 from .prompt_manager import PromptManager
-from .repo import get_repo_version
-from .retry_client import create_retrying_client
+from .rate_limiter import LimiterStats, RateLimiter
+from .repo import get_clean_commit, get_repo_version, has_uncommitted_changes
+from .response_cache import CacheStats, ResponseCache
+from .retry_client import HttpClientManager, PoolStats, create_retrying_client, get_http_client_manager
 
-__all__ = ["Logger", "PromptManager", "merge_dicts", "get_repo_version", "create_retrying_client"]
+__all__ = [
+    "CacheStats",
+    "HttpClientManager",
+    "LimiterStats",
+    "Logger",
+    "PoolStats",
+    "PromptManager",
+    "RateLimiter",
+    "ResponseCache",
+    "merge_dicts",
+    "get_repo_version",
+    "get_clean_commit",
+    "has_uncommitted_changes",
+    "create_retrying_client",
+    "get_http_client_manager",
+]
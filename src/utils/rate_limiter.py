@@ -0,0 +1,343 @@
+"""
+Client-side Rate Limiting for LLM Requests
+
+This module keeps the requests of all agents within the provider's quota, so they queue in the
+process instead of being rejected with 429 and retried after a back-off.
+
+What it does:
+- Caps the number of requests in flight at the same time, adapting the cap to the provider:
+  it grows by one request per window of successful calls and halves on 429/503 or when
+  the time per generated token climbs well above what the provider answered with before
+  (AIMD, as in TCP)
+- Spreads requests over the minute with a requests-per-minute token bucket
+- Spreads prompt tokens with a tokens-per-minute bucket, estimated from the request size and
+  corrected with the token count the provider reports
+- Serves waiting requests in arrival order
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, NamedTuple, Optional, Tuple
+
+import ujson as json
+from httpx import AsyncBaseTransport, Request, Response
+
+from .logger import Logger
+
+# Rough size of a token in bytes of request body, used until the provider reports the real count
+BYTES_PER_TOKEN = 4
+
+# Status codes telling that the provider is overloaded or out of quota
+OVERLOAD_STATUS_CODES = (429, 503)
+# Factor applied to the concurrency window on overload
+DECREASE_FACTOR = 0.5
+# Smoothed time per token above this multiple of the baseline counts as overload
+LATENCY_TOLERANCE = 2.0
+# Weight of the last response in the smoothed latency and time per token
+LATENCY_SMOOTHING = 0.2
+# How fast the baseline follows a smoothed time per token above it, e.g. after a model change
+BASELINE_DRIFT = 0.01
+# Fixed cost of a response, in generated tokens, added before dividing the latency by the output size;
+# without it a short tool call would look slower per token than a long answer
+LATENCY_TOKEN_OFFSET = 100
+
+
+class LimiterStats(NamedTuple):
+    window: int  # Requests currently allowed in flight
+    in_flight: int
+    waiting: int  # Requests queued for a concurrency slot or for the rate limits
+    throttled: int  # Requests that had to wait for the rate limits
+    wait_seconds: float  # Total time requests spent waiting for the rate limits
+    decreases: int  # Times the window was cut after an overload signal
+
+
+class TokenBucket:
+    """A budget of ``per_minute`` units, refilled continuously, which can go negative when a
+    request turns out to have cost more than was reserved for it."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self._level = float(per_minute)
+        self._updated = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available; 0 if they are available now."""
+        self._refill()
+        # A request larger than the whole budget still goes through once the bucket is full
+        amount = min(amount, self.capacity)
+        return max(amount - self._level, 0) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._level -= amount
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class ConcurrencyWindow:
+    """The number of requests allowed in flight, adjusted by additive increase, multiplicative decrease.
+
+    Every successful response grows the window by ``1 / size``, so a full window of successes adds
+    one request. A 429/503 halves it, at most once per smoothed latency so that the responses of
+    one overloaded window only count once. A non-streamed response only arrives once the whole
+    output is generated, so latency alone would read long answers as overload; the latency is
+    divided by the output size, and a smoothed time per token beyond ``LATENCY_TOLERANCE`` times
+    the baseline halves the window too. With ``adaptive`` off the window stays at ``maximum``.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, adaptive: bool = True) -> None:
+        self.maximum = maximum
+        self.minimum = max(min(minimum, maximum), 1)
+        self.adaptive = adaptive
+        # Half the ceiling is a safe start; a free quota is reached after a few windows of successes
+        self._size = float(max(maximum // 2, self.minimum) if adaptive else maximum)
+        self._latency: Optional[float] = None
+        self._pace: Optional[float] = None  # Smoothed seconds per generated token
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self.decreases = 0
+
+    @property
+    def size(self) -> int:
+        return int(self._size)
+
+    def on_success(self, latency: Optional[float] = None, output_tokens: Optional[int] = None) -> None:
+        """Grow the window, or shrink it if the time per token shows the provider slowing down.
+
+        Args:
+            latency (float, optional): Seconds until the response headers arrived.
+            output_tokens (int, optional): The generated tokens the provider reported; without them
+                the latency cannot be compared across responses and only grows the window.
+        """
+        if not self.adaptive:
+            return
+
+        if latency is not None:
+            self._latency = _smooth(self._latency, latency)
+        if latency is not None and output_tokens is not None:
+            self._pace = _smooth(self._pace, latency / (output_tokens + LATENCY_TOKEN_OFFSET))
+            if self._baseline is None or self._pace < self._baseline:
+                self._baseline = self._pace
+            else:
+                self._baseline += (self._pace - self._baseline) * BASELINE_DRIFT
+
+            if self._pace > self._baseline * LATENCY_TOLERANCE:
+                self.on_overload()
+                return
+
+        self._size = min(self._size + 1 / self._size, self.maximum)
+
+    def on_overload(self) -> None:
+        if not self.adaptive:
+            return
+
+        now = time.monotonic()
+        if now - self._last_decrease < (self._latency or 1.0):
+            return
+        self._last_decrease = now
+        self._size = max(self._size * DECREASE_FACTOR, self.minimum)
+        self.decreases += 1
+        Logger.debug("LLM concurrency window decreased", data={"window": self.size, "latency": self._latency})
+
+
+def _smooth(average: Optional[float], value: float) -> float:
+    return value if average is None else average + (value - average) * LATENCY_SMOOTHING
+
+
+class RateLimiter:
+    """Concurrency, requests-per-minute and tokens-per-minute limits shared by every request.
+
+    Example:
+        ```python
+        limiter = RateLimiter(max_concurrency=8, requests_per_minute=1000, tokens_per_minute=1_000_000)
+        await limiter.acquire(estimated_tokens=1200)
+        try:
+            response = await send()
+        finally:
+            limiter.release(estimated_tokens=1200, actual_tokens=1350, status_code=200, latency=4.2, output_tokens=800)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        min_concurrency: int = 1,
+        adaptive: bool = False,
+    ) -> None:
+        self.window = ConcurrencyWindow(max_concurrency, min_concurrency, adaptive) if max_concurrency > 0 else None
+        self._slot_waiters: Deque[asyncio.Future] = deque()
+        self._slots_held = 0
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        # Held while a request waits for the buckets, so requests are admitted in arrival order
+        self._turn = asyncio.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._throttled = 0
+        self._wait_seconds = 0.0
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """Wait for a concurrency slot and for the rate limits to admit a request."""
+        self._waiting += 1
+        try:
+            await self._acquire_slot()
+            try:
+                await self._wait_for_budget(estimated_tokens)
+            except BaseException:
+                self._release_slot()
+                raise
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+
+    def release(
+        self,
+        estimated_tokens: int,
+        actual_tokens: Optional[int] = None,
+        status_code: Optional[int] = None,
+        latency: Optional[float] = None,
+        output_tokens: Optional[int] = None,
+    ) -> None:
+        """Free the request's slot, charging the difference once the real token count is known.
+
+        Args:
+            estimated_tokens (int): The tokens reserved by ``acquire``.
+            actual_tokens (int, optional): The prompt tokens the provider reported.
+            status_code (int, optional): The response status; None if the request failed without one.
+            latency (float, optional): Seconds until the response headers arrived, for the concurrency window.
+            output_tokens (int, optional): The generated tokens the provider reported, to compare latencies.
+        """
+        self._in_flight -= 1
+        if self._tokens is not None and actual_tokens is not None:
+            self._tokens.take(actual_tokens - estimated_tokens)
+
+        if self.window is not None:
+            if status_code in OVERLOAD_STATUS_CODES:
+                self.window.on_overload()
+            elif status_code is not None and status_code < 400 and latency is not None:
+                self.window.on_success(latency, output_tokens)
+        self._release_slot()
+
+    def stats(self) -> LimiterStats:
+        return LimiterStats(
+            window=self.window.size if self.window is not None else 0,
+            in_flight=self._in_flight,
+            waiting=self._waiting,
+            throttled=self._throttled,
+            wait_seconds=round(self._wait_seconds, 3),
+            decreases=self.window.decreases if self.window is not None else 0,
+        )
+
+    async def _acquire_slot(self) -> None:
+        if self.window is None:
+            return
+        if not self._slot_waiters and self._slots_held < self.window.size:
+            self._slots_held += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._slot_waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+
+    def _release_slot(self) -> None:
+        if self.window is None:
+            return
+        self._slots_held -= 1
+        # A shrunk window leaves waiters queued until enough requests have finished
+        while self._slot_waiters and self._slots_held < self.window.size:
+            waiter = self._slot_waiters.popleft()
+            if not waiter.done():
+                self._slots_held += 1
+                waiter.set_result(None)
+
+    async def _wait_for_budget(self, estimated_tokens: int) -> None:
+        if self._requests is None and self._tokens is None:
+            return
+
+        async with self._turn:
+            started = time.monotonic()
+            while True:
+                wait = max(
+                    self._requests.wait_time(1) if self._requests is not None else 0,
+                    self._tokens.wait_time(estimated_tokens) if self._tokens is not None else 0,
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(estimated_tokens)
+
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self._throttled += 1
+                self._wait_seconds += waited
+
+
+def _reported_tokens(response: Response) -> Tuple[Optional[int], Optional[int]]:
+    """The prompt and output token counts of a response, None where the provider did not report them."""
+    # Gemini reports "usageMetadata", OpenAI-compatible APIs "usage"
+    try:
+        body = json.loads(response.content)
+    except ValueError:
+        return None, None
+    if not isinstance(body, dict):
+        return None, None
+
+    usage = body.get("usageMetadata") or body.get("usage") or {}
+    prompt = usage.get("promptTokenCount", usage.get("prompt_tokens", usage.get("input_tokens")))
+    output = usage.get("candidatesTokenCount", usage.get("completion_tokens", usage.get("output_tokens")))
+    # Gemini counts the thinking tokens apart from the answer, though it generates both
+    thoughts = usage.get("thoughtsTokenCount")
+    if isinstance(output, int) and isinstance(thoughts, int):
+        output += thoughts
+    return (prompt if isinstance(prompt, int) else None), (output if isinstance(output, int) else None)
+
+
+class RateLimitedTransport(AsyncBaseTransport):
+    """Sends every request through a ``RateLimiter`` before the wrapped transport."""
+
+    def __init__(self, wrapped: AsyncBaseTransport, limiter: RateLimiter) -> None:
+        self.wrapped = wrapped
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: Request) -> Response:
+        estimated_tokens = int(request.headers.get("content-length", 0)) // BYTES_PER_TOKEN
+        await self.limiter.acquire(estimated_tokens)
+
+        actual_tokens = None
+        output_tokens = None
+        status_code = None
+        latency = None
+        started = time.monotonic()
+        try:
+            response = await self.wrapped.handle_async_request(request)
+            # Up to the headers, so the time spent downloading a large body is not read as overload
+            latency = time.monotonic() - started
+            if response.status_code == 200 and "json" in response.headers.get("content-type", ""):
+                # Reading the body here holds the slot until the whole response arrived; it is kept for the caller
+                await response.aread()
+                actual_tokens, output_tokens = _reported_tokens(response)
+            status_code = response.status_code
+            return response
+        finally:
+            self.limiter.release(estimated_tokens, actual_tokens, status_code, latency, output_tokens)
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 
 def get_repo_version(repo_path: Path) -> str:
@@ -45,3 +46,51 @@ def get_repo_version(repo_path: Path) -> str:
         return f"{branch}@{commit}"
     except Exception:
         return "unknown"
+
+
+def get_clean_commit(repo_path: Path) -> Optional[str]:
+    """
+    Get the full commit hash of HEAD if the working tree matches it, ignoring the generated .ai/ directory.
+    Returns None outside a git repository or when tracked or untracked files differ from HEAD.
+    """
+    import subprocess
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=repo_path,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+        changes = subprocess.run(
+            ["git", "status", "--porcelain", "--", ".", ":(exclude).ai"],
+            cwd=repo_path,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+        return None if changes else commit
+    except Exception:
+        return None
+
+
+def has_uncommitted_changes(repo_path: Path, *pathspecs: str) -> bool:
+    """
+    Check whether tracked or untracked files under ``pathspecs`` (the whole work tree by default) differ from HEAD.
+    Files ignored by .gitignore, such as the .ai/cache/ databases, do not count.
+    Raises CalledProcessError outside a git repository.
+    """
+    import subprocess
+
+    changes = subprocess.run(
+        ["git", "status", "--porcelain", "--", *(pathspecs or (".",))],
+        cwd=repo_path,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+    return bool(changes)
@@ -0,0 +1,219 @@
+"""
+On-disk Cache of LLM Responses
+
+This module replays the responses of deterministic LLM requests, so re-running after a crash or
+on an unchanged repository does not pay for the same calls again.
+
+What it does:
+- Keys each request by a hash of its URL and body; for Gemini the URL names the model and the
+  body holds the settings, system prompt, message history and tool definitions
+- Only caches requests sent with temperature 0, whose responses are interchangeable
+- Stores successful JSON responses in SQLite, evicting the least recently used ones beyond a size
+- Answers hits without a network call; pydantic-ai parses the replayed response as usual
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode
+
+import ujson as json
+from httpx import AsyncBaseTransport, Request, Response
+
+from .logger import Logger
+
+SCHEMA_VERSION = 1
+# Query parameters carrying credentials, left out of the key so a rotated API key keeps the cache
+CREDENTIAL_PARAMS = {"key", "api_key"}
+# Eviction goes below the size limit by this fraction, so it does not run on every insert
+EVICTION_HEADROOM = 0.1
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int  # Cacheable requests sent to the provider
+    skipped: int  # Requests not cacheable, e.g. with a non-zero temperature
+    stored: int
+
+
+def _temperature(body: dict) -> Optional[float]:
+    # Gemini nests the sampling settings in "generationConfig", OpenAI-compatible APIs do not
+    settings = body.get("generationConfig") or body
+    temperature = settings.get("temperature")
+    return temperature if isinstance(temperature, (int, float)) else None
+
+
+def request_key(request: Request) -> Optional[str]:
+    """The cache key of a request, or None if its response should not be cached."""
+    if request.method != "POST":
+        return None
+
+    try:
+        body = json.loads(request.content)
+    except ValueError:
+        return None
+    # Without an explicit temperature the provider samples with its default, which is not 0
+    if not isinstance(body, dict) or _temperature(body) != 0:
+        return None
+
+    query = [(name, value) for name, value in parse_qsl(request.url.query.decode()) if name not in CREDENTIAL_PARAMS]
+    url = request.url.copy_with(query=urlencode(sorted(query)).encode() or None)
+
+    digest = hashlib.sha256()
+    digest.update(str(url).encode())
+    digest.update(b"\0")
+    # Re-encoded with sorted keys, so the order pydantic-ai writes the fields in does not matter
+    digest.update(json.dumps(body, sort_keys=True, ensure_ascii=False).encode())
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """LLM responses by request key, stored in SQLite with a size limit.
+
+    Example:
+        ```python
+        cache = ResponseCache("~/.cache/ai-doc-gen/llm-responses.db", max_bytes=512 * 1024 * 1024)
+        cache.put(key, "application/json", body)
+        cache.get(key)  # ("application/json", body)
+        ```
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int) -> None:
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.stored = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """Return the content type and body cached for ``key``, or None."""
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return None
+            try:
+                row = connection.execute("SELECT content_type, body FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    with connection:
+                        connection.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                Logger.warning(f"Failed to read the LLM response cache {self.path}: {e}")
+                return None
+
+        return (row[0], row[1]) if row is not None else None
+
+    def put(self, key: str, content_type: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO responses (key, used_at, size, content_type, body) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, time.time(), len(body), content_type, body),
+                    )
+                    self._evict(connection)
+                self.stored += 1
+            except sqlite3.Error as e:
+                Logger.warning(f"Failed to write the LLM response cache {self.path}: {e}")
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.skipped, self.stored)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * (1 - EVICTION_HEADROOM)
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY used_at"):
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        Logger.debug("LLM responses evicted", data={"responses": len(evicted), "bytes": total})
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._connection is not None or self._disabled:
+            return self._connection
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                connection.executescript(
+                    f"""
+                    DROP TABLE IF EXISTS responses;
+                    CREATE TABLE responses (
+                        key TEXT PRIMARY KEY,
+                        used_at REAL NOT NULL,
+                        size INTEGER NOT NULL,
+                        content_type TEXT NOT NULL,
+                        body BLOB NOT NULL
+                    );
+                    CREATE INDEX responses_used_at ON responses (used_at);
+                    PRAGMA user_version = {SCHEMA_VERSION};
+                    """
+                )
+        except (OSError, sqlite3.Error) as e:
+            # Requests still go to the provider, they are just not cached
+            Logger.warning(f"LLM response cache {self.path} disabled: {e}")
+            self._disabled = True
+            return None
+
+        self._connection = connection
+        return connection
+
+
+class CachingTransport(AsyncBaseTransport):
+    """Answers cacheable requests from a ``ResponseCache`` and stores what the wrapped transport returns."""
+
+    def __init__(self, wrapped: AsyncBaseTransport, cache: ResponseCache) -> None:
+        self.wrapped = wrapped
+        self.cache = cache
+
+    async def handle_async_request(self, request: Request) -> Response:
+        key = request_key(request)
+        if key is None:
+            self.cache.skipped += 1
+            return await self.wrapped.handle_async_request(request)
+
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self.cache.hits += 1
+            content_type, body = cached
+            return Response(200, headers={"content-type": content_type}, content=body, request=request)
+
+        self.cache.misses += 1
+        response = await self.wrapped.handle_async_request(request)
+        content_type = response.headers.get("content-type", "")
+        if response.status_code == 200 and "json" in content_type:
+            body = await response.aread()
+            await asyncio.to_thread(self.cache.put, key, content_type, body)
+
+        return response
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+        self.cache.close()
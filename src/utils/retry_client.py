@@ -12,19 +12,191 @@ What it does:
 - Tries up to 5 times before giving up
 
 This is useful when calling APIs that might be temporarily unavailable.
+
+All agents share one client through `get_http_client_manager()`, so connections (and their TLS
+handshakes) are reused across agents and, in the cronjob, across projects.
 """
 
-from httpx import AsyncClient, HTTPStatusError
+import importlib.util
+from typing import NamedTuple, Optional
+
+from httpx import AsyncBaseTransport, AsyncClient, AsyncHTTPTransport, HTTPStatusError, Limits, Request, Response
 from pydantic_ai.retries import AsyncTenacityTransport, wait_retry_after
 from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 import config
 
+from .logger import Logger
+from .rate_limiter import RateLimitedTransport, RateLimiter
+from .response_cache import CachingTransport, ResponseCache
+
+
+class PoolStats(NamedTuple):
+    clients: int  # Clients created so far; more than one means the pool was closed and opened again
+    requests: int  # Requests sent, every retry counted
+    failures: int  # Requests that failed without a response, e.g. connection errors and timeouts
+    in_flight: int  # Requests waiting for their response headers
+    connections: int  # Open connections in the pool
+    idle_connections: int  # Open connections kept alive for the next request
+
+
+class _MeteredTransport(AsyncBaseTransport):
+    """Counts the requests going through the pooled transport it wraps."""
+
+    def __init__(self, wrapped: AsyncHTTPTransport) -> None:
+        self.wrapped = wrapped
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    async def handle_async_request(self, request: Request) -> Response:
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            return await self.wrapped.handle_async_request(request)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+class _RetryTransport(AsyncTenacityTransport):
+    """``AsyncTenacityTransport`` retrying each request with its own copy of the controller.
+
+    tenacity keeps the state of the current retry loop on the controller, so concurrent requests
+    sharing one would overwrite each other's attempts.
+    """
+
+    async def handle_async_request(self, request: Request) -> Response:
+        async for attempt in self.controller.copy():
+            with attempt:
+                response = await self.wrapped.handle_async_request(request)
+                # Transports return responses without their request, which raise_for_status needs
+                response.request = request
+                if self.validate_response:
+                    self.validate_response(response)
+                return response
+        raise RuntimeError("The retry controller did not make any attempts")
+
+
+class HttpClientManager:
+    """Owns the HTTP client shared by every LLM call of the process.
+
+    The client is created on first use with a bounded connection pool, keep-alive and optionally
+    HTTP/2, wrapped in the retry logic of ``create_retrying_client``. It lives until ``aclose``,
+    which the entry point calls once before exiting; a later ``get_client`` opens a new pool.
+
+    Every attempt, retries included, first waits for ``limiter``, so bursts from parallel agents
+    queue in the process instead of hitting the provider's quota. Its concurrency window sees the
+    outcome of each attempt, so 429s answered inside the retry loop shrink it at once.
+
+    With a ``cache``, deterministic requests answered before are replayed without reaching the
+    retry loop or the limiter.
+
+    Example:
+        ```python
+        client = get_http_client_manager().get_client()  # The same client for every caller
+        get_http_client_manager().stats()  # PoolStats(clients=1, requests=42, failures=0, in_flight=3, ...)
+        await get_http_client_manager().aclose()
+        ```
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        http2: bool = False,
+        limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        self.limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.limiter = limiter
+        self.cache = cache
+        self._client: Optional[AsyncClient] = None
+        self._transport: Optional[_MeteredTransport] = None
+        self._clients = 0
+
+    def get_client(self) -> AsyncClient:
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                Logger.warning("HTTP/2 needs the h2 package (pip install 'httpx[http2]'), using HTTP/1.1")
+                http2 = False
+
+            self._transport = _MeteredTransport(AsyncHTTPTransport(limits=self.limits, http2=http2))
+            transport = self._transport
+            if self.limiter is not None:
+                transport = RateLimitedTransport(transport, self.limiter)
+            self._client = create_retrying_client(transport=transport, cache=self.cache)
+            self._clients += 1
+            Logger.debug(
+                "HTTP client created",
+                data={
+                    "max_connections": self.limits.max_connections,
+                    "max_keepalive_connections": self.limits.max_keepalive_connections,
+                    "keepalive_expiry": self.limits.keepalive_expiry,
+                    "http2": http2,
+                },
+            )
+
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled connections. Safe to call when no client was created."""
+        if self._client is None:
+            return
 
-def create_retrying_client() -> AsyncClient:
+        Logger.info("HTTP client closed", data=self.stats()._asdict())
+        if self.limiter is not None:
+            Logger.info("LLM rate limiter", data=self.limiter.stats()._asdict())
+        if self.cache is not None:
+            Logger.info("LLM response cache", data=self.cache.stats()._asdict())
+        client, self._client = self._client, None
+        transport, self._transport = self._transport, None
+        await client.aclose()
+        # The retry transport does not forward aclose, so the pool is closed through the transport held here
+        await transport.aclose()
+
+    def stats(self) -> PoolStats:
+        transport = self._transport
+        if transport is None:
+            return PoolStats(self._clients, 0, 0, 0, 0, 0)
+
+        # httpcore's pool is not part of httpx's public API, so it is only read if it looks as expected
+        connections = list(getattr(getattr(transport.wrapped, "_pool", None), "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return PoolStats(
+            clients=self._clients,
+            requests=transport.requests,
+            failures=transport.failures,
+            in_flight=transport.in_flight,
+            connections=len(connections),
+            idle_connections=idle,
+        )
+
+
+def create_retrying_client(
+    transport: Optional[AsyncBaseTransport] = None, cache: Optional[ResponseCache] = None
+) -> AsyncClient:
     """
     Create an HTTP client that automatically retries failed requests.
 
+    Most callers want the shared client of ``get_http_client_manager()`` instead of a new one.
+
+    Args:
+        transport: The transport sending each attempt. Defaults to a new connection pool.
+        cache: Replays cached responses in front of the retry logic, and stores new ones.
+
     Returns:
         AsyncClient: An HTTP client configured with retry logic that will:
         - Retry on server errors (429, 502, 503, 504) and connection issues
@@ -56,7 +228,7 @@ def create_retrying_client() -> AsyncClient:
             response.raise_for_status()  # This will raise HTTPStatusError for retry
 
     # Create the transport layer with retry logic
-    transport = AsyncTenacityTransport(
+    transport = _RetryTransport(
         controller=AsyncRetrying(
             # What errors to retry on:
             # - HTTPStatusError: For 4xx/5xx HTTP errors
@@ -79,6 +251,42 @@ def create_retrying_client() -> AsyncClient:
         ),
         # Function to check if response status should trigger a retry:
         validate_response=should_retry_status,
+        # Where each attempt is sent; the shared client passes its pooled transport
+        wrapped=transport,
     )
     # Return the configured HTTP client
+    if cache is not None:
+        return AsyncClient(transport=CachingTransport(transport, cache))
     return AsyncClient(transport=transport)
+
+
+_http_client_manager: Optional[HttpClientManager] = None
+
+
+def get_http_client_manager() -> HttpClientManager:
+    """Return the client manager shared by every agent of the process, creating it on first use.
+
+    It is created lazily because ``config`` imports this package before its settings are defined.
+    """
+    global _http_client_manager
+    if _http_client_manager is None:
+        _http_client_manager = HttpClientManager(
+            max_connections=config.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+            http2=config.HTTP_CLIENT_HTTP2,
+            limiter=RateLimiter(
+                max_concurrency=config.LLM_MAX_CONCURRENT_REQUESTS,
+                requests_per_minute=config.LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=config.LLM_TOKENS_PER_MINUTE,
+                min_concurrency=config.LLM_MIN_CONCURRENT_REQUESTS,
+                adaptive=config.LLM_ADAPTIVE_CONCURRENCY,
+            ),
+            cache=(
+                ResponseCache(config.LLM_RESPONSE_CACHE_PATH, config.LLM_RESPONSE_CACHE_MAX_BYTES)
+                if config.LLM_RESPONSE_CACHE_ENABLED
+                else None
+            ),
+        )
+
+    return _http_client_manager
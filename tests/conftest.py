@@ -0,0 +1,20 @@
+import logging
+import os
+
+import pytest
+
+# config.py requires the LLM settings; the tests never call a model
+for name in ("ANALYZER", "DOCUMENTER"):
+    os.environ.setdefault(f"{name}_LLM_MODEL", "gemini-test")
+    os.environ.setdefault(f"{name}_LLM_BASE_URL", "http://localhost")
+    os.environ.setdefault(f"{name}_LLM_API_KEY", "test")
+# Nothing under test should write to the user's cache directory
+os.environ.setdefault("LLM_RESPONSE_CACHE_ENABLED", "false")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def logger(tmp_path_factory):
+    # Imported here, once the settings above are in place: utils imports config
+    from utils import Logger
+
+    Logger.init(tmp_path_factory.mktemp("logs"), file_level=logging.DEBUG, console_level=logging.CRITICAL)
@@ -0,0 +1,100 @@
+import asyncio
+import subprocess
+
+from agents.analyzer import AnalyzerAgent, AnalyzerAgentConfig
+from agents.tools.repo_index import IgnoreRules, RepositoryIndex
+from agents.tools.repo_index.manifest import ensure_cache_dir
+from handlers.cronjob import JobAnalyzeHandler, JobAnalyzeHandlerConfig
+
+GIT = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+
+
+def analyze(repo_path, monkeypatch, force=False):
+    """Run the structure analysis with a fake agent and return how many times the agent ran."""
+    runs = []
+
+    async def run_agent(self, agent, user_prompt, file_path, inputs_hash=None):
+        runs.append(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(f"# Analysis {len(runs)}\n")
+        if inputs_hash is not None:
+            self._save_state(file_path, inputs_hash)
+
+    monkeypatch.setattr(AnalyzerAgent, "_run_agent", run_agent)
+    monkeypatch.setattr(AnalyzerAgent, "_structure_analyzer_agent", property(lambda self: None))
+    agent = AnalyzerAgent(
+        AnalyzerAgentConfig(
+            repo_path=repo_path,
+            exclude_data_flow=True,
+            exclude_dependencies=True,
+            exclude_request_flow=True,
+            exclude_api_analysis=True,
+            force=force,
+        )
+    )
+    asyncio.run(agent.run(repo_index=RepositoryIndex.build(repo_path, rules=IgnoreRules())))
+    return len(runs)
+
+
+def test_analysis_is_skipped_until_the_repository_changes(tmp_path, monkeypatch):
+    (tmp_path / "app.py").write_text("print('app')\n")
+
+    assert analyze(tmp_path, monkeypatch) == 1
+    assert (tmp_path / ".ai" / "docs" / ".analysis_state.json").exists()
+    assert analyze(tmp_path, monkeypatch) == 0
+
+    (tmp_path / "app.py").write_text("print('changed')\n")
+    assert analyze(tmp_path, monkeypatch) == 1
+    assert analyze(tmp_path, monkeypatch, force=True) == 1
+
+
+def test_deleted_analysis_is_regenerated(tmp_path, monkeypatch):
+    (tmp_path / "app.py").write_text("print('app')\n")
+    analyze(tmp_path, monkeypatch)
+
+    (tmp_path / ".ai" / "docs" / "structure_analysis.md").unlink()
+
+    assert analyze(tmp_path, monkeypatch) == 1
+
+
+def run_cronjob_project(tmp_path, monkeypatch, analysis):
+    """Run one cronjob project whose analysis step calls ``analysis`` and return the merge requests opened."""
+    origin = tmp_path / "origin"
+    (origin / ".ai" / "docs").mkdir(parents=True)
+    (origin / ".ai" / "docs" / "structure_analysis.md").write_text("# Structure\n")
+    subprocess.run([*GIT, "init", "-q"], cwd=origin, check=True)
+    subprocess.run([*GIT, "add", "."], cwd=origin, check=True)
+    subprocess.run([*GIT, "commit", "-q", "-m", "initial"], cwd=origin, check=True)
+
+    handler = JobAnalyzeHandler(gitlab_client=None, config=JobAnalyzeHandlerConfig(working_path=tmp_path / "work"))
+    merge_requests = []
+
+    async def analyze_project(project, repo):
+        analysis(origin)
+
+    async def create_merge_request(project, repo):
+        merge_requests.append(project)
+
+    monkeypatch.setattr(handler, "_clone_project", lambda project: __import__("git").Repo(origin))
+    monkeypatch.setattr(handler, "_analyze_project", analyze_project)
+    monkeypatch.setattr(handler, "_create_merge_request", create_merge_request)
+    monkeypatch.setattr(handler, "_cleanup_project", lambda project, repo: None)
+
+    asyncio.run(handler._handle_project(type("Project", (), {"name": "app", "id": 1})()))
+    return merge_requests
+
+
+def test_cronjob_skips_the_merge_request_when_no_analysis_changed(tmp_path, monkeypatch):
+    def analysis(repo_path):
+        # Caches are written on every run, but stay out of git
+        ensure_cache_dir(repo_path / ".ai" / "cache")
+        (repo_path / ".ai" / "cache" / "trigrams.db").write_bytes(b"index")
+
+    assert run_cronjob_project(tmp_path, monkeypatch, analysis) == []
+
+
+def test_cronjob_opens_a_merge_request_for_new_analyses(tmp_path, monkeypatch):
+    def analysis(repo_path):
+        (repo_path / ".ai" / "docs" / "structure_analysis.md").write_text("# Structure, updated\n")
+
+    assert len(run_cronjob_project(tmp_path, monkeypatch, analysis)) == 1
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import config
+from agents.tools import io_executor
+from agents.tools.dir_tool.listing import CHARS_PER_TOKEN
+from agents.tools.file_tool import FileBatchReadTool
+from agents.tools.file_tool.batch_reader import FileReadRequest
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for index in range(10):
+        path = tmp_path / f"module_{index}.py"
+        path.write_text(f"VALUE_{index} = {'x' * 200!r}\n")
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def single_io_worker(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(io_executor, "_executor", executor)
+    yield executor
+    executor.shutdown()
+
+
+def test_files_past_the_budget_are_not_read(files, monkeypatch):
+    monkeypatch.setattr(config, "TOOL_READ_FILES_WORKERS", 2)
+    tool = FileBatchReadTool(cache=None)
+    read = []
+    read_file = tool._read
+    monkeypatch.setattr(tool, "_read", lambda request: read.append(request.file_path) or read_file(request))
+
+    # Room for three and a half files
+    section = len(read_file(FileReadRequest(file_path=files[0])))
+    result = tool._run(
+        [FileReadRequest(file_path=path) for path in files], token_budget=section * 7 // 2 // CHARS_PER_TOKEN
+    )
+
+    assert "VALUE_2 =" in result and "VALUE_3 =" not in result
+    assert result.endswith(f"{files[9]} (line 0, 200 lines)]\n")
+    assert f"call again with: {files[3]} " in result
+    # The files that did not fit, and at most the next ones in flight
+    assert len(read) <= 6
+
+
+def test_reads_run_on_a_busy_io_executor_in_request_order(files, single_io_worker):
+    tool = FileBatchReadTool(cache=None)
+
+    # The only I/O worker runs the tool call itself, so its reads must not wait for a free worker
+    result = single_io_worker.submit(tool._run, [FileReadRequest(file_path=path) for path in files]).result(timeout=10)
+
+    assert [result.index(f"VALUE_{index} =") for index in range(10)] == sorted(
+        result.index(f"VALUE_{index} =") for index in range(10)
+    )
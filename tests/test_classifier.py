@@ -0,0 +1,35 @@
+import pytest
+
+from agents.tools.repo_index import KIND_GENERATED, KIND_TEXT
+from agents.tools.repo_index.classifier import classify_sample
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "// Code generated by protoc-gen-go. DO NOT EDIT.",
+        "# @generated by pants",
+        "// <auto-generated />",
+        "# Autogenerated file. Do not edit.",
+        "/* Generated from schema.graphql, don't modify */",
+        "# This file was autogenerated by uv via the following command:",
+        "// This file is automatically generated.",
+        "-- This file has been generated by sqlc",
+    ],
+)
+def test_generator_headers_are_recognized(header):
+    assert classify_sample(f"{header}\npackage main\n".encode()) == KIND_GENERATED
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "# IDs are auto-generated by the database",
+        '"""Models. Primary keys are autogenerated."""',
+        "// Generated reports are stored in S3",
+        "# TODO: regenerate the docs, then do not edit them by hand",
+        "// The token is auto-generated from the secret",
+    ],
+)
+def test_comments_about_generated_values_are_not_markers(header):
+    assert classify_sample(f"{header}\nclass Order:\n    pass\n".encode()) == KIND_TEXT
@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.tools.file_tool import ContentCache
+
+VERSION = (1, 5)
+
+
+def test_concurrent_reads_of_a_file_load_it_once():
+    cache = ContentCache(max_bytes=1024)
+    loads = []
+    release = threading.Event()
+
+    def load():
+        loads.append(threading.current_thread().name)
+        # Hold the load until every reader asked for the file
+        release.wait(timeout=5)
+        return "hello"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(cache.get, "a.txt", VERSION, load) for _ in range(8)]
+        while sum(cache.stats()[:2]) < 8:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()[:2] == (7, 1)
+
+
+def test_a_failed_load_is_raised_to_every_waiting_reader_and_retried_later():
+    cache = ContentCache(max_bytes=1024)
+    release = threading.Event()
+
+    def failing_load():
+        release.wait(timeout=5)
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get, "a.txt", VERSION, failing_load) for _ in range(4)]
+        while sum(cache.stats()[:2]) < 4:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(UnicodeDecodeError):
+                future.result(timeout=5)
+
+    assert cache.get("a.txt", VERSION, lambda: "hello").text == "hello"
+
+
+def test_a_new_version_is_loaded_again():
+    cache = ContentCache(max_bytes=1024)
+
+    cache.get("a.txt", VERSION, lambda: "hello")
+
+    assert cache.get("a.txt", VERSION, lambda: "changed").text == "hello"
+    assert cache.get("a.txt", (2, 7), lambda: "changed").text == "changed"
@@ -0,0 +1,44 @@
+import subprocess
+
+import pytest
+from pydantic_ai import ModelRetry
+
+from agents.tools.file_tool import FileReadTool
+from agents.tools.repo_index import SOURCE_GIT, SOURCE_WALK, GitObjectStore, IgnoreRules, RepositoryIndex
+
+GIT = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+
+
+@pytest.fixture
+def repository(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print('app')\n")
+    (tmp_path / ".gitignore").write_text("*.env\n")
+    subprocess.run([*GIT, "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run([*GIT, "add", "."], cwd=tmp_path, check=True)
+    subprocess.run([*GIT, "commit", "-q", "-m", "initial"], cwd=tmp_path, check=True)
+    # Neither file is in the index built from git
+    (tmp_path / "src" / "draft.py").write_text("print('draft')\n")
+    (tmp_path / "local.env").write_text("DEBUG=1\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("source", [SOURCE_WALK, SOURCE_GIT])
+def test_files_left_out_of_the_index_are_read_from_disk(repository, source):
+    tool = FileReadTool(RepositoryIndex.build(repository, rules=IgnoreRules(), source=source), cache=None)
+
+    assert "print('app')" in tool._run(str(repository / "src" / "app.py"))
+    assert "print('draft')" in tool._run(str(repository / "src" / "draft.py"))
+    assert "DEBUG=1" in tool._run(str(repository / "local.env"))
+    with pytest.raises(ModelRetry, match="File not found"):
+        tool._run(str(repository / "src" / "missing.py"))
+
+
+def test_git_object_index_only_reads_committed_files(repository):
+    (repository / "src" / "app.py").write_text("print('changed')\n")
+
+    with GitObjectStore(repository) as objects:
+        tool = FileReadTool(RepositoryIndex.from_git_objects(repository, objects), cache=None)
+        assert "print('app')" in tool._run(str(repository / "src" / "app.py"))
+        with pytest.raises(ModelRetry, match="File not found"):
+            tool._run(str(repository / "src" / "draft.py"))
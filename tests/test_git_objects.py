@@ -0,0 +1,59 @@
+import subprocess
+
+import pytest
+
+from agents.tools.repo_index import GitObjectStore
+
+GIT = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+
+
+def commit(root, message):
+    subprocess.run([*GIT, "add", "-A"], cwd=root, check=True)
+    subprocess.run([*GIT, "commit", "-q", "-m", message], cwd=root, check=True)
+    return subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repository(tmp_path):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print('first')\n")
+    (tmp_path / "data.bin").write_bytes(bytes(range(256)) + b"\n\n")
+    first = commit(tmp_path, "first")
+
+    (tmp_path / "src" / "app.py").write_text("print('second')\n")
+    (tmp_path / "src" / "new.py").write_text("NEW = 1\n")
+    commit(tmp_path, "second")
+    # Never committed
+    (tmp_path / "src" / "app.py").write_text("print('draft')\n")
+    return tmp_path, first
+
+
+def test_reads_come_from_the_pinned_commit(repository):
+    root, first = repository
+
+    with GitObjectStore(root, first[:10]) as objects:
+        assert objects.commit == first
+        entries = {entry.path: entry for entry in objects.list_tree()}
+
+        assert sorted(entries) == ["data.bin", "src/app.py"]
+        # Several reads go through the same cat-file process
+        for _ in range(3):
+            assert objects.read(entries["src/app.py"].oid) == b"print('first')\n"
+            assert objects.read(entries["data.bin"].oid) == bytes(range(256)) + b"\n\n"
+        assert entries["data.bin"].size == 258
+
+
+def test_missing_objects_and_unknown_revisions_are_reported(repository):
+    root, first = repository
+
+    with GitObjectStore(root, first) as objects:
+        with pytest.raises(FileNotFoundError):
+            objects.read("0" * 40)
+        # The process is still usable after a missing object
+        assert objects.read(objects.list_tree()[0].oid)
+
+    with pytest.raises(ValueError, match="rev-parse failed"):
+        GitObjectStore(root, "no-such-branch")
@@ -0,0 +1,102 @@
+import subprocess
+
+import pytest
+
+from agents.tools.repo_index import IgnoreSpec
+
+# (.gitignore lines, paths to check); a trailing "/" marks a directory
+CASES = {
+    "negation": (
+        ["*.log", "!keep.log"],
+        ["a.log", "keep.log", "src/keep.log", "src/b.log", "src/b.txt"],
+    ),
+    "negation inside an ignored directory": (
+        ["secret/", "!secret/keep.txt"],
+        ["secret/keep.txt", "secret/key.pem", "public/keep.txt"],
+    ),
+    "anchoring": (
+        ["/build", "docs/tmp", "cache"],
+        ["build/out.txt", "src/build/out.txt", "docs/tmp/a.txt", "src/docs/tmp/a.txt", "cache/x", "src/cache/x"],
+    ),
+    "double star": (
+        ["**/generated", "assets/**/*.min.js", "a/**/b"],
+        [
+            "generated/x.py",
+            "src/generated/x.py",
+            "assets/app.min.js",
+            "assets/v1/app.min.js",
+            "assets/v1/app.js",
+            "a/b/c.txt",
+            "a/x/y/b/c.txt",
+            "src/a/b/c.txt",
+        ],
+    ),
+    "trailing double star": (
+        ["vendor/**", "!vendor/keep/"],
+        ["vendor/lib.js", "vendor/keep/lib.js", "vendor/", "src/vendor/lib.js"],
+    ),
+    "directory only": (
+        ["out/", "*.tmp/"],
+        ["out/x.txt", "lib/out", "src/out/x.txt", "data.tmp/f", "x.tmp", "data.tmp/"],
+    ),
+    "wildcards stay within a component": (
+        ["src/*.py", "file[0-9].txt", "?.cfg", "[!a]*.md"],
+        ["src/a.py", "src/sub/b.py", "file1.txt", "filex.txt", "a.cfg", "ab.cfg", "a.md", "b.md"],
+    ),
+    "escapes and comments": (
+        ["# comment", "\\#notes", "\\!bang", "trailing\\ ", "spaces   "],
+        ["#notes", "!bang", "trailing ", "trailing", "spaces", "comment"],
+    ),
+}
+
+
+def spec_ignores(spec: IgnoreSpec, path: str) -> bool:
+    """Whether a walker applying ``spec`` leaves ``path`` out: it never descends into an ignored directory."""
+    is_dir = path.endswith("/")
+    parts = path.rstrip("/").split("/")
+    for depth in range(1, len(parts) + 1):
+        rel_path = "/".join(parts[:depth])
+        if spec.match(rel_path, parts[depth - 1], is_dir or depth < len(parts)) is True:
+            return True
+
+    return False
+
+
+def git_ignores(root, lines, paths):
+    (root / ".gitignore").write_text("\n".join(lines) + "\n")
+    for path in paths:
+        target = root / path.rstrip("/")
+        if path.endswith("/"):
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.touch()
+
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    result = subprocess.run(
+        ["git", "check-ignore", "--stdin"],
+        cwd=root,
+        input="\n".join(path.rstrip("/") for path in paths),
+        capture_output=True,
+        text=True,
+        # 1 means that no path is ignored
+        check=False,
+    )
+    assert result.returncode in (0, 1), result.stderr
+    return set(result.stdout.splitlines())
+
+
+@pytest.mark.parametrize("lines, paths", CASES.values(), ids=CASES.keys())
+def test_matches_git_check_ignore(tmp_path, lines, paths):
+    expected = git_ignores(tmp_path, lines, paths)
+    spec = IgnoreSpec(lines)
+
+    assert {path.rstrip("/") for path in paths if spec_ignores(spec, path)} == expected
+
+
+def test_rules_only_apply_below_their_directory():
+    spec = IgnoreSpec(["/build", "*.log"], base="src")
+
+    assert spec.match("src/build", "build", True) is True
+    assert spec.match("src/pkg/build", "build", True) is None
+    assert spec.match("src/pkg/debug.log", "debug.log", False) is True
@@ -0,0 +1,46 @@
+import pytest
+
+from agents.tools.file_tool.line_index import LineIndexCache, read_lines
+
+LINES = [f"line {index}: {'é' * (index % 7)}" for index in range(1000)]
+
+
+@pytest.fixture(params=["\n", "\r\n"], ids=["lf", "crlf"])
+def source(request, tmp_path):
+    path = tmp_path / "big.txt"
+    # No trailing newline: the last line still counts
+    path.write_bytes(request.param.join(LINES).encode())
+    return str(path)
+
+
+@pytest.mark.parametrize("start, count", [(0, 10), (500, 25), (990, 50), (1200, 5)])
+def test_a_window_read_through_mmap_matches_the_file(source, start, count):
+    window = read_lines(source, start, count)
+
+    assert window.text == "\n".join(LINES[start : start + count]) + ("\n" if start + count < len(LINES) else "")
+    assert window.end_line == min(start + count, len(LINES))
+
+
+def test_paging_through_a_file_returns_every_line(source):
+    pages = []
+    start = 0
+    while True:
+        window = read_lines(source, start, 128)
+        pages.append(window.text)
+        if window.total_lines is not None and window.end_line >= window.total_lines:
+            break
+        start = window.end_line
+
+    assert "".join(pages) == "\n".join(LINES)
+    assert window.total_lines == len(LINES)
+
+
+def test_a_modified_file_gets_a_new_index(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("a\nb\n")
+    cache = LineIndexCache()
+    first = cache.get(str(path), path.stat())
+
+    path.write_text("a\nb\nc\n")
+
+    assert cache.get(str(path), path.stat()) is not first
@@ -0,0 +1,177 @@
+import pytest
+from pydantic_ai import ModelRetry
+
+from agents.tools.dir_tool import ListFilesTool
+from agents.tools.dir_tool.listing import ListingRow, auto_depth, build_rows, estimate_tokens, paginate
+
+GROUPED_FILES = {
+    "": ["README.md", "setup.py"],
+    "src": ["app.py", "config.py"],
+    "src/api": [f"handler_{index:02}.py" for index in range(40)],
+    "src/api/v1": ["routes.py"],
+    "src/c#": ["Program.cs"],
+    "src/c#/bin": ["app.dll"],
+    "docs": ["index.md"],
+    "vendor/lib/a": ["a.js"],
+    "vendor/lib/b": ["b.js", "c.js"],
+}
+
+
+def render_row(row: ListingRow) -> str:
+    if row.collapsed:
+        return f"/{row.key}/ (collapsed): {len(row.files)} files\n"
+    return f"/{row.key}: {row.files}\n"
+
+
+def read_all_pages(rows, token_budget):
+    pages = []
+    cursor = None
+    while True:
+        page = paginate(rows, cursor, token_budget, render_row)
+        pages.append(page)
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+def join_pages(pages):
+    # A row split between pages is continued by the first row of the next page
+    joined = []
+    for page in pages:
+        for row in page.rows:
+            if joined and joined[-1].key == row.key:
+                joined[-1] = joined[-1]._replace(files=joined[-1].files + row.files)
+            else:
+                joined.append(row)
+    return joined
+
+
+@pytest.mark.parametrize("token_budget", [10, 25, 60, 200, 10_000])
+def test_pages_put_back_together_equal_the_full_listing(token_budget):
+    rows = build_rows(GROUPED_FILES, max_depth=0, collapse_threshold=0)
+
+    pages = read_all_pages(rows, token_budget)
+
+    assert join_pages(pages) == rows
+    assert pages[-1].remaining == 0
+
+
+def test_a_row_over_budget_is_split_with_an_offset():
+    rows = build_rows({"src/api": [f"handler_{index:02}.py" for index in range(40)]}, 0, 0)
+
+    first = paginate(rows, None, 30, render_row)
+    second = paginate(rows, first.next_cursor, 30, render_row)
+
+    taken = len(first.rows[0].files)
+    assert 0 < taken < len(rows[0].files)
+    assert first.next_cursor == f"src/api#{taken}"
+    assert second.rows[0].files[0] == rows[0].files[taken]
+
+
+def test_cursors_of_directories_with_a_hash_resume_there():
+    rows = build_rows(GROUPED_FILES, max_depth=0, collapse_threshold=0)
+
+    page = paginate(rows, "src/c##0", 10_000, render_row)
+
+    assert [row.key for row in page.rows][:2] == ["src/c#", "src/c#/bin"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "src/api",  # No offset
+        "src/api#x",
+        "src/gone#0",  # Removed since, or from another listing
+        "src/api#40",  # Past the files of its directory
+        "vendor/lib#1",  # Offsets never point into a collapsed row
+    ],
+)
+def test_foreign_or_stale_cursors_are_rejected(cursor):
+    rows = build_rows(GROUPED_FILES, max_depth=2, collapse_threshold=0)
+
+    with pytest.raises(ValueError):
+        paginate(rows, cursor, 10_000, render_row)
+
+
+def test_the_tool_turns_a_stale_cursor_into_a_retry(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("")
+
+    with pytest.raises(ModelRetry, match="start over"):
+        ListFilesTool(repo_index=None)._run(str(tmp_path), max_depth=-1, cursor="lib#0")
+
+
+def test_listing_without_an_index_applies_the_repository_ignore_files(tmp_path):
+    for path in [
+        "src/app.py",
+        "src/gen/out.py",
+        "build/app.js",
+        "docs/notes.tmp",
+        "docs/keep.tmp",
+        "node_modules/x.js",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    (tmp_path / ".gitignore").write_text("build/\n*.tmp\n")
+    (tmp_path / "src" / ".gitignore").write_text("gen/\n")
+    (tmp_path / ".ai").mkdir()
+    (tmp_path / ".ai" / "ignore").write_text("!docs/keep.tmp\n")
+
+    result = ListFilesTool(repo_index=None)._run(str(tmp_path), max_depth=-1)
+
+    assert "app.py" in result and "keep.tmp" in result
+    for name in ["out.py", "app.js", "notes.tmp", "x.js"]:
+        assert name not in result
+
+
+def test_build_rows_collapses_deep_and_crowded_directories():
+    rows = build_rows(GROUPED_FILES, max_depth=2, collapse_threshold=10)
+    by_key = {row.key: row for row in rows}
+
+    # Everything at depth 2 is summarized with its subtree, even without files of its own
+    assert by_key["src/api"] == ListingRow("src/api", GROUPED_FILES["src/api"] + ["routes.py"], True, 1)
+    assert by_key["vendor/lib"] == ListingRow("vendor/lib", ["a.js", "b.js", "c.js"], True, 2)
+    assert "src/api/v1" not in by_key
+
+    crowded = {row.key: row for row in build_rows(GROUPED_FILES, 0, 10)}
+    assert crowded["src/api"].collapsed and not crowded["src"].collapsed
+    # The listed directory itself is never collapsed
+    assert not build_rows({"": ["a.py"] * 20}, 0, 10)[0].collapsed
+
+
+def test_auto_depth_picks_the_deepest_level_that_fits():
+    def total_tokens(max_depth):
+        return sum(estimate_tokens(render_row(row)) for row in build_rows(GROUPED_FILES, max_depth, 0))
+
+    assert auto_depth(GROUPED_FILES, 0, 100_000, render_row) == 0
+    assert auto_depth(GROUPED_FILES, 0, total_tokens(2), render_row) == 2
+    assert auto_depth(GROUPED_FILES, 0, total_tokens(2) - 1, render_row) == 1
+    # Nothing fits: the shallowest summary is still returned
+    assert auto_depth(GROUPED_FILES, 0, 1, render_row) == 1
+
+
+def test_auto_depth_stops_rendering_once_over_budget():
+    rendered = []
+
+    def spy(row):
+        rendered.append(row.key)
+        return render_row(row)
+
+    assert auto_depth(GROUPED_FILES, 0, 1, spy) == 1
+    assert len(rendered) == 1
+
+
+def test_auto_depth_does_not_annotate_files(tmp_path, monkeypatch):
+    for directory in ["a/b/c", "d/e"]:
+        (tmp_path / directory).mkdir(parents=True)
+        for index in range(5):
+            (tmp_path / directory / f"f{index}.py").write_text("")
+    tool = ListFilesTool(repo_index=None)
+    described = []
+    describe_file = tool._describe_file
+    monkeypatch.setattr(tool, "_describe_file", lambda *args: described.append(args) or describe_file(*args))
+
+    tool._run(str(tmp_path), max_depth=0, details=True)
+
+    # Each file is annotated to size the page and to print it, but not for every depth tried
+    assert len(described) <= 2 * 10
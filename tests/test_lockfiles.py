@@ -0,0 +1,171 @@
+import json
+
+from agents.tools.file_tool import summarize_lockfile
+from agents.tools.file_tool.lockfiles import parse_go_sum, parse_package_lock, parse_poetry_lock, parse_uv_lock
+
+UV_LOCK = """
+version = 1
+
+[[package]]
+name = "app"
+version = "0.1.0"
+source = { editable = "." }
+dependencies = [{ name = "httpx" }, { name = "Pydantic" }]
+
+[package.optional-dependencies]
+dev = [{ name = "pytest" }, { name = "httpx" }]
+
+[[package]]
+name = "httpx"
+version = "0.28.1"
+source = { registry = "https://pypi.org/simple" }
+dependencies = [{ name = "anyio" }]
+
+[[package]]
+name = "pydantic"
+version = "2.11.7"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "anyio"
+version = "4.9.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "pytest"
+version = "8.4.1"
+source = { registry = "https://pypi.org/simple" }
+"""
+
+POETRY_LOCK = """
+[[package]]
+name = "requests"
+version = "2.32.3"
+
+[[package]]
+name = "urllib3"
+version = "2.5.0"
+
+[[package]]
+name = "ruff"
+version = "0.6.0"
+
+[[package]]
+name = "typing-extensions"
+version = "4.14.0"
+"""
+
+POETRY_PYPROJECT = """
+[tool.poetry.dependencies]
+python = "^3.12"
+Requests = "^2.32"
+
+[tool.poetry.group.lint.dependencies]
+ruff = "*"
+
+[project]
+dependencies = ["typing_extensions>=4.0; python_version < '3.13'"]
+"""
+
+GO_MOD = """module example.com/app
+
+go 1.22
+
+require github.com/spf13/cobra v1.8.0
+
+require (
+\tgolang.org/x/sync v0.7.0
+\tgithub.com/inconshreveable/mousetrap v1.1.0 // indirect
+)
+"""
+
+GO_SUM = """github.com/inconshreveable/mousetrap v1.1.0 h1:abc=
+github.com/inconshreveable/mousetrap v1.1.0/go.mod h1:def=
+github.com/spf13/cobra v1.8.0 h1:ghi=
+github.com/spf13/cobra v1.8.0/go.mod h1:jkl=
+github.com/spf13/pflag v1.0.5/go.mod h1:mno=
+golang.org/x/sync v0.7.0 h1:pqr=
+"""
+
+
+def no_siblings(name):
+    return None
+
+
+def test_uv_lock_splits_direct_development_and_transitive():
+    summary = parse_uv_lock(UV_LOCK, no_siblings)
+
+    assert summary.direct == {"httpx": "0.28.1", "pydantic": "2.11.7"}
+    # A runtime dependency that is also a dev one counts as runtime
+    assert summary.development == {"pytest": "8.4.1"}
+    assert summary.locked == 4
+
+
+def test_poetry_lock_reads_the_pyproject_next_to_it():
+    summary = parse_poetry_lock(POETRY_LOCK, {"pyproject.toml": POETRY_PYPROJECT}.get)
+
+    assert summary.direct == {"requests": "2.32.3", "typing-extensions": "4.14.0"}
+    assert summary.development == {"ruff": "0.6.0"}
+    assert summary.locked == 4
+    assert parse_poetry_lock(POETRY_LOCK, no_siblings).note == "pyproject.toml not found"
+
+
+def test_package_lock_v3_counts_nested_versions_and_skips_links():
+    lock = {
+        "lockfileVersion": 3,
+        "packages": {
+            "": {"dependencies": {"react": "^18.0.0", "@scope/ui": "^1.0.0"}, "devDependencies": {"vite": "^5.0.0"}},
+            "node_modules/react": {"version": "18.3.1"},
+            "node_modules/@scope/ui": {"version": "1.2.0"},
+            "node_modules/@scope/ui/node_modules/react": {"version": "17.0.2"},
+            "node_modules/vite": {"version": "5.4.0"},
+            "node_modules/local": {"link": True, "resolved": "packages/local"},
+        },
+    }
+
+    summary = parse_package_lock(json.dumps(lock), no_siblings)
+
+    assert summary.direct == {"react": "18.3.1", "@scope/ui": "1.2.0"}
+    assert summary.development == {"vite": "5.4.0"}
+    assert summary.locked == 4
+
+
+def test_package_lock_v1_reads_the_package_json_next_to_it():
+    lock = {
+        "lockfileVersion": 1,
+        "dependencies": {
+            "express": {"version": "4.19.2", "dependencies": {"debug": {"version": "2.6.9"}}},
+            "debug": {"version": "4.3.4"},
+            "jest": {"version": "29.7.0"},
+        },
+    }
+    package_json = json.dumps({"dependencies": {"express": "^4.0.0"}, "devDependencies": {"jest": "^29.0.0"}})
+
+    summary = parse_package_lock(json.dumps(lock), {"package.json": package_json}.get)
+
+    assert summary.direct == {"express": "4.19.2"}
+    assert summary.development == {"jest": "29.7.0"}
+    assert summary.locked == 4
+    assert parse_package_lock(json.dumps(lock), no_siblings).note == "package.json not found"
+
+
+def test_go_sum_takes_direct_requirements_from_go_mod():
+    summary = parse_go_sum(GO_SUM, {"go.mod": GO_MOD}.get)
+
+    assert summary.direct == {"github.com/spf13/cobra": "v1.8.0", "golang.org/x/sync": "v0.7.0"}
+    assert summary.locked == 4
+
+
+def test_summary_lists_pinned_versions_and_counts():
+    summary = summarize_lockfile("uv.lock", UV_LOCK, no_siblings)
+
+    assert summary.startswith("Dependency summary of uv.lock (uv): 4 packages locked\n")
+    assert "Direct: 2, development and optional: 1, transitive: 1\n" in summary
+    assert "  httpx 0.28.1\n" in summary
+    assert "\nDevelopment:\n  pytest 8.4.1\n" in summary
+
+
+def test_unknown_or_unparsable_lockfiles_are_not_summarized():
+    assert summarize_lockfile("Cargo.lock", "[[package]]", no_siblings) is None
+    assert summarize_lockfile("uv.lock", "not = [toml", no_siblings) is None
+    assert summarize_lockfile("package-lock.json", "[]", no_siblings) is None
@@ -0,0 +1,139 @@
+import os
+import time
+
+import pytest
+
+from agents.tools.repo_index import KIND_GENERATED, KIND_TEXT, IgnoreMatcher, Manifest, classifier
+from agents.tools.repo_index import manifest as manifest_module
+
+
+def write(root, path, text):
+    (root / path).parent.mkdir(parents=True, exist_ok=True)
+    (root / path).write_text(text)
+
+
+def age(root):
+    """Move every mtime under ``root`` out of the racy window, as if the files were written long ago."""
+    past = time.time() - 3600
+    for directory, _, files in os.walk(root):
+        for name in files:
+            os.utime(os.path.join(directory, name), (past, past))
+        os.utime(directory, (past, past))
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    paths = []
+    scan_file = manifest_module.scan_file
+
+    def spy(abs_path, path):
+        paths.append(path)
+        return scan_file(abs_path, path)
+
+    monkeypatch.setattr(manifest_module, "scan_file", spy)
+    return paths
+
+
+@pytest.fixture
+def repository(tmp_path):
+    write(tmp_path, "src/app.py", "print('app')\n")
+    write(tmp_path, "src/models.py", "class Order:\n    pass\n")
+    write(tmp_path, "notes/.gitignore", "*.md\n")
+    write(tmp_path, "notes/draft.md", "started\n")
+    write(tmp_path, "notes/todo.txt", "todo\n")
+    age(tmp_path)
+    return tmp_path
+
+
+def refresh(root):
+    return Manifest.for_repository(root).refresh(root, IgnoreMatcher.for_repository(root))
+
+
+def test_unchanged_files_are_not_hashed_again(repository, hashed):
+    entries = refresh(repository)
+    assert sorted(hashed) == ["notes/.gitignore", "notes/todo.txt", "src/app.py", "src/models.py"]
+    assert entries["src/models.py"].line_count == 2
+    assert entries["notes/draft.md"].ignored
+
+    hashed.clear()
+    again = refresh(repository)
+
+    assert hashed == []
+    # The cache directory written by the first refresh is recorded as ignored, never descended into
+    assert again.keys() - entries.keys() == {".ai/cache"}
+    assert again[".ai/cache"].ignored
+    assert again["src/app.py"].content_hash == entries["src/app.py"].content_hash
+
+
+def test_edited_added_and_removed_files_are_picked_up(repository, hashed):
+    entries = refresh(repository)
+    hashed.clear()
+
+    write(repository, "src/app.py", "print('app')\nprint('more')\n")
+    write(repository, "src/views.py", "VIEWS = []\n")
+    os.remove(repository / "src" / "models.py")
+    again = refresh(repository)
+
+    assert sorted(hashed) == ["src/app.py", "src/views.py"]
+    assert "src/models.py" not in again
+    assert again["src/app.py"].line_count == 2
+    assert again["src/app.py"].content_hash != entries["src/app.py"].content_hash
+
+
+def test_a_gitignore_edited_in_place_reclassifies_its_directory(repository):
+    assert refresh(repository)["notes/draft.md"].ignored
+
+    # The directory keeps its old mtime, only the .gitignore itself changes
+    write(repository, "notes/.gitignore", "*.txt\n")
+    past = time.time() - 3600
+    os.utime(repository / "notes", (past, past))
+    entries = refresh(repository)
+
+    assert not entries["notes/draft.md"].ignored
+    assert entries["notes/todo.txt"].ignored
+
+
+def test_only_changed_rows_are_written(repository, monkeypatch):
+    refresh(repository)
+    statements = []
+    connect = Manifest._connect
+
+    def traced(self):
+        connection = connect(self)
+        connection.set_trace_callback(statements.append)
+        return connection
+
+    monkeypatch.setattr(Manifest, "_connect", traced)
+    write(repository, "src/app.py", "print('changed')\n")
+    os.remove(repository / "notes" / "todo.txt")
+    entries = refresh(repository)
+
+    inserted = [statement for statement in statements if statement.lstrip().startswith("INSERT INTO entries")]
+    deleted = [statement for statement in statements if statement.startswith("DELETE FROM entries")]
+    # The directory of the manifest itself changes with every save
+    assert sorted(statement.split("'")[1] for statement in inserted) == [".ai/cache", "src/app.py"]
+    assert deleted == ["DELETE FROM entries WHERE path = 'notes/todo.txt'"]
+    # A fresh manifest loads exactly what was saved
+    monkeypatch.undo()
+    manifest = Manifest.for_repository(repository)
+    assert manifest._load(manifest.fingerprint(IgnoreMatcher.for_repository(repository)))[0] == entries
+
+
+def test_a_corrupt_manifest_is_rebuilt(repository, hashed):
+    manifest = Manifest.for_repository(repository)
+    manifest.path.parent.mkdir(parents=True)
+    manifest.path.write_bytes(b"not a database" * 100)
+
+    assert refresh(repository)["src/app.py"].line_count == 1
+
+    hashed.clear()
+    refresh(repository)
+    assert hashed == []
+
+
+def test_files_are_classified_again_when_the_classifier_changes(repository, monkeypatch):
+    assert refresh(repository)["src/app.py"].kind == KIND_TEXT
+
+    monkeypatch.setattr(classifier, "GENERATED_SUFFIXES", classifier.GENERATED_SUFFIXES + ("app.py",))
+
+    assert refresh(repository)["src/app.py"].kind == KIND_GENERATED
@@ -0,0 +1,208 @@
+import asyncio
+
+import httpx
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import ConcurrencyWindow, RateLimitedTransport, RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_successes_grow_the_window_by_one_per_full_window():
+    window = ConcurrencyWindow(maximum=16)
+    assert window.size == 8
+
+    for _ in range(9):
+        window.on_success(2.0, output_tokens=100)
+
+    assert window.size == 9
+    assert window.decreases == 0
+
+
+def test_the_window_stays_within_its_bounds(clock):
+    window = ConcurrencyWindow(maximum=4, minimum=2)
+    for _ in range(100):
+        window.on_success(1.0, output_tokens=100)
+    assert window.size == 4
+
+    for _ in range(10):
+        clock[0] += 60
+        window.on_overload()
+    assert window.size == 2
+
+
+def test_overload_halves_the_window_once_per_smoothed_latency(clock):
+    window = ConcurrencyWindow(maximum=16)
+    window.on_success(5.0, output_tokens=100)
+
+    clock[0] += 10
+    window.on_overload()
+    window.on_overload()
+    assert window.size == 4
+    assert window.decreases == 1
+
+    clock[0] += 5
+    window.on_overload()
+    assert window.size == 2
+    assert window.decreases == 2
+
+
+def test_long_outputs_are_not_read_as_overload(clock):
+    window = ConcurrencyWindow(maximum=16)
+    # A second to answer, then 50 tokens per second: the latency grows fifteenfold, the pace does not
+    for _ in range(5):
+        window.on_success(1.4, output_tokens=20)
+    for _ in range(20):
+        window.on_success(21.0, output_tokens=1000)
+
+    assert window.decreases == 0
+    assert window.size > 8
+
+
+def test_a_slower_pace_shrinks_the_window(clock):
+    window = ConcurrencyWindow(maximum=16)
+    for _ in range(5):
+        window.on_success(1.0, output_tokens=100)
+
+    clock[0] += 10
+    for _ in range(20):
+        window.on_success(4.0, output_tokens=100)
+
+    assert window.decreases >= 1
+    assert window.size < 8
+
+
+def test_latency_without_output_tokens_only_grows_the_window(clock):
+    window = ConcurrencyWindow(maximum=16)
+    window.on_success(1.0)
+    for _ in range(20):
+        window.on_success(30.0)
+
+    assert window.decreases == 0
+
+
+def test_a_fixed_window_ignores_every_signal(clock):
+    window = ConcurrencyWindow(maximum=6, adaptive=False)
+    window.on_success(1.0, output_tokens=100)
+    window.on_overload()
+
+    assert window.size == 6
+    assert window.decreases == 0
+
+
+def test_release_decreases_on_overload_status_codes(clock):
+    limiter = RateLimiter(max_concurrency=16, adaptive=True)
+
+    async def run(status_code):
+        await limiter.acquire(0)
+        clock[0] += 60
+        limiter.release(0, status_code=status_code, latency=1.0)
+
+    asyncio.run(run(429))
+    asyncio.run(run(503))
+    asyncio.run(run(500))
+
+    assert limiter.stats().decreases == 2
+    assert limiter.stats().window == 2
+
+
+def test_slots_are_handed_over_in_arrival_order():
+    limiter = RateLimiter(max_concurrency=1)
+    order = []
+
+    async def request(name):
+        await limiter.acquire(0)
+        order.append(name)
+        await asyncio.sleep(0)
+        limiter.release(0, status_code=200)
+
+    async def run():
+        await asyncio.gather(*(request(name) for name in "abcde"))
+
+    asyncio.run(run())
+    assert order == list("abcde")
+    assert limiter.stats().in_flight == 0
+
+
+def test_a_cancelled_waiter_does_not_keep_its_slot():
+    limiter = RateLimiter(max_concurrency=1)
+
+    async def run():
+        await limiter.acquire(0)
+        waiter = asyncio.create_task(limiter.acquire(0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limiter.release(0, status_code=200)
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        await asyncio.wait_for(limiter.acquire(0), timeout=1)
+        limiter.release(0, status_code=200)
+
+    asyncio.run(run())
+    assert limiter.stats().in_flight == 0
+
+
+def test_token_bucket_waits_for_refill_and_caps_large_requests(clock):
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.wait_time(60) == 0
+
+    bucket.take(60)
+    assert bucket.wait_time(10) == pytest.approx(10)
+    assert bucket.wait_time(1000) == pytest.approx(60)
+
+    clock[0] += 10
+    assert bucket.wait_time(10) == 0
+
+
+def test_transport_measures_latency_to_the_headers_and_reads_the_usage(monkeypatch):
+    released = []
+    limiter = RateLimiter(max_concurrency=4, adaptive=True)
+    monkeypatch.setattr(limiter, "release", lambda *args: released.append(args))
+    body = {"usageMetadata": {"promptTokenCount": 1200, "candidatesTokenCount": 300, "thoughtsTokenCount": 50}}
+    transport = RateLimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200, json=body)), limiter)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.post("https://llm.test/v1/generate", content=b"x" * 400)
+
+    asyncio.run(run())
+    [(estimated_tokens, actual_tokens, status_code, latency, output_tokens)] = released
+    assert (estimated_tokens, actual_tokens, status_code, output_tokens) == (100, 1200, 200, 350)
+    assert latency is not None and latency >= 0
+
+
+def test_requests_waiting_for_the_budget_are_served_in_arrival_order(clock, monkeypatch):
+    limiter = RateLimiter(max_concurrency=0, requests_per_minute=600, tokens_per_minute=6000)
+    sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        # Like the event loop's timers, never sleeps less than a millisecond
+        clock[0] += max(seconds, 0.001)
+        await sleep(0)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    served = []
+
+    async def request(name, tokens):
+        await limiter.acquire(tokens)
+        served.append((name, clock[0]))
+
+    async def run():
+        # Empties the token bucket, so every following request has to wait for it to refill
+        await request("first", 6000)
+        # Smaller requests arriving later would fit sooner, but do not overtake the large one
+        await asyncio.gather(request("large", 3000), request("small", 100), request("tiny", 10))
+
+    asyncio.run(run())
+
+    assert [name for name, _ in served] == ["first", "large", "small", "tiny"]
+    # 100 tokens refill per second
+    assert [round(at - 1000, 1) for _, at in served] == [0, 30, 31, 31.1]
+    assert limiter.stats().throttled == 3
@@ -0,0 +1,75 @@
+import subprocess
+
+from agents.tools.repo_index import IgnoreRules, RepositoryIndex, classifier
+from agents.tools.search_tool import RelevanceIndex, relevance_index, tokenize
+from agents.tools.symbol_tool import SymbolIndex
+
+
+def git(root, *args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args], cwd=root, check=True)
+
+
+def build_repository(root):
+    (root / "orders.py").write_text(
+        "class OrderHandler:\n    def create_order(self, request):\n        return save_order(request.json)\n"
+    )
+    (root / "users.py").write_text("def load_user_profile(user_id):\n    return fetch_profile(user_id)\n")
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "initial")
+    return RepositoryIndex.build(root, rules=IgnoreRules())
+
+
+def test_tokenize_splits_identifiers_and_folds_plurals():
+    assert tokenize("createOrder") == ["createorder", "create", "order"]
+    assert "order" in tokenize("save_orders")
+    assert "the" not in tokenize("the orders")
+
+
+def test_search_ranks_matching_definitions_first(tmp_path):
+    index = RelevanceIndex(SymbolIndex(build_repository(tmp_path)))
+
+    results = index.search("create orders", limit=3)
+
+    assert results[0].chunk.qualname == "OrderHandler.create_order"
+    assert all(result.chunk.path != "users.py" for result in results)
+
+
+def test_cached_index_is_reloaded_and_kept_out_of_git(tmp_path):
+    repo_index = build_repository(tmp_path)
+    cache_path = RelevanceIndex.cache_path_for(tmp_path)
+    first = RelevanceIndex(SymbolIndex(repo_index), cache_path=cache_path).search("user profile")
+
+    assert cache_path.exists()
+    status = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=all"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert status.stdout == ""
+
+    reloaded = RelevanceIndex(SymbolIndex(repo_index), cache_path=cache_path)
+    assert reloaded.search("user profile") == first
+
+
+def test_cached_index_is_not_reused_with_other_settings(tmp_path, monkeypatch):
+    repo_index = build_repository(tmp_path)
+    cache_path = RelevanceIndex.cache_path_for(tmp_path)
+    RelevanceIndex(SymbolIndex(repo_index), cache_path=cache_path).search("user profile")
+    indexed = []
+    index = RelevanceIndex._index
+    monkeypatch.setattr(RelevanceIndex, "_index", lambda self: indexed.append(self) or index(self))
+
+    def rebuilt(repo_index):
+        indexed.clear()
+        RelevanceIndex(SymbolIndex(repo_index), cache_path=cache_path).search("user profile")
+        return bool(indexed)
+
+    assert not rebuilt(repo_index)
+    assert rebuilt(RepositoryIndex.build(tmp_path, rules=IgnoreRules(["tests"], [])))
+    monkeypatch.setattr(classifier, "SAMPLE_SIZE", classifier.SAMPLE_SIZE * 2)
+    assert rebuilt(repo_index)
+    monkeypatch.setattr(relevance_index, "NAME_WEIGHT", relevance_index.NAME_WEIGHT + 1)
+    assert rebuilt(repo_index)
@@ -0,0 +1,87 @@
+import re
+
+import pytest
+
+from agents.tools.dir_tool.listing import file_kind
+from agents.tools.dir_tool.render import compress_names, format_size
+
+BRACE_GROUP = re.compile(r"^(.*?)\{(.*)\}(.*)$")
+
+
+def expand(text):
+    """Expand the single brace group a compressed name can hold, like a shell does."""
+    match = BRACE_GROUP.match(text)
+    if match is None:
+        return [text]
+
+    prefix, body, suffix = match.groups()
+    if ".." in body:
+        first, last = body.split("..")
+        middles = [str(number) for number in range(int(first), int(last) + 1)]
+    else:
+        middles = body.split(",")
+    return [prefix + middle + suffix for middle in middles]
+
+
+@pytest.mark.parametrize(
+    "names, compressed",
+    [
+        (["test_a.py", "test_b.py", "main.go"], ["main.go", "test_{a,b}.py"]),
+        (["m1.go", "m2.go", "m3.go", "main.go"], ["m{1..3}.go", "main.go"]),
+        # Two numbers are listed, not written as a range
+        (["part1.txt", "part2.txt"], ["part{1,2}.txt"]),
+        # Gaps and zero padding are not ranges
+        (["page1.md", "page2.md", "page4.md"], ["page{1,2,4}.md"]),
+        (["v01.sql", "v02.sql", "v03.sql"], ["v{01,02,03}.sql"]),
+        # Numbers sort by value, not as text
+        ([f"shard{number}.bin" for number in range(1, 12)], ["shard{1..11}.bin"]),
+        # Prefixes only end at word boundaries
+        (["OrderHook.ts", "OrderPage.ts"], ["Order{Hook,Page}.ts"]),
+        (["0001_a.sql", "0002_b.sql"], ["0001_a.sql", "0002_b.sql"]),
+        (["api.py", "app.py"], ["api.py", "app.py"]),
+        # Files with a different extension are never folded together
+        (["util.js", "util.ts"], ["util.js", "util.ts"]),
+        # Names that contain brace syntax stay as they are
+        (["a{1}.txt", "a{2}.txt"], ["a{1}.txt", "a{2}.txt"]),
+        ([".gitignore", "Makefile", "README"], [".gitignore", "Makefile", "README"]),
+    ],
+)
+def test_compress_names(names, compressed):
+    assert compress_names(names) == compressed
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        ["test_a.py", "test_b.py", "test_c.py", "conftest.py", "m1.go", "m10.go", "m2.go"],
+        [f"img_{number:03}.png" for number in range(20)] + ["img_final.png", "index.html"],
+        ["handler_v1.go", "handler_v2.go", "handler_test.go", "handlers.go"],
+    ],
+)
+def test_compressed_names_expand_to_the_original_names(names):
+    expanded = [name for text in compress_names(names) for name in expand(text)]
+
+    assert sorted(expanded) == sorted(names)
+
+
+@pytest.mark.parametrize(
+    "name, kind",
+    [
+        ("main.go", ".go"),
+        ("api.pb.go", ".pb.go"),
+        ("app.min.js", ".min.js"),
+        ("types.d.ts", ".d.ts"),
+        ("archive.tar.gz", ".tar.gz"),
+        ("my.component.service.ts", ".ts"),
+        (".gitignore", ".gitignore"),
+        ("Makefile", "(no extension)"),
+    ],
+)
+def test_file_kind(name, kind):
+    assert file_kind(name) == kind
+
+
+def test_format_size():
+    assert format_size(512) == "512 B"
+    assert format_size(4200) == "4.1 KB"
+    assert format_size(5 * 1024**3) == "5.0 GB"
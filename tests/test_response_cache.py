@@ -0,0 +1,129 @@
+import asyncio
+
+import httpx
+import pytest
+import ujson as json
+
+from utils.response_cache import CachingTransport, ResponseCache, request_key
+
+URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+BODY = {"contents": [{"role": "user", "parts": [{"text": "hi"}]}], "generationConfig": {"temperature": 0}}
+
+
+def make_request(body, url=URL, method="POST"):
+    return httpx.Request(method, url, content=json.dumps(body).encode())
+
+
+def test_credentials_do_not_change_the_key():
+    key = request_key(make_request(BODY, f"{URL}?key=first&alt=json"))
+
+    assert key is not None
+    assert request_key(make_request(BODY, f"{URL}?alt=json&key=second")) == key
+    assert request_key(make_request(BODY, f"{URL}?api_key=third&alt=json")) == key
+    assert request_key(make_request(BODY, f"{URL}?alt=sse")) != key
+
+
+def test_field_order_does_not_change_the_key():
+    reordered = {"generationConfig": {"temperature": 0}, "contents": BODY["contents"]}
+
+    assert request_key(make_request(reordered)) == request_key(make_request(BODY))
+    assert request_key(make_request({**BODY, "contents": []})) != request_key(make_request(BODY))
+
+
+@pytest.mark.parametrize(
+    "body, cached",
+    [
+        (BODY, True),
+        ({"messages": [], "temperature": 0}, True),
+        ({"messages": [], "temperature": 0.0}, True),
+        ({"contents": [], "generationConfig": {"temperature": 0.7}}, False),
+        # The provider's default temperature is not 0
+        ({"contents": []}, False),
+        ({"messages": [], "temperature": "0"}, False),
+    ],
+)
+def test_only_requests_at_temperature_zero_are_cached(body, cached):
+    assert (request_key(make_request(body)) is not None) == cached
+
+
+def test_only_json_posts_are_cached():
+    assert request_key(make_request(BODY, method="GET")) is None
+    assert request_key(httpx.Request("POST", URL, content=b"not json")) is None
+    assert request_key(httpx.Request("POST", URL, content=b"[1, 2]")) is None
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("utils.response_cache.time.time", lambda: now[0])
+    cache = ResponseCache(tmp_path / "responses.db", max_bytes=300)
+
+    for key in ("a", "b", "c"):
+        now[0] += 1
+        cache.put(key, "application/json", b"x" * 100)
+    now[0] += 1
+    assert cache.get("a") is not None
+
+    # Over the limit: "b" was used least recently, and eviction goes 10% below the limit
+    now[0] += 1
+    cache.put("d", "application/json", b"x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("c") is None
+    assert cache.get("a") == ("application/json", b"x" * 100)
+    assert cache.get("d") is not None
+    cache.close()
+
+
+def test_responses_larger_than_the_cache_are_not_stored(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.db", max_bytes=10)
+
+    cache.put("a", "application/json", b"x" * 11)
+
+    assert cache.get("a") is None
+    assert cache.stats().stored == 0
+    cache.close()
+
+
+def test_an_unusable_cache_is_disabled_without_failing_requests(tmp_path):
+    # The parent of the database is a file, so it cannot be created
+    (tmp_path / "blocker").write_text("")
+    cache = ResponseCache(tmp_path / "blocker" / "responses.db", max_bytes=1024)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"candidates": []})
+
+    async def run():
+        async with httpx.AsyncClient(transport=CachingTransport(httpx.MockTransport(handler), cache)) as client:
+            for _ in range(2):
+                response = await client.post(URL, content=json.dumps(BODY).encode())
+                assert response.json() == {"candidates": []}
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert cache.stats().stored == 0
+    assert cache.get("anything") is None
+
+
+def test_caching_transport_replays_successful_responses(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.db", max_bytes=1024 * 1024)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if b"fail" in request.content:
+            return httpx.Response(500, json={"error": "overloaded"})
+        return httpx.Response(200, json={"candidates": [{"text": "hello"}]})
+
+    async def run():
+        async with httpx.AsyncClient(transport=CachingTransport(httpx.MockTransport(handler), cache)) as client:
+            for body in (BODY, BODY, {**BODY, "fail": True}, {**BODY, "fail": True}):
+                await client.post(URL, content=json.dumps(body).encode())
+            response = await client.post(URL, content=json.dumps(BODY).encode())
+            return response.json()
+
+    assert asyncio.run(run()) == {"candidates": [{"text": "hello"}]}
+    # Errors are not cached, so both failing requests reached the provider
+    assert len(calls) == 3
+    assert cache.stats() == (2, 3, 0, 1)
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+from httpx import AsyncHTTPTransport
+
+from utils import retry_client
+from utils.retry_client import HttpClientManager, create_retrying_client, get_http_client_manager
+
+SRC_PATH = Path(__file__).parent.parent / "src"
+
+
+def test_config_imports_without_creating_the_client_manager():
+    # config imports utils, which must not read settings config has not defined yet
+    for module in ("config", "main", "handlers.analyze", "handlers.cronjob"):
+        subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": str(SRC_PATH)},
+            check=True,
+        )
+
+
+def test_get_http_client_manager_returns_one_manager(monkeypatch):
+    monkeypatch.setattr(retry_client, "_http_client_manager", None)
+    assert get_http_client_manager() is get_http_client_manager()
+
+
+def test_aclose_closes_the_pooled_transport(monkeypatch):
+    closed = []
+    original = AsyncHTTPTransport.aclose
+
+    async def aclose(self):
+        closed.append(self)
+        await original(self)
+
+    monkeypatch.setattr(AsyncHTTPTransport, "aclose", aclose)
+    manager = HttpClientManager(max_connections=2, max_keepalive_connections=1, keepalive_expiry=5)
+
+    async def run():
+        client = manager.get_client()
+        await manager.aclose()
+        assert client.is_closed
+        assert manager.get_client() is not client
+
+    asyncio.run(run())
+    assert len(closed) == 1
+    assert manager.stats().clients == 2
+
+
+def test_aclose_without_client_is_a_no_op():
+    manager = HttpClientManager(max_connections=2, max_keepalive_connections=1, keepalive_expiry=5)
+    asyncio.run(manager.aclose())
+    assert manager.stats().requests == 0
+
+
+def test_concurrent_requests_retry_independently():
+    attempts = {}
+
+    async def handler(request):
+        path = request.url.path
+        attempts[path] = attempts.get(path, 0) + 1
+        # /ok is sent while the first attempt of /limited is in flight, and answered before its 429
+        await asyncio.sleep(0.05 if path == "/limited" else 0.01)
+        if path == "/limited" and attempts[path] == 1:
+            return httpx.Response(429, headers={"retry-after": "0"})
+        return httpx.Response(200, json={"path": path})
+
+    client = create_retrying_client(transport=httpx.MockTransport(handler))
+
+    async def run():
+        async with client:
+            return await asyncio.gather(*(client.get(f"https://llm.test{path}") for path in ("/limited", "/ok")))
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200, 200]
+    assert attempts == {"/limited": 2, "/ok": 1}
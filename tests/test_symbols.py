@@ -0,0 +1,121 @@
+from agents.tools.repo_index import IgnoreRules, RepositoryIndex
+from agents.tools.symbol_tool import SymbolReadTool, extract_symbols
+
+PYTHON = """import functools
+
+
+class Service:
+    @functools.cache
+    def run(self):
+        return 1
+
+    class Config:
+        pass
+
+
+async def main():
+    def helper():
+        pass
+"""
+
+GO = """package server
+
+type Handler interface {
+\tServe()
+}
+
+type Server struct {
+\tport int
+}
+
+func (s *Server) Run() error {
+\treturn nil
+}
+
+func New() *Server {
+\treturn &Server{}
+}
+"""
+
+TYPESCRIPT = """// Form feeds are not line breaks: \x0c
+export class UserService {
+  @Inject()
+  private repo: Repo;
+
+  async create(name: string): Promise<User> {
+    if (name) {
+      return this.repo.save(name);
+    }
+  }
+}
+
+export const handler = async (event) => {
+  return event;
+};
+"""
+
+JAVA = """public class OrderController {
+    @GetMapping("/orders")
+    public List<Order> list() {
+        return service.findAll();
+    }
+
+    abstract void close();
+}
+"""
+
+
+def definitions(text, language):
+    return [
+        (symbol.qualname, symbol.kind, symbol.line, symbol.end_line) for symbol in extract_symbols(text, "f", language)
+    ]
+
+
+def test_python_definitions_come_from_the_ast():
+    assert definitions(PYTHON, "Python") == [
+        ("Service", "class", 4, 10),
+        # Decorators are part of the definition
+        ("Service.run", "method", 5, 7),
+        ("Service.Config", "class", 9, 10),
+        ("main", "function", 13, 15),
+        ("main.helper", "function", 14, 15),
+    ]
+
+
+def test_go_methods_are_qualified_with_their_receiver():
+    assert definitions(GO, "Go") == [
+        ("Handler", "interface", 3, 5),
+        ("Server", "type", 7, 9),
+        ("Server.Run", "method", 11, 13),
+        ("New", "function", 15, 17),
+    ]
+
+
+def test_typescript_line_numbers_only_count_newlines():
+    assert definitions(TYPESCRIPT, "TypeScript") == [
+        ("UserService", "class", 2, 11),
+        ("UserService.create", "method", 6, 10),
+        ("handler", "function", 13, 15),
+    ]
+
+
+def test_java_annotations_and_bodiless_methods():
+    assert definitions(JAVA, "Java") == [
+        ("OrderController", "class", 1, 8),
+        ("OrderController.list", "method", 2, 5),
+        ("OrderController.close", "method", 7, 7),
+    ]
+
+
+def test_read_symbol_returns_the_definition_lines(tmp_path):
+    (tmp_path / "service.py").write_text(PYTHON)
+    (tmp_path / "user.ts").write_text(TYPESCRIPT)
+    tool = SymbolReadTool(repo_index=RepositoryIndex.build(tmp_path, rules=IgnoreRules()), cache=None)
+
+    result = tool._run("Service.run")
+    assert result.startswith("Symbol: Service.run (method) in service.py, lines 5-7\n")
+    assert "    @functools.cache\n    def run(self):\n        return 1\n\n--- end ---" in result
+
+    result = tool._run("create", str(tmp_path / "user.ts"))
+    assert "--- start---\n  async create(name: string): Promise<User> {\n" in result
+    assert "      return this.repo.save(name);\n    }\n  }\n\n--- end ---" in result
@@ -0,0 +1,78 @@
+import subprocess
+
+from agents.tools.repo_index import GitObjectStore, IgnoreRules, RepositoryIndex
+
+
+def write(root, path, text):
+    (root / path).parent.mkdir(parents=True, exist_ok=True)
+    (root / path).write_text(text)
+
+
+def tree_hash(root):
+    return RepositoryIndex.build(root, rules=IgnoreRules()).tree_hash()
+
+
+def build_repository(root):
+    write(root, "src/app.py", "print('app')\n")
+    write(root, "src/pkg/models.py", "class Order: ...\n")
+    write(root, "README.md", "# App\n")
+    write(root, ".ai/docs/structure_analysis.md", "# Structure\n")
+
+
+def test_unchanged_repository_hashes_the_same(tmp_path):
+    build_repository(tmp_path)
+    assert tree_hash(tmp_path) == tree_hash(tmp_path)
+
+
+def test_ai_directory_and_empty_directories_are_left_out(tmp_path):
+    build_repository(tmp_path)
+    before = tree_hash(tmp_path)
+
+    write(tmp_path, ".ai/docs/structure_analysis.md", "# Structure, regenerated\n")
+    write(tmp_path, ".ai/cache/manifest.db", "data")
+    (tmp_path / "empty").mkdir()
+
+    assert tree_hash(tmp_path) == before
+
+
+def test_edits_additions_removals_and_renames_change_the_hash(tmp_path):
+    build_repository(tmp_path)
+    hashes = {tree_hash(tmp_path)}
+
+    write(tmp_path, "src/pkg/models.py", "class Order: pass\n")
+    hashes.add(tree_hash(tmp_path))
+    write(tmp_path, "src/pkg/views.py", "")
+    hashes.add(tree_hash(tmp_path))
+    (tmp_path / "src/pkg/views.py").rename(tmp_path / "src/views.py")
+    hashes.add(tree_hash(tmp_path))
+    (tmp_path / "src/views.py").unlink()
+    hashes.add(tree_hash(tmp_path))
+
+    # Removing the added file restores the contents hashed after the edit
+    assert len(hashes) == 4
+
+
+def test_moving_a_file_between_directories_changes_the_hash(tmp_path):
+    write(tmp_path, "a/x.py", "x\n")
+    before = tree_hash(tmp_path)
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a/x.py").rename(tmp_path / "b/x.py")
+    (tmp_path / "a").rmdir()
+    (tmp_path / "b").rename(tmp_path / "a2")
+
+    assert tree_hash(tmp_path) != before
+
+
+def test_git_object_index_hashes_the_commit(tmp_path):
+    build_repository(tmp_path)
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run([*git, "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run([*git, "add", "."], cwd=tmp_path, check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "initial"], cwd=tmp_path, check=True)
+
+    with GitObjectStore(tmp_path) as objects:
+        committed = RepositoryIndex.from_git_objects(tmp_path, objects).tree_hash()
+    # Uncommitted changes do not affect an index of the commit
+    write(tmp_path, "src/app.py", "print('changed')\n")
+    with GitObjectStore(tmp_path) as objects:
+        assert RepositoryIndex.from_git_objects(tmp_path, objects).tree_hash() == committed
@@ -0,0 +1,87 @@
+import re
+import subprocess
+
+import pytest
+
+from agents.tools.repo_index import IgnoreRules, RepositoryIndex
+from agents.tools.search_tool import TrigramIndex, required_literals
+
+
+def build_repository(root):
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text("def create_app():\n    return App()\n")
+    (root / "src" / "models.py").write_text("class Order:\n    pass\n")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    return RepositoryIndex.build(root, rules=IgnoreRules())
+
+
+def test_refresh_keeps_the_index_out_of_git(tmp_path):
+    repo_index = build_repository(tmp_path)
+
+    TrigramIndex.for_repository(tmp_path).refresh(repo_index)
+
+    assert (tmp_path / ".ai" / "cache" / "trigrams.db").exists()
+    assert (tmp_path / ".ai" / "cache" / ".gitignore").read_text() == "*\n"
+    status = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=all", "--", ".ai"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert status.stdout == ""
+
+
+def test_candidates_narrow_to_files_with_every_literal(tmp_path):
+    repo_index = build_repository(tmp_path)
+    index = TrigramIndex.for_repository(tmp_path)
+    index.refresh(repo_index)
+
+    assert index.candidates(["create_app"]) == ["src/app.py"]
+    assert index.candidates(["ORDER"]) == ["src/models.py"]
+    assert index.candidates(["create_app", "Order"]) == []
+    assert index.candidates(["ab"]) is None
+
+
+@pytest.mark.parametrize(
+    "pattern, literals",
+    [
+        ("create_app", ["create_app"]),
+        (r"def\s+create_app\(", ["def", "create_app("]),
+        (r"config\.get\(", ["config.get("]),
+        (r"\d+_items\b", ["_items"]),
+        ("user[s_]?name", ["user", "name"]),
+        ("[]abc]+_value", ["_value"]),
+        ("[^]abc]order", ["order"]),
+        ("colou?r_map", ["colo", "r_map"]),
+        ("handler_*name", ["handler", "name"]),
+        ("timeout+s", ["timeout"]),
+        ("cache{0,3}_key", ["cach", "_key"]),
+        ("cache{,3}_key", ["cach", "_key"]),
+        ("cache{2}_key", ["cache", "_key"]),
+        ("(?:get|set)_value", []),
+        ("get_value|set_value", []),
+        (r"get_value\|set", ["get_value|set"]),
+        (r"path\\|name", []),
+        ("(?x) create _ app", []),
+        ("(?i)create_app", ["create_app"]),
+        ("ab.cd", []),
+    ],
+)
+def test_required_literals(pattern, literals):
+    assert required_literals(pattern) == literals
+
+
+@pytest.mark.parametrize(
+    "pattern, text",
+    [
+        ("user[s_]?name", "username"),
+        ("colou?r_map", "color_map"),
+        ("cache{0,3}_key", "cach_key"),
+        ("handler_*name", "handlername"),
+        (r"\d+_items\b", "42_items"),
+    ],
+)
+def test_required_literals_are_in_every_match(pattern, text):
+    assert re.search(pattern, text)
+    assert all(literal in text for literal in required_literals(pattern))
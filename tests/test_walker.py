@@ -0,0 +1,62 @@
+import pytest
+
+from agents.tools.repo_index import IgnoreMatcher, iter_tree, walk_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for path in [
+        "README.md",
+        "src/app.py",
+        "src/api/v1/routes.py",
+        "src/api/v2/routes.py",
+        "src/api-docs/index.md",
+        "src/build/out.js",
+        "node_modules/react/index.js",
+        "docs/guide.md",
+        "docs/draft.tmp",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    (tmp_path / "src" / ".gitignore").write_text("build/\n")
+    (tmp_path / ".gitignore").write_text("*.tmp\n")
+    for index in range(30):
+        (tmp_path / "wide" / f"d{index}").mkdir(parents=True)
+        (tmp_path / "wide" / f"d{index}" / "f.py").write_text("")
+    return tmp_path
+
+
+def snapshot(directory, workers):
+    rules = IgnoreMatcher.for_repository(directory)
+    return [
+        (rel_dir, [entry.name for entry in files], [entry.name for entry in ignored])
+        for rel_dir, files, ignored in iter_tree(str(directory), rules, workers)
+    ]
+
+
+def sort_walk(walk):
+    return sorted(((rel_dir, sorted(files), sorted(ignored)) for rel_dir, files, ignored in walk))
+
+
+@pytest.mark.parametrize("workers", [2, 8])
+def test_parallel_walk_finds_what_the_serial_walk_finds(tree, workers):
+    serial = snapshot(tree, 1)
+    parallel = snapshot(tree, workers)
+
+    assert sort_walk(parallel) == sort_walk(serial)
+    serial_files = walk_files(str(tree), IgnoreMatcher.for_repository(tree), 1)
+    parallel_files = walk_files(str(tree), IgnoreMatcher.for_repository(tree), workers)
+    assert {key: sorted(files) for key, files in parallel_files.items()} == {
+        key: sorted(files) for key, files in serial_files.items()
+    }
+    # Nested .gitignore files apply in worker threads too
+    assert ("src", [".gitignore", "app.py"], ["build"]) in parallel
+
+
+def test_parallel_walk_output_does_not_depend_on_scheduling(tree):
+    walks = [snapshot(tree, 8) for _ in range(5)]
+
+    assert all(walk == walks[0] for walk in walks)
+    # Every directory comes right before its subdirectories
+    rel_dirs = [rel_dir for rel_dir, _, _ in walks[0]]
+    assert rel_dirs.index("src/api") < rel_dirs.index("src/api/v1") < rel_dirs.index("src/api-docs")